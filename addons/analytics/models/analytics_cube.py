@@ -46,20 +46,21 @@ class AnalyticsCube(BaseModel, KidsClothingMixin):
     def execute_olap_query(self, dimensions=None, facts=None, filters=None):
         """Execute OLAP query on the cube"""
         try:
-            # Get source data
-            source_data = self.model_id._get_source_data(filters)
-            
-            # Process dimensions
-            if dimensions:
-                dimension_data = self._process_dimensions(source_data, dimensions)
-            else:
-                dimension_data = self._process_all_dimensions(source_data)
-            
-            # Process facts
-            if facts:
-                fact_data = self._process_facts(source_data, facts)
-            else:
-                fact_data = self._process_all_facts(source_data)
+            with self.env.db.replica_reads():
+                # Get source data
+                source_data = self.model_id._get_source_data(filters)
+                
+                # Process dimensions
+                if dimensions:
+                    dimension_data = self._process_dimensions(source_data, dimensions)
+                else:
+                    dimension_data = self._process_all_dimensions(source_data)
+                
+                # Process facts
+                if facts:
+                    fact_data = self._process_facts(source_data, facts)
+                else:
+                    fact_data = self._process_all_facts(source_data)
             
             # Generate cube data
             cube_data = self._generate_cube_data(dimension_data, fact_data)
@@ -74,14 +74,15 @@ class AnalyticsModel(BaseModel, KidsClothingMixin):
     def execute_analytics(self, filters=None):
         """Execute analytics model"""
         try:
-            # Get source data
-            source_data = self._get_source_data(filters)
-            
-            # Process dimensions
-            dimensions = self._process_dimensions(source_data)
-            
-            # Process facts
-            facts = self._process_facts(source_data)
+            with self.env.db.replica_reads():
+                # Get source data
+                source_data = self._get_source_data(filters)
+                
+                # Process dimensions
+                dimensions = self._process_dimensions(source_data)
+                
+                # Process facts
+                facts = self._process_facts(source_data)
             
             # Calculate metrics
             metrics = self._calculate_metrics(dimensions, facts)
@@ -7,7 +7,7 @@ Stock quant management for kids clothing retail.
 """
 
 from core_framework.orm import BaseModel, CharField, TextField, BooleanField, IntegerField, DateTimeField, Many2OneField, SelectionField, FloatField, One2ManyField, Many2ManyField
-from core_framework.orm import Field
+from core_framework.orm import Field, SQL
 from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
@@ -20,6 +20,7 @@ class StockQuant(BaseModel):
     _name = 'stock.quant'
     _description = 'Stock Quant'
     _table = 'stock_quant'
+    _unique_keys = [('product_id', 'location_id', 'lot_id', 'package_id', 'owner_id', 'company_id')]
     
     # Basic Information
     product_id = Many2OneField(
@@ -248,28 +249,19 @@ class StockQuant(BaseModel):
         if not location_id:
             location_id = self.env['stock.location'].search([('usage', '=', 'internal')], limit=1)
         
-        # Find existing quant or create new one
-        quant = self.search([
-            ('product_id', '=', product_id),
-            ('location_id', '=', location_id.id),
-            ('company_id', '=', self.env.user.company_id.id)
-        ], limit=1)
-        
-        if quant:
-            # Update existing quant
-            quant.quantity += quantity
-            quant.cost = cost_price
-            quant.value = quant.quantity * quant.cost
-        else:
-            # Create new quant
-            self.create({
-                'product_id': product_id,
-                'location_id': location_id.id,
-                'quantity': quantity,
-                'cost': cost_price,
-                'value': quantity * cost_price,
-                'company_id': self.env.user.company_id.id
-            })
+        # Create the quant or add to the existing one in a single statement
+        self.upsert({
+            'product_id': product_id,
+            'location_id': location_id.id,
+            'quantity': quantity,
+            'cost': cost_price,
+            'value': quantity * cost_price,
+            'company_id': self.env.user.company_id.id
+        }, ['product_id', 'location_id', 'lot_id', 'package_id', 'owner_id', 'company_id'], {
+            'quantity': 'quantity + EXCLUDED.quantity',
+            'cost': 'EXCLUDED.cost',
+            'value': '(quantity + EXCLUDED.quantity) * EXCLUDED.cost',
+        })
         
         # Update product variant quantity
         self._update_product_variant_quantity(product_id)
@@ -286,17 +278,19 @@ class StockQuant(BaseModel):
             ('company_id', '=', self.env.user.company_id.id)
         ], limit=1)
         
-        if quant:
-            if quant.quantity >= quantity:
-                quant.quantity -= quantity
-                quant.value = quant.quantity * quant.cost
-                
-                # Update product variant quantity
-                self._update_product_variant_quantity(product_id)
-            else:
-                raise ValueError(f"Insufficient inventory for product {product_id}. Available: {quant.quantity}, Required: {quantity}")
-        else:
+        if not quant:
             raise ValueError(f"No inventory found for product {product_id}")
+        
+        # Check and decrement in one statement so concurrent sales cannot oversell
+        updated = quant.write_if({
+            'quantity': SQL('quantity - %s', quantity),
+            'value': SQL('(quantity - %s) * cost', quantity),
+        }, [('quantity', '>=', quantity)])
+        if not updated:
+            raise ValueError(f"Insufficient inventory for product {product_id}. Available: {quant.quantity}, Required: {quantity}")
+        
+        # Update product variant quantity
+        self._update_product_variant_quantity(product_id)
     
     def update_inventory_purchase_return(self, product_id, quantity, location_id=None):
         """Update inventory after purchase return (decrease)"""
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from core_framework.orm import BaseModel, CharField, TextField, IntegerField, FloatField, BooleanField, DateField, DateTimeField, Many2oneField, One2manyField, SelectionField
+from core_framework.orm import SQL, BaseModel, CharField, TextField, IntegerField, FloatField, BooleanField, DateField, DateTimeField, Many2oneField, One2manyField, SelectionField
 from core_framework.exceptions import ValidationError
 
 
@@ -299,18 +299,21 @@ class LoyaltyVoucher(BaseModel):
         if self.is_used:
             raise ValidationError('Voucher has already been used!')
         
-        # Create usage record
-        usage = self.env['loyalty.voucher.usage'].create({
-            'voucher_id': self.id,
-            'partner_id': partner_id or self.partner_id.id,
-            'usage_date': self.env['datetime'].now(),
-        })
-        
-        # Update usage count
-        self.write({'usage_count': self.usage_count + 1})
-        
-        if self.usage_count >= self.usage_limit:
-            self.write({'state': 'used'})
+        with self.env.transaction():
+            # Claim a use atomically, a concurrent redemption may have taken the last one
+            claimed = self.write_if({
+                'usage_count': SQL('usage_count + 1'),
+                'state': SQL("CASE WHEN usage_count + 1 >= usage_limit THEN 'used' ELSE state END"),
+            }, [('state', '=', 'active'), ('usage_count', '<', self.usage_limit)])
+            if not claimed:
+                raise ValidationError('Voucher has already been used!')
+            
+            # Create usage record
+            usage = self.env['loyalty.voucher.usage'].create({
+                'voucher_id': self.id,
+                'partner_id': partner_id or self.partner_id.id,
+                'usage_date': self.env['datetime'].now(),
+            })
         
         return usage
     
@@ -238,19 +238,14 @@ class PosConfig(BaseModel):
         """Get dashboard data for this POS"""
         today = datetime.now().date()
         
-        # Get today's sales
-        today_sales = self.env['pos.order'].search_count([
+        # Get today's sales and revenue in one aggregate query
+        today_totals = self.env['pos.order'].read_group([
             ('session_id.config_id', '=', self.id),
             ('date_order', '>=', today),
             ('state', '=', 'done')
-        ])
-        
-        # Get today's revenue
-        today_revenue = sum(self.env['pos.order'].search([
-            ('session_id.config_id', '=', self.id),
-            ('date_order', '>=', today),
-            ('state', '=', 'done')
-        ]).mapped('amount_total'))
+        ], ['amount_total:sum'], [])[0]
+        today_sales = today_totals['__count']
+        today_revenue = today_totals['amount_total'] or 0.0
         
         # Get active session info
         active_session = self.current_session_id
@@ -7,7 +7,7 @@ POS order management for kids clothing retail.
 """
 
 from core_framework.orm import BaseModel, CharField, TextField, BooleanField, IntegerField, DateTimeField, Many2OneField, SelectionField, FloatField, One2ManyField, Many2ManyField
-from core_framework.orm import Field
+from core_framework.orm import Field, depends
 from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
@@ -253,6 +253,7 @@ class PosOrder(BaseModel):
         string='Total Base Amount',
         digits=(16, 2),
         compute='_compute_gst_totals',
+        store=True,
         help='Total base amount for GST calculation'
     )
     
@@ -260,6 +261,7 @@ class PosOrder(BaseModel):
         string='Total CGST Amount',
         digits=(16, 2),
         compute='_compute_gst_totals',
+        store=True,
         help='Total Central GST amount'
     )
     
@@ -267,6 +269,7 @@ class PosOrder(BaseModel):
         string='Total SGST Amount',
         digits=(16, 2),
         compute='_compute_gst_totals',
+        store=True,
         help='Total State GST amount'
     )
     
@@ -274,6 +277,7 @@ class PosOrder(BaseModel):
         string='Total IGST Amount',
         digits=(16, 2),
         compute='_compute_gst_totals',
+        store=True,
         help='Total Integrated GST amount'
     )
     
@@ -281,6 +285,7 @@ class PosOrder(BaseModel):
         string='Total GST Amount',
         digits=(16, 2),
         compute='_compute_gst_totals',
+        store=True,
         help='Total GST amount'
     )
     
@@ -288,6 +293,7 @@ class PosOrder(BaseModel):
         string='Grand Total',
         digits=(16, 2),
         compute='_compute_gst_totals',
+        store=True,
         help='Grand total amount'
     )
     
@@ -384,15 +390,17 @@ class PosOrder(BaseModel):
         # Validate order
         self._validate_order()
         
-        # Update state
-        self.state = 'paid'
-        
-        # Generate receipt number
-        if not self.receipt_number:
-            self.receipt_number = self._generate_receipt_number()
-        
-        # Calculate loyalty points
-        self._calculate_loyalty_points()
+        # Commit the state, receipt and loyalty points together
+        with self.env.transaction():
+            # Update state
+            self.state = 'paid'
+            
+            # Generate receipt number
+            if not self.receipt_number:
+                self.receipt_number = self._generate_receipt_number()
+            
+            # Calculate loyalty points
+            self._calculate_loyalty_points()
         
         return True
     
@@ -401,10 +409,12 @@ class PosOrder(BaseModel):
         if self.state not in ['paid', 'draft']:
             raise ValueError("Order must be paid or draft to mark as done")
         
-        self.state = 'done'
-        
-        # Update inventory
-        self._update_inventory()
+        # Stock moves must not be left behind if the order update fails
+        with self.env.transaction():
+            self.state = 'done'
+            
+            # Update inventory
+            self._update_inventory()
         
         return True
     
@@ -428,6 +438,8 @@ class PosOrder(BaseModel):
         self.state = 'cancel'
         return True
     
+    @depends('lines', 'lines.product_id', 'lines.product_id.mrp', 'lines.product_id.gst_rate',
+             'lines.discount_type', 'lines.discount_rate', 'lines.gst_treatment')
     def _compute_gst_totals(self):
         """Compute GST totals for the order"""
         for order in self:
@@ -7,7 +7,7 @@ POS order line management for kids clothing retail.
 """
 
 from core_framework.orm import BaseModel, CharField, TextField, BooleanField, IntegerField, DateTimeField, Many2OneField, SelectionField, FloatField, One2ManyField, Many2ManyField
-from core_framework.orm import Field
+from core_framework.orm import Field, depends
 from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
@@ -111,12 +111,14 @@ class PosOrderLine(BaseModel):
     mrp = FloatField(
         string='MRP',
         digits=(16, 2),
+        compute='_compute_gst_breakdown',
         help='Maximum Retail Price'
     )
     
     gst_rate = FloatField(
         string='GST Rate (%)',
         digits=(5, 2),
+        compute='_compute_gst_breakdown',
         help='GST rate percentage'
     )
     
@@ -280,10 +282,13 @@ class PosOrderLine(BaseModel):
         
         return result
     
+    @depends('product_id', 'product_id.mrp', 'product_id.gst_rate', 'discount_type', 'discount_rate', 'gst_treatment')
     def _compute_gst_breakdown(self):
         """Compute GST breakdown for POS line"""
         for line in self:
             if not line.product_id:
+                line.mrp = 0.0
+                line.gst_rate = 0.0
                 line.base_amount = 0.0
                 line.cgst_amount = 0.0
                 line.sgst_amount = 0.0
@@ -297,7 +302,7 @@ class PosOrderLine(BaseModel):
             line.mrp = variant.mrp or 0.0
             line.gst_rate = variant.gst_rate or 0.0
             
-            # Calculate base amount after discount
+            # Calculate base amount after discount; discount_amount itself is kept by _update_amounts
             if line.discount_type == 'percentage' and line.discount_rate:
                 discount_amt = line.mrp * (line.discount_rate / 100)
             elif line.discount_type == 'fixed' and line.discount_rate:
@@ -305,7 +310,6 @@ class PosOrderLine(BaseModel):
             else:
                 discount_amt = 0.0
             
-            line.discount_amount = discount_amt
             discounted_price = line.mrp - discount_amt
             
             # Calculate GST breakdown based on treatment
@@ -322,11 +326,6 @@ class PosOrderLine(BaseModel):
             line.sgst_amount = line.base_amount * (line.gst_rate / 2 / 100)
             line.igst_amount = 0.0
             line.total_gst_amount = line.cgst_amount + line.sgst_amount + line.igst_amount
-            
-            # Update legacy fields for compatibility
-            line.price_subtotal = line.base_amount
-            line.price_tax = line.total_gst_amount
-            line.price_total = line.final_price
     
     def _update_amounts(self):
         """Update line amounts"""
@@ -180,21 +180,40 @@ class PosSession(BaseModel):
     
     def _update_session_statistics(self):
         """Update session statistics when closing"""
+        session_ids = [session.id for session in self]
+        
+        # Aggregate order totals and cash payments per session in the database
+        order_totals = {
+            group['session_id']: group
+            for group in self.env['pos.order'].read_group(
+                [('session_id', 'in', session_ids)],
+                ['amount_total:sum', 'amount_discount:sum', 'amount_tax:sum'],
+                ['session_id']
+            )
+        }
+        cash_totals = {
+            group['session_id']: group['amount'] or 0.0
+            for group in self.env['pos.payment'].read_group(
+                [('session_id', 'in', session_ids), ('payment_method_id.is_cash', '=', True)],
+                ['amount:sum'],
+                ['session_id']
+            )
+        }
+        
         for session in self:
+            totals = order_totals.get(session.id, {})
+            
             # Count orders
-            session.order_count = len(session.order_ids)
+            session.order_count = totals.get('session_id_count', 0)
             
             # Calculate totals
-            session.total_sales = sum(session.order_ids.mapped('amount_total'))
-            session.total_discount = sum(session.order_ids.mapped('amount_discount'))
-            session.total_tax = sum(session.order_ids.mapped('amount_tax'))
+            session.total_sales = totals.get('amount_total') or 0.0
+            session.total_discount = totals.get('amount_discount') or 0.0
+            session.total_tax = totals.get('amount_tax') or 0.0
             
             # Calculate cash difference
             if session.end_cash is not None:
-                expected_cash = session.start_cash + sum([
-                    payment.amount for payment in session.payment_ids 
-                    if payment.payment_method_id.is_cash
-                ])
+                expected_cash = session.start_cash + cash_totals.get(session.id, 0.0)
                 session.cash_difference = session.end_cash - expected_cash
     
     def action_close(self):
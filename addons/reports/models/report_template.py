@@ -85,19 +85,20 @@ class ReportTemplate(BaseModel, KidsClothingMixin):
         })
         
         try:
-            # Generate report data based on type
-            if self.report_type == 'financial':
-                data = self._generate_financial_report(filters)
-            elif self.report_type == 'sales':
-                data = self._generate_sales_report(filters)
-            elif self.report_type == 'inventory':
-                data = self._generate_inventory_report(filters)
-            elif self.report_type == 'purchase':
-                data = self._generate_purchase_report(filters)
-            elif self.report_type == 'custom':
-                data = self._generate_custom_report(filters)
-            else:
-                data = self._generate_default_report(filters)
+            # Generate report data based on type, reading from a replica when available
+            with self.env.db.replica_reads():
+                if self.report_type == 'financial':
+                    data = self._generate_financial_report(filters)
+                elif self.report_type == 'sales':
+                    data = self._generate_sales_report(filters)
+                elif self.report_type == 'inventory':
+                    data = self._generate_inventory_report(filters)
+                elif self.report_type == 'purchase':
+                    data = self._generate_purchase_report(filters)
+                elif self.report_type == 'custom':
+                    data = self._generate_custom_report(filters)
+                else:
+                    data = self._generate_default_report(filters)
             
             # Update execution with results
             execution.write({
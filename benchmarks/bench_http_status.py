@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - HTTP Serving Benchmark
+==========================================
+
+Measures requests per second on /api/status for the single-threaded,
+thread pool and pre-fork serving modes. ``--slow-ms`` adds a wait to the
+handler, standing in for a database round trip.
+
+Usage: python benchmarks/bench_http_status.py [--clients 32] [--duration 5] [--slow-ms 0]
+                                              [--modes 0x1,0x8,4x1,4x4]
+
+A mode is ``<workers>x<threads>``, ``0`` workers serving in one process.
+"""
+
+import os
+import sys
+import time
+import socket
+import logging
+import argparse
+import tempfile
+import subprocess
+import http.client
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core_framework.config import Config
+from core_framework.web_interface import WebInterface
+
+
+class BenchAddonManager:
+    """Addon manager stand-in with an optional wait per status call"""
+    
+    def __init__(self, slow_ms):
+        self.loaded_addons = ['base', 'sales', 'pos']
+        self.slow_ms = slow_ms
+    
+    def list_installed_addons(self):
+        if self.slow_ms:
+            time.sleep(self.slow_ms / 1000.0)
+        return list(self.loaded_addons)
+
+
+class BenchServer:
+    """Minimal ERP server exposing what the status handler uses"""
+    
+    def __init__(self, config, slow_ms):
+        self.config = config
+        self.addon_manager = BenchAddonManager(slow_ms)
+        self.db_manager = None
+        self.auth_manager = None
+        self.session_manager = None
+        self.template_renderer = None
+        self.logger = logging.getLogger('ERP')
+
+
+def serve(port, workers, threads, slow_ms):
+    """Run the web interface in this process until terminated"""
+    # The status handler is only reached once setup is complete
+    os.chdir(tempfile.mkdtemp())
+    Path('.ocean_setup_complete').write_text('{}')
+    
+    config = Config()
+    web_interface = WebInterface(config)
+    web_interface.set_erp_server(BenchServer(config, slow_ms))
+    web_interface.start_server('127.0.0.1', port, workers=workers, threads=threads)
+
+
+def free_port():
+    """Get a free local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    """Wait until the server accepts connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def run_client(port, duration):
+    """Request /api/status in a loop and return the number of successful responses"""
+    done = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.request('GET', '/api/status')
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        if response.status == 200:
+            done += 1
+    return done
+
+
+def bench_mode(workers, threads, clients, duration, slow_ms):
+    """Start a server in a subprocess and measure its request rate"""
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, __file__, '--serve', '--port', str(port),
+        '--workers', str(workers), '--threads', str(threads), '--slow-ms', str(slow_ms),
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError(f"Server on port {port} did not start")
+        with ProcessPoolExecutor(max_workers=clients) as executor:
+            start = time.perf_counter()
+            counts = list(executor.map(run_client, [port] * clients, [duration] * clients))
+            elapsed = time.perf_counter() - start
+        return sum(counts) / elapsed
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='HTTP serving benchmark')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent client processes')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds per mode')
+    parser.add_argument('--slow-ms', type=float, default=0, help='Simulated wait per request in milliseconds')
+    parser.add_argument('--modes', default='0x1,0x8,4x1,4x4', help='Comma separated <workers>x<threads> modes')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--workers', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--threads', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve(args.port, args.workers, args.threads, args.slow_ms)
+        return True
+    
+    print(f"{'workers':>8} {'threads':>8} {'req/s':>10}")
+    for mode in args.modes.split(','):
+        workers, threads = (int(value) for value in mode.split('x'))
+        rate = bench_mode(workers, threads, args.clients, args.duration, args.slow_ms)
+        print(f"{workers:>8} {threads:>8} {rate:>10.1f}")
+    
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
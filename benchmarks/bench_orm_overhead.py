@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - ORM Overhead Benchmark
+==========================================
+
+Measures the Python-side cost of the ORM: setting up model classes
+(startup) and single-record create, read and write calls, on an
+in-memory SQLite database so the numbers are not dominated by I/O.
+
+Usage: python benchmarks/bench_orm_overhead.py [--models 200] [--fields 40] [--calls 2000]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core_framework.database import DatabaseManager
+from core_framework.orm import (
+    BaseModel, CharField, IntegerField, FloatField, BooleanField,
+    ORMManager, Environment, models_registry, invalidate_field_triggers,
+)
+
+FIELD_TYPES = (CharField, IntegerField, FloatField, BooleanField)
+
+
+def make_model(index, field_count):
+    """Define a model class with ``field_count`` fields, defaults on every other one"""
+    attrs = {'_name': f'bench.overhead.{index}', '_table': f'bench_overhead_{index}'}
+    for position in range(field_count):
+        field_class = FIELD_TYPES[position % len(FIELD_TYPES)]
+        kwargs = {'string': f'Field {position}'}
+        if position % 2:
+            kwargs['default'] = {CharField: 'x', IntegerField: 0, FloatField: 0.0, BooleanField: False}[field_class]
+        attrs[f'field_{position}'] = field_class(**kwargs)
+    return type(f'BenchOverhead{index}', (BaseModel,), attrs)
+
+
+def bench_setup(model_count, field_count):
+    """Define models and look up their fields and columns once, as the first request would"""
+    start = time.perf_counter()
+    models = []
+    for index in range(model_count):
+        model_class = make_model(index, field_count)
+        model_class._get_fields()
+        model_class._get_column_names()
+        models.append(model_class)
+    return models, time.perf_counter() - start
+
+
+def bench_calls(model, calls):
+    """Time single-record ORM calls, returning seconds per call by operation"""
+    timings = {}
+    
+    start = time.perf_counter()
+    records = [model.create({'field_0': f'Item {index}', 'field_2': index * 1.5}) for index in range(calls)]
+    timings['create'] = (time.perf_counter() - start) / calls
+    
+    start = time.perf_counter()
+    for record in records:
+        record.read()
+    timings['read'] = (time.perf_counter() - start) / calls
+    
+    start = time.perf_counter()
+    for record in records:
+        record.write({'field_1': 7})
+    timings['write'] = (time.perf_counter() - start) / calls
+    
+    return timings
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='ORM overhead benchmark')
+    parser.add_argument('--models', type=int, default=200, help='Number of model classes to set up')
+    parser.add_argument('--fields', type=int, default=40, help='Fields per model')
+    parser.add_argument('--calls', type=int, default=2000, help='Single-record calls per operation')
+    args = parser.parse_args()
+    
+    saved_registry = dict(models_registry)
+    config = {'database': {'backend': 'sqlite', 'sqlite_path': ':memory:'}}
+    db = DatabaseManager(config)
+    if not db.initialize():
+        print("❌ Database not available")
+        return False
+    
+    try:
+        models, setup_time = bench_setup(args.models, args.fields)
+        print(f"setup of {args.models} models x {args.fields} fields: {setup_time * 1000:.1f} ms "
+              f"({setup_time / args.models * 1e6:.0f} us per model)")
+        
+        ORMManager(config, db)._create_model_table(models[0])
+        env = Environment(db)
+        for operation, seconds in bench_calls(env[models[0]._name], args.calls).items():
+            print(f"{operation:>8}: {seconds * 1e6:8.1f} us per call")
+    finally:
+        db.close()
+        models_registry.clear()
+        models_registry.update(saved_registry)
+        invalidate_field_triggers()
+    
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
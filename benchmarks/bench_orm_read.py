@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - ORM Read Benchmark
+======================================
+
+Compares per-row reads (one get_record call per id) with the batched
+BaseModel.read() path at 10, 1k and 100k ids.
+
+Usage: python benchmarks/bench_orm_read.py [--config erp.conf] [--backend sqlite] [--sizes 10,1000,100000]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core_framework.config import Config
+from core_framework.database import DatabaseManager
+from core_framework.orm import BaseModel, CharField, IntegerField, FloatField
+
+TABLE_NAME = 'bench_read_item'
+
+
+class BenchEnv:
+    """Minimal environment exposing the database manager"""
+    
+    def __init__(self, db):
+        self.db = db
+
+
+class BenchReadItem(BaseModel):
+    _name = 'bench.read.item'
+    _description = 'Read Benchmark Item'
+    _table = TABLE_NAME
+    
+    name = CharField(string='Name', size=64)
+    quantity = IntegerField(string='Quantity')
+    price = FloatField(string='Price')
+
+
+def setup_table(db, size):
+    """Create and fill the benchmark table"""
+    db.drop_table(TABLE_NAME)
+    db.create_table(TABLE_NAME, {
+        'id': 'SERIAL PRIMARY KEY',
+        'name': 'VARCHAR(64)',
+        'quantity': 'INTEGER',
+        'price': 'FLOAT',
+        'create_date': 'TIMESTAMP',
+        'write_date': 'TIMESTAMP',
+    })
+    rows = [{'name': f'Item {i}', 'quantity': i, 'price': i * 1.5} for i in range(size)]
+    return db.insert_many(TABLE_NAME, rows)
+
+
+def bench_per_row(db, ids):
+    """Read records one query at a time"""
+    start = time.perf_counter()
+    for record_id in ids:
+        db.get_record(TABLE_NAME, record_id)
+    return time.perf_counter() - start
+
+
+def bench_batched(model, ids):
+    """Read records through the batched ORM path"""
+    start = time.perf_counter()
+    model.browse(ids).read(['name', 'quantity', 'price'])
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='ORM read benchmark')
+    parser.add_argument('--config', help='Configuration file path')
+    parser.add_argument('--backend', choices=['postgresql', 'sqlite'], help='Override the configured database backend')
+    parser.add_argument('--sizes', default='10,1000,100000', help='Comma separated id counts')
+    args = parser.parse_args()
+    
+    config = Config(args.config)
+    if args.backend:
+        config.set('database.backend', args.backend)
+    db = DatabaseManager(config)
+    if not db.initialize():
+        print("❌ Database not available")
+        return False
+    
+    model = BenchReadItem(BenchEnv(db))
+    print(f"{'ids':>8} {'per-row (s)':>12} {'batched (s)':>12} {'speedup':>8}")
+    try:
+        for size in [int(value) for value in args.sizes.split(',')]:
+            ids = setup_table(db, size)
+            per_row = bench_per_row(db, ids)
+            batched = bench_batched(model, ids)
+            print(f"{size:>8} {per_row:>12.4f} {batched:>12.4f} {per_row / batched:>7.1f}x")
+    finally:
+        db.drop_table(TABLE_NAME)
+        db.close()
+    
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
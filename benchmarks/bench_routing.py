@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - Routing Benchmark
+=====================================
+
+Compares the route trie with a linear chain of path checks, the way the
+if/elif dispatch matched requests, at 10, 100 and 500 routes. Half the
+routes are static and half take an <int:...> parameter; the matched paths
+are spread over the whole table.
+
+Usage: python benchmarks/bench_routing.py [--routes 10,100,500] [--lookups 100000]
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core_framework.routing import Router
+
+
+def make_routes(count):
+    """Get route patterns and a path matching each of them"""
+    routes = []
+    for index in range(count):
+        if index % 2:
+            routes.append((f'/api/model{index}/record/<int:record_id>', f'/api/model{index}/record/{index}'))
+        else:
+            routes.append((f'/api/model{index}/list', f'/api/model{index}/list'))
+    return routes
+
+
+def compile_linear(routes):
+    """Build the linear chain: one equality or regex test per route, in order"""
+    chain = []
+    for pattern, path in routes:
+        if '<' in pattern:
+            regex = re.compile('^' + re.sub(r'<int:(\w+)>', r'(?P<\1>\\d+)', pattern) + '$')
+            chain.append((None, regex, pattern))
+        else:
+            chain.append((pattern, None, pattern))
+    return chain
+
+
+def match_linear(chain, path):
+    """Match a path against the chain, first hit wins"""
+    for static, regex, endpoint in chain:
+        if static is not None:
+            if path == static:
+                return endpoint, {}
+        else:
+            match = regex.match(path)
+            if match:
+                return endpoint, {name: int(value) for name, value in match.groupdict().items()}
+    raise LookupError(path)
+
+
+def bench(match, paths, lookups):
+    """Get the mean time per lookup in microseconds"""
+    start = time.perf_counter()
+    for index in range(lookups):
+        match(paths[index % len(paths)])
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='Routing benchmark')
+    parser.add_argument('--routes', default='10,100,500', help='Comma separated route counts')
+    parser.add_argument('--lookups', type=int, default=100000, help='Lookups per measurement')
+    args = parser.parse_args()
+    
+    print(f"{'routes':>8} {'linear (us)':>12} {'trie (us)':>10} {'speedup':>8}")
+    for count in [int(value) for value in args.routes.split(',')]:
+        routes = make_routes(count)
+        paths = [path for pattern, path in routes]
+        
+        router = Router()
+        for pattern, path in routes:
+            router.add(pattern, pattern, ['GET'])
+        chain = compile_linear(routes)
+        
+        # Both must agree before being timed
+        for path in paths:
+            assert router.match(path, 'GET') == match_linear(chain, path)
+        
+        linear = bench(lambda path: match_linear(chain, path), paths, args.lookups)
+        trie = bench(lambda path: router.match(path, 'GET'), paths, args.lookups)
+        print(f"{count:>8} {linear:>12.2f} {trie:>10.2f} {linear / trie:>7.1f}x")
+    
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
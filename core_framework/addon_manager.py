@@ -10,6 +10,7 @@ Addon management system for the standalone ERP system.
 import os
 import sys
 import importlib
+import importlib.util
 import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -152,6 +153,9 @@ class AddonManager:
             # Load views
             self._load_addon_views(addon_name)
             
+            # Load controllers, their routes are compiled when the web application starts
+            self._load_addon_controllers(addon_name)
+            
             # Load data
             self._load_addon_data(addon_name)
             
@@ -228,6 +232,39 @@ class AddonManager:
         except Exception as e:
             self.logger.error(f"Failed to load views for {addon_name}: {e}")
     
+    def _load_addon_controllers(self, addon_name: str):
+        """Load addon controllers
+        
+        Controllers subclass ``core_framework.routing.Controller`` and declare
+        their routes with ``core_framework.routing.route``; importing them
+        registers them with the router. Controllers written for another
+        framework fail to import and are not served.
+        """
+        try:
+            addon_path = self.addons[addon_name]['path']
+            init_path = os.path.join(addon_path, 'controllers', '__init__.py')
+            
+            if not os.path.exists(init_path):
+                return
+            
+            module_name = f"addons.{addon_name}.controllers"
+            if module_name in sys.modules:
+                return
+            spec = importlib.util.spec_from_file_location(
+                module_name, init_path, submodule_search_locations=[os.path.dirname(init_path)]
+            )
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except Exception:
+                del sys.modules[module_name]
+                raise
+            self.logger.info(f"Loaded controllers of {addon_name}")
+            
+        except Exception as e:
+            self.logger.warning(f"Controllers of {addon_name} are not served, they failed to load: {e}")
+    
     def _load_addon_data(self, addon_name: str):
         """Load addon data"""
         try:
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - Response Compression
+========================================
+
+Content-Encoding negotiation and on-the-fly compression of responses, and
+an incremental JSON encoder for streamed API responses.
+
+Buffered responses are compressed when they are larger than
+``web.compression_min_size``; streamed responses are compressed chunk by
+chunk with a flush after each one, so the client can decode what it has
+received so far.
+"""
+
+import json
+import zlib
+from collections.abc import Iterator, Mapping
+
+# Encodings compressed on the fly, in order of preference
+ENCODINGS = ('gzip', 'deflate')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+
+# Size of the chunks of a streamed JSON response
+JSON_CHUNK_SIZE = 16 * 1024
+
+# zlib window bits of each encoding: gzip container, zlib container for deflate
+_WBITS = {'gzip': 31, 'deflate': 15}
+
+def accepted_encodings(accept_encoding):
+    """Get the encodings of an Accept-Encoding header, those refused with q=0 left out"""
+    accepted = set()
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name)
+    return accepted
+
+def negotiate_encoding(accept_encoding, available=ENCODINGS):
+    """Pick the first of the available encodings the client accepts, or None"""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in available:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
+
+def is_compressible(content_type):
+    """Check whether a content type benefits from compression"""
+    return (content_type or '').startswith(COMPRESSIBLE_TYPES)
+
+def compress(data, encoding, level=6):
+    """Compress a whole body"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    return compressor.compress(data) + compressor.flush()
+
+def compress_chunks(chunks, encoding, level=6):
+    """Compress an iterable of chunks, flushing after each one"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def iter_json(value, encoder=None):
+    """Encode a value as JSON piece by piece
+    
+    Lists, tuples, generators and other iterators are written item by item
+    as arrays, so a generator of records is never held in memory whole.
+    """
+    if encoder is None:
+        encoder = json.JSONEncoder()
+    if isinstance(value, Mapping):
+        yield '{'
+        for index, (key, item) in enumerate(value.items()):
+            if isinstance(key, (int, float, bool)) or key is None:
+                key = encoder.encode(key)
+            elif not isinstance(key, str):
+                raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+            yield (', ' if index else '') + encoder.encode(key) + ': '
+            yield from iter_json(item, encoder)
+        yield '}'
+    elif isinstance(value, (list, tuple, Iterator)):
+        yield '['
+        for index, item in enumerate(value):
+            if index:
+                yield ', '
+            yield from iter_json(item, encoder)
+        yield ']'
+    else:
+        yield encoder.encode(value)
+
+def iter_json_chunks(value, chunk_size=JSON_CHUNK_SIZE):
+    """Encode a value as JSON in UTF-8 chunks of about ``chunk_size`` bytes"""
+    pieces = []
+    size = 0
+    for piece in iter_json(value):
+        pieces.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(pieces).encode('utf-8')
+            pieces = []
+            size = 0
+    if pieces:
+        yield ''.join(pieces).encode('utf-8')
@@ -44,6 +44,9 @@ class Config:
         return {
             # Database Configuration
             'database': {
+                'backend': 'postgresql',
+                'sqlite_path': ':memory:',
+                'sqlite_journal_mode': 'wal',
                 'host': 'localhost',
                 'port': 5432,
                 'user': 'erp_user',
@@ -51,7 +54,24 @@ class Config:
                 'name': 'kids_clothing_erp',
                 'pool_size': 20,
                 'max_overflow': 30,
-                'echo': False
+                'pool_min_size': 1,
+                'pool_timeout': 30,
+                'pool_max_lifetime': 3600,
+                'pool_leak_timeout': 300,
+                'pool_validation_interval': 30,
+                'statement_timeout': 0,
+                'replicas': [],
+                'replica_max_lag': 30,
+                'replica_lag_check_interval': 5,
+                'query_instrumentation': True,
+                'slow_query_threshold': 200,
+                'n_plus_one_threshold': 10,
+                'echo': False,
+                'insert_batch_size': 1000,
+                'read_batch_size': 5000,
+                'write_batch_size': 5000,
+                'copy_threshold': 10000,
+                'prepared_statement_cache_size': 256
             },
             
             # Server Configuration
@@ -91,7 +111,15 @@ class Config:
                 'static_path': 'static',
                 'template_path': 'templates',
                 'debug': False,
-                'theme': 'kids_clothing'
+                'theme': 'kids_clothing',
+                'workers': 0,
+                'threads': 8,
+                'worker_max_requests': 10000,
+                'worker_graceful_timeout': 30,
+                'static_cache_size': 16777216,  # 16MB
+                'static_sendfile_threshold': 65536,
+                'compression_min_size': 1024,
+                'compression_level': 6
             },
             
             # Indian Localization
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - Connection Pool
+===================================
+
+Thread-safe PostgreSQL connection pool with checkout timeouts, leak
+detection, validation on borrow and usage statistics.
+"""
+
+import time
+import logging
+import threading
+import traceback
+import bisect
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+# Upper bounds of the checkout wait-time histogram buckets, in seconds
+WAIT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+class PoolTimeout(PoolError):
+    """No connection became available within the checkout timeout"""
+    pass
+
+class _PooledConnection:
+    """Bookkeeping for one connection owned by the pool"""
+    
+    __slots__ = ('connection', 'created_at', 'last_used', 'checked_out_at', 'owner', 'stack',
+                 'leak_reported', 'statement_timeout')
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.checked_out_at = None
+        self.owner = None
+        self.stack = None
+        self.leak_reported = False
+        self.statement_timeout = None
+
+class ConnectionPool:
+    """Connection pool replacing psycopg2's ThreadedConnectionPool"""
+    
+    def __init__(self, minconn: int, maxconn: int, max_idle: int = None, checkout_timeout: float = 30,
+                 max_lifetime: float = 3600, leak_timeout: float = 300, validation_interval: float = 30,
+                 statement_timeout: int = 0, **connect_kwargs):
+        """Initialize the pool and open ``minconn`` connections
+        
+        ``max_idle`` connections are kept when returned, the rest up to
+        ``maxconn`` are opened on demand and closed again. Timeouts are in
+        seconds except ``statement_timeout``, in milliseconds (0 disables).
+        """
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_idle = max_idle if max_idle is not None else maxconn
+        self.checkout_timeout = checkout_timeout
+        self.max_lifetime = max_lifetime
+        self.leak_timeout = leak_timeout
+        self.validation_interval = validation_interval
+        self.statement_timeout = statement_timeout
+        self.connect_kwargs = connect_kwargs
+        self.logger = logging.getLogger('ERP.Database.Pool')
+        
+        self._condition = threading.Condition()
+        self._idle = []
+        self._in_use = {}
+        # Connections being opened or validated for a checkout
+        self._pending = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'discarded': 0,
+            'validation_failures': 0,
+            'leaks': 0,
+        }
+        self._wait_histogram = [0] * (len(WAIT_TIME_BUCKETS) + 1)
+        self._wait_time_total = 0.0
+        
+        for _ in range(minconn):
+            self._idle.append(self._connect())
+    
+    def _connect(self):
+        """Open a new connection"""
+        connection = psycopg2.connect(**self.connect_kwargs)
+        pooled = _PooledConnection(connection)
+        self._stats['created'] += 1
+        return pooled
+    
+    def _discard(self, pooled):
+        """Close a connection that leaves the pool"""
+        self._stats['discarded'] += 1
+        try:
+            if not pooled.connection.closed:
+                pooled.connection.close()
+        except Exception as e:
+            self.logger.warning(f"Failed to close pooled connection: {e}")
+    
+    def _is_expired(self, pooled, now):
+        """Check if a connection outlived its maximum lifetime"""
+        return bool(self.max_lifetime) and now - pooled.created_at > self.max_lifetime
+    
+    def _validate(self, pooled, now):
+        """Check that a connection is still usable before handing it out"""
+        connection = pooled.connection
+        if connection.closed or connection.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            self._stats['validation_failures'] += 1
+            return False
+        if now - pooled.last_used < self.validation_interval:
+            return True
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            connection.rollback()
+            return True
+        except Exception:
+            self._stats['validation_failures'] += 1
+            return False
+    
+    def _apply_statement_timeout(self, pooled, statement_timeout):
+        """Set the session statement timeout for this checkout if it differs"""
+        if pooled.statement_timeout == statement_timeout:
+            return
+        connection = pooled.connection
+        cursor = connection.cursor()
+        # Committed right away, a rolled back SET would silently revert
+        cursor.execute("SET statement_timeout = %s", (int(statement_timeout),))
+        cursor.close()
+        connection.commit()
+        pooled.statement_timeout = statement_timeout
+    
+    def getconn(self, timeout: float = None, statement_timeout: int = None):
+        """Check out a connection, waiting up to ``timeout`` seconds for one"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        
+        while True:
+            with self._condition:
+                self._wait_for_slot(deadline, timeout)
+                # Most recently used first, its server backend is warm
+                pooled = self._idle.pop() if self._idle else None
+                self._pending += 1
+            
+            try:
+                now = time.monotonic()
+                if pooled is None:
+                    pooled = self._connect()
+                elif self._is_expired(pooled, now) or not self._validate(pooled, now):
+                    self._discard(pooled)
+                    pooled = None
+                    continue
+                self._apply_statement_timeout(
+                    pooled, self.statement_timeout if statement_timeout is None else statement_timeout
+                )
+            except Exception:
+                if pooled is not None:
+                    self._discard(pooled)
+                    pooled = None
+                raise
+            finally:
+                with self._condition:
+                    self._pending -= 1
+                    if pooled is None:
+                        self._condition.notify()
+                    else:
+                        self._check_out(pooled, now, now - started)
+            return pooled.connection
+    
+    def _wait_for_slot(self, deadline, timeout):
+        """Wait until an idle connection or room for a new one is available"""
+        if self._closed:
+            raise PoolError("connection pool is closed")
+        self._report_leaks()
+        if self._idle or len(self._in_use) + self._pending < self.maxconn:
+            return
+        
+        self._waiting += 1
+        try:
+            while not self._idle and len(self._in_use) + self._pending >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._report_leaks()
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {timeout}s "
+                        f"({len(self._in_use)} in use, {self._waiting - 1} other waiting)"
+                    )
+                self._condition.wait(remaining)
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+        finally:
+            self._waiting -= 1
+    
+    def _check_out(self, pooled, now, waited):
+        """Record a connection as checked out by the current thread"""
+        self._stats['checkouts'] += 1
+        self._wait_time_total += waited
+        self._wait_histogram[bisect.bisect_left(WAIT_TIME_BUCKETS, waited)] += 1
+        pooled.checked_out_at = now
+        pooled.owner = threading.current_thread().name
+        # Leave out the frames of getconn and this method, the caller is the checkout site
+        pooled.stack = traceback.extract_stack(limit=14)[:-2] if self.leak_timeout else None
+        pooled.leak_reported = False
+        self._in_use[id(pooled.connection)] = pooled
+    
+    def putconn(self, connection, close: bool = False):
+        """Return a checked out connection to the pool"""
+        with self._condition:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            raise PoolError("trying to put unkeyed connection")
+        
+        now = time.monotonic()
+        pooled.last_used = now
+        pooled.checked_out_at = pooled.owner = pooled.stack = None
+        keep = not close and not self._closed and not connection.closed and not self._is_expired(pooled, now)
+        if keep and connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                keep = False
+        
+        with self._condition:
+            if keep and len(self._idle) < self.max_idle:
+                self._idle.append(pooled)
+                pooled = None
+            self._condition.notify()
+        if pooled is not None:
+            self._discard(pooled)
+    
+    def _report_leaks(self):
+        """Log connections held longer than the leak timeout, once each"""
+        if not self.leak_timeout:
+            return
+        now = time.monotonic()
+        for pooled in self._in_use.values():
+            if pooled.leak_reported or now - pooled.checked_out_at < self.leak_timeout:
+                continue
+            pooled.leak_reported = True
+            self._stats['leaks'] += 1
+            stack = ''.join(traceback.format_list(pooled.stack or []))
+            self.logger.warning(
+                f"Connection held by thread {pooled.owner} for {now - pooled.checked_out_at:.1f}s, "
+                f"possible leak. Checked out at:\n{stack}"
+            )
+    
+    @property
+    def in_use(self):
+        """Number of checked out connections"""
+        return len(self._in_use)
+    
+    def get_stats(self):
+        """Get pool usage statistics"""
+        with self._condition:
+            self._report_leaks()
+            histogram = {}
+            for bound, count in zip(WAIT_TIME_BUCKETS + (float('inf'),), self._wait_histogram):
+                histogram['+Inf' if bound == float('inf') else str(bound)] = count
+            checkouts = self._stats['checkouts']
+            return dict(
+                self._stats,
+                in_use=len(self._in_use),
+                idle=len(self._idle),
+                waiting=self._waiting,
+                max_connections=self.maxconn,
+                wait_time_avg=self._wait_time_total / checkouts if checkouts else 0.0,
+                wait_time_histogram=histogram,
+            )
+    
+    def closeall(self):
+        """Close every connection and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            connections = self._idle + list(self._in_use.values())
+            self._idle = []
+            self._in_use = {}
+            self._condition.notify_all()
+        for pooled in connections:
+            self._discard(pooled)
@@ -7,21 +7,80 @@ Kids Clothing ERP - Database Manager
 Database management for the standalone ERP system.
 """
 
+import io
+import re
 import logging
+import threading
+import time
+import itertools
+import hashlib
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
 import psycopg2
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
-from typing import Dict, List, Any, Optional
+from psycopg2.extras import RealDictCursor, execute_values
+from typing import Dict, List, Any, Optional, Iterator
+from datetime import date, datetime
 import json
+import importlib
+from .connection_pool import ConnectionPool
+from .instrumentation import QueryInstrumentation, InstrumentedConnection
+
+# Replication lag of a standby in seconds, 0 on a server that is not replaying
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END AS lag
+"""
+
+# Conflict target expression of an optional unique key column, NULL counting as its empty value
+_COALESCE_KEY = re.compile(r"^COALESCE\(\w+, (?P<empty>''|-?\d+)\)$")
+
+# Manager class of each value of the 'database.backend' setting, as (module, class)
+BACKENDS = {
+    'postgresql': ('.database', 'DatabaseManager'),
+    'sqlite': ('.sqlite_backend', 'SQLiteDatabaseManager'),
+}
+
+def get_backend_class(backend: str):
+    """Get the DatabaseManager class implementing a backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown database backend: {backend}")
+    module_name, class_name = BACKENDS[backend]
+    return getattr(importlib.import_module(module_name, __package__), class_name)
 
 class DatabaseManager:
-    """Database Manager for ERP System"""
+    """Database Manager for ERP System
+    
+    Instantiating DatabaseManager creates the manager of the configured
+    ``database.backend``; this class implements PostgreSQL.
+    """
+    
+    def __new__(cls, config):
+        """Create the manager of the configured backend"""
+        if cls is DatabaseManager:
+            cls = get_backend_class(config.get('database', {}).get('backend', 'postgresql'))
+        return super().__new__(cls)
     
     def __init__(self, config):
         """Initialize database manager"""
         self.config = config
         self.connection_pool = None
         self.logger = logging.getLogger('ERP.Database')
+        # Connection pinned by the transaction running in the current thread
+        self._local = threading.local()
+        self._cursor_names = itertools.count()
+        # Prepared statement names per connection, least recently used first
+        self._statements = weakref.WeakKeyDictionary()
+        self._statements_lock = threading.Lock()
+        self._statements_generation = 0
+        self._statement_names = {}
+        self.statement_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self.instrumentation = QueryInstrumentation(config)
+        # Read replicas and the replica pool of each connection checked out from one
+        self.replicas = []
+        self._replica_connections = {}
         
     def initialize(self):
         """Initialize database connection pool"""
@@ -29,10 +88,18 @@ class DatabaseManager:
             # Get database configuration
             db_config = self.config.get('database')
             
-            # Create connection pool
-            self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
-                minconn=1,
-                maxconn=db_config.get('pool_size', 20),
+            # Create connection pool, overflow connections are closed when returned
+            pool_size = db_config.get('pool_size', 20)
+            self.connection_pool = ConnectionPool(
+                minconn=db_config.get('pool_min_size', 1),
+                maxconn=pool_size + db_config.get('max_overflow', 0),
+                max_idle=pool_size,
+                checkout_timeout=db_config.get('pool_timeout', 30),
+                max_lifetime=db_config.get('pool_max_lifetime', 3600),
+                leak_timeout=db_config.get('pool_leak_timeout', 300),
+                validation_interval=db_config.get('pool_validation_interval', 30),
+                statement_timeout=db_config.get('statement_timeout', 0),
+                connection_factory=InstrumentedConnection,
                 host=db_config['host'],
                 port=db_config['port'],
                 user=db_config['user'],
@@ -42,6 +109,9 @@ class DatabaseManager:
             
             self.logger.info("Database connection pool initialized")
             
+            for replica_config in db_config.get('replicas', []):
+                self._add_replica(db_config, replica_config)
+            
             # Test connection
             self._test_connection()
             
@@ -58,28 +128,233 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("SELECT 1")
             cursor.close()
-            conn.close()
+            self.return_connection(conn)
             self.logger.info("Database connection test successful")
         except Exception as e:
             self.logger.error(f"Database connection test failed: {e}")
             raise
     
-    def get_connection(self):
-        """Get database connection from pool"""
+    def _add_replica(self, db_config: Dict[str, Any], replica_config: Dict[str, Any]):
+        """Create the pool of a read replica, inheriting unset settings from the primary"""
+        settings = dict(db_config, **replica_config)
+        name = replica_config.get('label') or f"{settings['host']}:{settings['port']}"
+        try:
+            replica_pool = ConnectionPool(
+                minconn=0,
+                maxconn=settings.get('pool_size', 20),
+                checkout_timeout=settings.get('pool_timeout', 30),
+                max_lifetime=settings.get('pool_max_lifetime', 3600),
+                leak_timeout=settings.get('pool_leak_timeout', 300),
+                validation_interval=settings.get('pool_validation_interval', 30),
+                statement_timeout=settings.get('statement_timeout', 0),
+                connection_factory=InstrumentedConnection,
+                host=settings['host'],
+                port=settings['port'],
+                user=settings['user'],
+                password=settings['password'],
+                database=settings['name']
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize read replica {name}: {e}")
+            return
+        
+        self.replicas.append({
+            'name': name,
+            'pool': replica_pool,
+            'lag': None,
+            'checked_at': None,
+            'lock': threading.Lock(),
+        })
+        self.logger.info(f"Read replica {name} initialized")
+    
+    def _get_replica_lag(self, replica: Dict[str, Any], now: float) -> Optional[float]:
+        """Get the replication lag of a replica, measured at most once per check interval"""
+        interval = self.config.get('database', {}).get('replica_lag_check_interval', 5)
+        if replica['checked_at'] is not None and now - replica['checked_at'] < interval:
+            return replica['lag']
+        if not replica['lock'].acquire(blocking=False):
+            # Another thread is measuring it
+            return replica['lag']
+        
+        try:
+            replica['checked_at'] = now
+            conn = replica['pool'].getconn(timeout=1)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(REPLICA_LAG_QUERY)
+                lag = cursor.fetchone()[0]
+                cursor.close()
+                conn.rollback()
+            finally:
+                replica['pool'].putconn(conn)
+            replica['lag'] = float(lag or 0)
+        except Exception as e:
+            self.logger.warning(f"Read replica {replica['name']} unavailable: {e}")
+            replica['lag'] = None
+        finally:
+            replica['lock'].release()
+        return replica['lag']
+    
+    def _select_replica(self) -> Optional[Dict[str, Any]]:
+        """Pick the least busy replica that is recent enough for the current thread
+        
+        Outside replica_reads() a replica must also be known to have replayed
+        the last commit of the thread, so the thread reads its own writes.
+        """
+        now = time.monotonic()
+        max_lag = self.config.get('database', {}).get('replica_max_lag', 30)
+        last_write = getattr(self._local, 'last_write', None)
+        if getattr(self._local, 'replica_reads', 0):
+            last_write = None
+        
+        selected = None
+        for replica in self.replicas:
+            lag = self._get_replica_lag(replica, now)
+            if lag is None:
+                continue
+            # Point in primary time the replica had replayed up to when measured
+            horizon = replica['checked_at'] - lag
+            if now - horizon > max_lag or (last_write is not None and horizon < last_write):
+                continue
+            if selected is None or replica['pool'].in_use < selected['pool'].in_use:
+                selected = replica
+        return selected
+    
+    @contextmanager
+    def replica_reads(self):
+        """Let read-only statements in the block use any replica within replica_max_lag
+        
+        Meant for reports and analytics, which can tolerate slightly stale
+        data even right after the thread wrote something. Only statements
+        run with ``readonly`` go to a replica, in the block or not.
+        """
+        self._local.replica_reads = getattr(self._local, 'replica_reads', 0) + 1
+        try:
+            yield
+        finally:
+            self._local.replica_reads -= 1
+    
+    def get_connection(self, statement_timeout: int = None, readonly: bool = False):
+        """Get database connection from pool, or the one pinned by the current transaction
+        
+        ``statement_timeout`` (milliseconds) overrides the configured one
+        for this checkout; it does not apply to a pinned connection.
+        ``readonly`` connections come from a replica when one is eligible;
+        a transaction always keeps every statement on the primary.
+        """
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            return pinned
         if not self.connection_pool:
             raise Exception("Database connection pool not initialized")
-        return self.connection_pool.getconn()
+        
+        if readonly and self.replicas:
+            replica = self._select_replica()
+            if replica is not None:
+                try:
+                    conn = replica['pool'].getconn(statement_timeout=statement_timeout)
+                    self._replica_connections[id(conn)] = replica['pool']
+                    conn.instrumentation = self.instrumentation
+                    return conn
+                except Exception as e:
+                    self.logger.warning(f"Falling back to primary, read replica {replica['name']} failed: {e}")
+                    replica['lag'] = None
+        
+        conn = self.connection_pool.getconn(statement_timeout=statement_timeout)
+        conn.instrumentation = self.instrumentation
+        return conn
     
     def return_connection(self, conn):
-        """Return connection to pool"""
-        if self.connection_pool:
+        """Return connection to pool, unless a transaction still holds it"""
+        if conn is getattr(self._local, 'connection', None):
+            return
+        replica_pool = self._replica_connections.pop(id(conn), None)
+        if replica_pool is not None:
+            replica_pool.putconn(conn)
+        elif self.connection_pool:
             self.connection_pool.putconn(conn)
     
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict]:
-        """Execute SELECT query and return results"""
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        if not self.connection_pool:
+            return {}
+        stats = self.connection_pool.get_stats()
+        if self.replicas:
+            stats['replicas'] = {
+                replica['name']: dict(replica['pool'].get_stats(), lag=replica['lag'])
+                for replica in self.replicas
+            }
+        return stats
+    
+    def in_transaction(self) -> bool:
+        """Check if the current thread runs inside transaction()"""
+        return getattr(self._local, 'connection', None) is not None
+    
+    def _commit(self, conn):
+        """Commit a statement, leaving it to the transaction when one is open"""
+        if conn is not getattr(self._local, 'connection', None):
+            conn.commit()
+            self._local.last_write = time.monotonic()
+    
+    def _rollback(self, conn):
+        """Roll back a statement, leaving it to the transaction when one is open"""
+        if conn is not getattr(self._local, 'connection', None):
+            conn.rollback()
+    
+    @contextmanager
+    def transaction(self, statement_timeout: int = None):
+        """Run a block on one pinned connection and commit once at the end
+        
+        Every DatabaseManager call made by the thread inside the block uses
+        the pinned connection. Nested blocks become savepoints, so a failing
+        inner block is rolled back without aborting the outer one.
+        """
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            self._local.depth += 1
+            savepoint = f"sp_{self._local.depth}"
+            cursor = conn.cursor()
+            cursor.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield conn
+            except Exception:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                raise
+            else:
+                cursor.execute(f"RELEASE SAVEPOINT {savepoint}")
+            finally:
+                cursor.close()
+                self._local.depth -= 1
+            return
+        
+        conn = self.get_connection(statement_timeout)
+        self._local.connection = conn
+        self._local.depth = 0
+        try:
+            with self.instrumentation.scope('transaction'):
+                yield conn
+            if conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                # A failed statement was swallowed inside the block, COMMIT would silently roll back
+                raise Exception("Transaction aborted by an earlier error")
+            conn.commit()
+            self._local.last_write = time.monotonic()
+        except Exception as e:
+            conn.rollback()
+            self.logger.error(f"Transaction rolled back: {e}")
+            raise
+        finally:
+            self._local.connection = None
+            self.return_connection(conn)
+    
+    def execute_query(self, query: str, params: tuple = None, readonly: bool = False) -> List[Dict]:
+        """Execute SELECT query and return results
+        
+        ``readonly`` declares the statement modifies nothing and takes no
+        row locks, so it may run on a read replica.
+        """
         conn = None
         try:
-            conn = self.get_connection()
+            conn = self.get_connection(readonly=readonly)
             cursor = conn.cursor(cursor_factory=RealDictCursor)
             cursor.execute(query, params)
             results = cursor.fetchall()
@@ -92,6 +367,103 @@ class DatabaseManager:
             if conn:
                 self.return_connection(conn)
     
+    def stream_query(self, query: str, params: tuple = None, itersize: int = None,
+                     as_dict: bool = True, readonly: bool = False) -> Iterator:
+        """Yield the rows of a SELECT query without loading them all
+        
+        Rows come from a named server-side cursor, ``itersize`` rows per
+        round trip, so memory use does not grow with the result size.
+        ``readonly`` statements may run on a read replica.
+        """
+        if itersize is None:
+            itersize = self.config.get('database', {}).get('read_batch_size', 5000)
+        
+        conn = None
+        cursor = None
+        try:
+            conn = self.get_connection(readonly=readonly)
+            cursor = conn.cursor(
+                name=f"stream_{next(self._cursor_names)}",
+                cursor_factory=RealDictCursor if as_dict else None
+            )
+            cursor.itersize = itersize
+            cursor.execute(query, params)
+            for row in cursor:
+                yield row
+            cursor.close()
+            cursor = None
+            # Nothing to keep, a read ends its transaction by rolling back
+            self._rollback(conn)
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Streaming query failed: {e}")
+            raise
+        finally:
+            if cursor is not None and not cursor.closed:
+                # The consumer stopped early, release the server-side cursor
+                try:
+                    cursor.close()
+                    self._rollback(conn)
+                except Exception:
+                    pass
+            if conn:
+                self.return_connection(conn)
+    
+    def _execute_prepared(self, cursor, shape: tuple, query: str, params: tuple = ()):
+        """Execute a statement through a server-side prepared statement
+        
+        ``query`` uses ``$n`` placeholders and is prepared once per connection
+        under a name derived from ``shape``, the parts that make up its text.
+        """
+        conn = cursor.connection
+        name = self._statement_names.get(shape)
+        if name is None:
+            name = self._statement_names[shape] = 'stmt_' + hashlib.sha1(repr(shape).encode()).hexdigest()[:20]
+        
+        with self._statements_lock:
+            generation, statements = self._statements.get(conn, (None, None))
+            if generation != self._statements_generation:
+                stale = statements is not None
+                statements = OrderedDict()
+                self._statements[conn] = (self._statements_generation, statements)
+            else:
+                stale = False
+            hit = name in statements
+            self.statement_stats['hits' if hit else 'misses'] += 1
+        
+        if stale:
+            # The schema changed since these statements were planned
+            cursor.execute("DEALLOCATE ALL")
+        
+        if hit:
+            statements.move_to_end(name)
+        else:
+            cursor.execute(f"PREPARE {name} AS {query}")
+            statements[name] = True
+            max_size = self.config.get('database', {}).get('prepared_statement_cache_size', 256)
+            while len(statements) > max_size:
+                evicted, _ = statements.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+                with self._statements_lock:
+                    self.statement_stats['evictions'] += 1
+        
+        try:
+            if params:
+                cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", tuple(params))
+            else:
+                cursor.execute(f"EXECUTE {name}")
+        except Exception:
+            # Start over on this connection, the statement may be the cause
+            with self._statements_lock:
+                self._statements[conn] = (None, statements)
+            raise
+    
+    def invalidate_prepared_statements(self):
+        """Drop prepared statements on every connection before their next use"""
+        with self._statements_lock:
+            self._statements_generation += 1
+    
     def execute_update(self, query: str, params: tuple = None) -> int:
         """Execute UPDATE/INSERT/DELETE query and return affected rows"""
         conn = None
@@ -99,13 +471,13 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute(query, params)
-            conn.commit()
+            self._commit(conn)
             affected_rows = cursor.rowcount
             cursor.close()
             return affected_rows
         except Exception as e:
             if conn:
-                conn.rollback()
+                self._rollback(conn)
             self.logger.error(f"Update execution failed: {e}")
             raise
         finally:
@@ -121,17 +493,76 @@ class DatabaseManager:
             
             query = f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(column_definitions)})"
             self.execute_update(query)
+            self.invalidate_prepared_statements()
             self.logger.info(f"Table {table_name} created successfully")
             return True
         except Exception as e:
             self.logger.error(f"Failed to create table {table_name}: {e}")
             return False
     
+    def execute_ddl(self, statement: str, autocommit: bool = False) -> None:
+        """Execute a schema statement, optionally outside a transaction"""
+        if autocommit and self.in_transaction():
+            raise Exception("Cannot run an autocommit statement inside a transaction")
+        
+        conn = None
+        try:
+            conn = self.get_connection()
+            if autocommit:
+                # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+                conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(statement)
+            if not autocommit:
+                self._commit(conn)
+            cursor.close()
+            self.invalidate_prepared_statements()
+        except Exception as e:
+            if conn and not autocommit:
+                self._rollback(conn)
+            self.logger.error(f"DDL execution failed: {e}")
+            raise
+        finally:
+            if conn:
+                if autocommit:
+                    conn.autocommit = False
+                self.return_connection(conn)
+    
+    def table_exists(self, table_name: str) -> bool:
+        """Check if a table exists in the current schema"""
+        query = "SELECT 1 FROM information_schema.tables WHERE table_schema = current_schema() AND table_name = %s"
+        return bool(self.execute_query(query, (table_name,)))
+    
+    def get_table_columns(self, table_name: str) -> Dict[str, str]:
+        """Get the columns of a table and their data types"""
+        query = (
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s"
+        )
+        return {row['column_name']: row['data_type'] for row in self.execute_query(query, (table_name,))}
+    
+    def get_table_indexes(self, table_name: str) -> List[str]:
+        """Get the index names of a table"""
+        query = "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s"
+        return [row['indexname'] for row in self.execute_query(query, (table_name,))]
+    
+    def get_table_unique_indexes(self, table_name: str) -> List[str]:
+        """Get the names of the unique indexes of a table, those of constraints and primary keys left out"""
+        query = """
+            SELECT index_class.relname AS indexname
+            FROM pg_index
+            JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+            WHERE pg_index.indrelid = to_regclass(%s) AND pg_index.indisunique AND NOT pg_index.indisprimary
+                AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid)
+        """
+        return [row['indexname'] for row in self.execute_query(query, (table_name,))]
+    
     def drop_table(self, table_name: str) -> bool:
         """Drop table"""
         try:
             query = f"DROP TABLE IF EXISTS {table_name}"
             self.execute_update(query)
+            self.invalidate_prepared_statements()
             self.logger.info(f"Table {table_name} dropped successfully")
             return True
         except Exception as e:
@@ -140,42 +571,220 @@ class DatabaseManager:
     
     def insert_record(self, table_name: str, data: Dict[str, Any]) -> int:
         """Insert record and return ID"""
+        conn = None
         try:
-            columns = list(data.keys())
+            columns = tuple(data.keys())
             values = list(data.values())
-            placeholders = ['%s'] * len(values)
+            placeholders = [f"${position}" for position in range(1, len(values) + 1)]
             
             query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING id"
             conn = self.get_connection()
             cursor = conn.cursor()
-            cursor.execute(query, values)
+            self._execute_prepared(cursor, ('insert', table_name, columns), query, values)
             record_id = cursor.fetchone()[0]
-            conn.commit()
+            self._commit(conn)
             cursor.close()
-            self.return_connection(conn)
             
             return record_id
         except Exception as e:
+            if conn:
+                self._rollback(conn)
             self.logger.error(f"Failed to insert record: {e}")
             raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def insert_many(self, table_name: str, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert several records in one transaction and return IDs in input order"""
+        if not rows:
+            return []
+        
+        db_config = self.config.get('database', {})
+        batch_size = db_config.get('insert_batch_size', 1000)
+        copy_threshold = db_config.get('copy_threshold', 10000)
+        
+        # Group row positions by column set so each group shares one statement
+        groups = {}
+        for index, row in enumerate(rows):
+            groups.setdefault(tuple(row.keys()), []).append(index)
+        
+        ids = [None] * len(rows)
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            for columns, positions in groups.items():
+                values = [tuple(rows[i][col] for col in columns) for i in positions]
+                if 'id' in columns:
+                    id_index = columns.index('id')
+                    group_ids = [value[id_index] for value in values]
+                elif len(values) == 1:
+                    # One row has no order to lose, RETURNING saves the sequence round trip
+                    placeholders = ', '.join(f"${position}" for position in range(1, len(columns) + 1))
+                    query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders}) RETURNING id"
+                    self._execute_prepared(cursor, ('insert', table_name, columns), query, values[0])
+                    ids[positions[0]] = cursor.fetchone()[0]
+                    continue
+                else:
+                    # RETURNING does not promise the order of VALUES, so the ids are taken first
+                    group_ids = self._reserve_ids(cursor, table_name, len(values))
+                    columns = ('id',) + columns
+                    values = [(record_id,) + value for record_id, value in zip(group_ids, values)]
+                if copy_threshold and len(values) >= copy_threshold:
+                    self._copy_rows(cursor, table_name, columns, values)
+                else:
+                    query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES %s"
+                    execute_values(cursor, query, values, page_size=batch_size)
+                for position, record_id in zip(positions, group_ids):
+                    ids[position] = record_id
+            self._commit(conn)
+            cursor.close()
+            return ids
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Failed to insert records into {table_name}: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def upsert_many(self, table_name: str, rows: List[Dict[str, Any]], conflict_columns: List[str],
+                    update_columns: Dict[str, Optional[str]], conflict_target: List[str] = None) -> List[tuple]:
+        """Insert rows, updating those that conflict, and return (id, inserted) in input order
+        
+        ``update_columns`` maps columns to the SQL expression they are set to
+        on conflict; None sets ``EXCLUDED.<column>``, for rows giving it.
+        ``conflict_target`` gives the expressions of the unique index when
+        they are not the bare ``conflict_columns``.
+        """
+        if not rows:
+            return []
+        
+        batch_size = self.config.get('database', {}).get('insert_batch_size', 1000)
+        conflict_target = conflict_target or conflict_columns
+        
+        # One statement cannot update a row twice, so a repeated key waits for a later round
+        keys = [self._conflict_key(row, conflict_columns, conflict_target) for row in rows]
+        statements = {}
+        rounds = {}
+        for index, (row, key) in enumerate(zip(rows, keys)):
+            round_number = rounds.get(key, 0)
+            rounds[key] = round_number + 1
+            statements.setdefault((round_number, tuple(row.keys())), []).append(index)
+        
+        results = [None] * len(rows)
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            for (round_number, columns), positions in sorted(statements.items(), key=lambda item: item[0][0]):
+                set_clauses = [
+                    f"{column} = {expression or f'EXCLUDED.{column}'}"
+                    for column, expression in update_columns.items()
+                    if expression is not None or column in columns
+                ]
+                if not set_clauses:
+                    # A no-op update still returns the ids of existing rows
+                    set_clauses = [f"{conflict_columns[0]} = EXCLUDED.{conflict_columns[0]}"]
+                query = (
+                    f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES %s "
+                    f"ON CONFLICT ({', '.join(conflict_target)}) "
+                    f"DO UPDATE SET {', '.join(set_clauses)} "
+                    f"RETURNING id, (xmax = 0) AS inserted, {', '.join(conflict_target)}"
+                )
+                values = [tuple(rows[i][column] for column in columns) for i in positions]
+                returned = execute_values(cursor, query, values, page_size=batch_size, fetch=True)
+                # RETURNING does not promise the order of VALUES, rows are matched by their key
+                returned_by_key = {tuple(row[2:]): (row[0], row[1]) for row in returned}
+                for position in positions:
+                    results[position] = returned_by_key[keys[position]]
+            self._commit(conn)
+            cursor.close()
+            return results
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Failed to upsert records into {table_name}: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def _conflict_key(self, row: Dict[str, Any], conflict_columns: List[str], conflict_target: List[str]) -> tuple:
+        """Get the conflict key of a row as the unique index sees it"""
+        key = []
+        for column, expression in zip(conflict_columns, conflict_target):
+            value = row.get(column)
+            empty = _COALESCE_KEY.match(expression)
+            if value is None and empty:
+                value = '' if empty.group('empty') == "''" else int(empty.group('empty'))
+            key.append(value)
+        return tuple(key)
+    
+    def _reserve_ids(self, cursor, table_name: str, count: int) -> List[int]:
+        """Take the next ``count`` IDs from the table sequence"""
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            (table_name, count)
+        )
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _copy_rows(self, cursor, table_name: str, columns: tuple, values: List[tuple]):
+        """Load rows with COPY
+        
+        Every value is quoted and NULL is the unquoted empty field, so no
+        string, not even an empty one or ``\\N``, can be read back as NULL.
+        """
+        buffer = io.StringIO()
+        for row in values:
+            buffer.write(','.join(self._copy_value(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        
+        cursor.copy_expert(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    
+    def _copy_value(self, value: Any) -> str:
+        """Convert a Python value to a COPY CSV field"""
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            value = 't' if value else 'f'
+        elif isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        return '"' + str(value).replace('"', '""') + '"'
     
     def update_record(self, table_name: str, record_id: int, data: Dict[str, Any]) -> bool:
         """Update record by ID"""
+        conn = None
         try:
             set_clauses = []
             values = []
-            for col, val in data.items():
-                set_clauses.append(f"{col} = %s")
+            for position, (col, val) in enumerate(data.items(), 1):
+                set_clauses.append(f"{col} = ${position}")
                 values.append(val)
             
             values.append(record_id)
-            query = f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE id = %s"
-            affected_rows = self.execute_update(query, tuple(values))
+            query = f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE id = ${len(values)}"
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            self._execute_prepared(cursor, ('update', table_name, tuple(data)), query, values)
+            affected_rows = cursor.rowcount
+            self._commit(conn)
+            cursor.close()
             
             return affected_rows > 0
         except Exception as e:
+            if conn:
+                self._rollback(conn)
             self.logger.error(f"Failed to update record: {e}")
             return False
+        finally:
+            if conn:
+                self.return_connection(conn)
     
     def delete_record(self, table_name: str, record_id: int) -> bool:
         """Delete record by ID"""
@@ -187,15 +796,164 @@ class DatabaseManager:
             self.logger.error(f"Failed to delete record: {e}")
             return False
     
+    def update_records(self, table_name: str, record_ids: List[int], data: Dict[str, Any]) -> int:
+        """Update several records with the same values and return affected rows"""
+        if not record_ids or not data:
+            return 0
+        
+        values = list(data.values())
+        if len(record_ids) == 1:
+            # The shape of write() on one record, prepared once per connection
+            set_clauses = ', '.join(f"{col} = ${position}" for position, col in enumerate(data, 1))
+            query = f"UPDATE {table_name} SET {set_clauses} WHERE id = ${len(values) + 1}"
+            return self._execute_prepared_update(('update', table_name, tuple(data)), query,
+                                                 tuple(values + [record_ids[0]]))
+        
+        set_clauses = ', '.join(f"{col} = %s" for col in data)
+        query = f"UPDATE {table_name} SET {set_clauses} WHERE id = ANY(%s)"
+        return self._execute_chunked(query, record_ids, lambda chunk: tuple(values + [chunk]))
+    
+    def update_many(self, table_name: str, columns: List[str], rows: List[tuple],
+                    column_types: List[str] = None) -> int:
+        """Update records with per-record values in one statement per batch
+        
+        Each row is ``(id, value, ...)`` in the order of ``columns``; the
+        column types cast the VALUES list, which PostgreSQL cannot infer.
+        """
+        if not rows or not columns:
+            return 0
+        
+        batch_size = self.config.get('database', {}).get('write_batch_size', 5000)
+        types = ['integer'] + list(column_types or ['text'] * len(columns))
+        template = '(' + ', '.join(f"%s::{column_type}" for column_type in types) + ')'
+        set_clauses = ', '.join(f"{col} = v.{col}" for col in columns)
+        query = (
+            f"UPDATE {table_name} SET {set_clauses} "
+            f"FROM (VALUES %s) AS v(id, {', '.join(columns)}) WHERE {table_name}.id = v.id"
+        )
+        
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            affected_rows = 0
+            for start in range(0, len(rows), batch_size):
+                execute_values(cursor, query, rows[start:start + batch_size], template=template, page_size=batch_size)
+                affected_rows += cursor.rowcount
+            self._commit(conn)
+            cursor.close()
+            return affected_rows
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Failed to update records in {table_name}: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def delete_records(self, table_name: str, record_ids: List[int]) -> int:
+        """Delete several records and return affected rows"""
+        if not record_ids:
+            return 0
+        
+        if len(record_ids) == 1:
+            query = f"DELETE FROM {table_name} WHERE id = $1"
+            return self._execute_prepared_update(('delete', table_name), query, (record_ids[0],))
+        
+        query = f"DELETE FROM {table_name} WHERE id = ANY(%s)"
+        return self._execute_chunked(query, record_ids, lambda chunk: (chunk,))
+    
+    def _execute_prepared_update(self, shape: tuple, query: str, params: tuple) -> int:
+        """Run a prepared UPDATE/DELETE statement and return affected rows"""
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            self._execute_prepared(cursor, shape, query, params)
+            affected_rows = cursor.rowcount
+            self._commit(conn)
+            cursor.close()
+            return affected_rows
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Prepared statement failed: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def _execute_chunked(self, query: str, record_ids: List[int], make_params) -> int:
+        """Run a statement over chunks of IDs in one transaction"""
+        batch_size = self.config.get('database', {}).get('write_batch_size', 5000)
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            affected_rows = 0
+            for start in range(0, len(record_ids), batch_size):
+                cursor.execute(query, make_params(list(record_ids[start:start + batch_size])))
+                affected_rows += cursor.rowcount
+            self._commit(conn)
+            cursor.close()
+            return affected_rows
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Chunked execution failed: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
     def get_record(self, table_name: str, record_id: int) -> Optional[Dict]:
         """Get record by ID"""
+        conn = None
         try:
-            query = f"SELECT * FROM {table_name} WHERE id = %s"
-            results = self.execute_query(query, (record_id,))
-            return results[0] if results else None
+            query = f"SELECT * FROM {table_name} WHERE id = $1"
+            conn = self.get_connection(readonly=True)
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            self._execute_prepared(cursor, ('get', table_name), query, (record_id,))
+            result = cursor.fetchone()
+            cursor.close()
+            return dict(result) if result else None
         except Exception as e:
             self.logger.error(f"Failed to get record: {e}")
             return None
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def read_records(self, table_name: str, ids: List[int], columns: List[str] = None) -> List[Dict]:
+        """Read records by IDs in batches, preserving the order of ``ids``"""
+        if not ids:
+            return []
+        
+        batch_size = self.config.get('database', {}).get('read_batch_size', 5000)
+        select_list = ', '.join(columns) if columns else '*'
+        if columns and 'id' not in columns:
+            select_list = f"id, {select_list}"
+        query = f"SELECT {select_list} FROM {table_name} WHERE id = ANY($1::integer[])"
+        shape = ('read', table_name, tuple(columns or ()))
+        
+        rows_by_id = {}
+        conn = None
+        try:
+            conn = self.get_connection(readonly=True)
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            for start in range(0, len(ids), batch_size):
+                self._execute_prepared(cursor, shape, query, (list(ids[start:start + batch_size]),))
+                for row in cursor.fetchall():
+                    rows_by_id[row['id']] = dict(row)
+            cursor.close()
+            return [rows_by_id[record_id] for record_id in ids if record_id in rows_by_id]
+        except Exception as e:
+            self.logger.error(f"Failed to read records from {table_name}: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
     
     def search_records(self, table_name: str, filters: Dict[str, Any] = None, 
                       limit: int = None, offset: int = None) -> List[Dict]:
@@ -212,17 +970,22 @@ class DatabaseManager:
                 query += f" WHERE {' AND '.join(where_clauses)}"
             
             if limit:
-                query += f" LIMIT {limit}"
+                query += " LIMIT %s"
+                params.append(limit)
             if offset:
-                query += f" OFFSET {offset}"
+                query += " OFFSET %s"
+                params.append(offset)
             
-            return self.execute_query(query, tuple(params))
+            return self.execute_query(query, tuple(params), readonly=True)
         except Exception as e:
             self.logger.error(f"Failed to search records: {e}")
             return []
     
     def close(self):
         """Close database connection pool"""
+        for replica in self.replicas:
+            replica['pool'].closeall()
+        self.replicas = []
         if self.connection_pool:
             self.connection_pool.closeall()
             self.logger.info("Database connection pool closed")
\ No newline at end of file
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - Domain Expressions
+======================================
+
+Compiles ORM search domains into parameterized SQL for the standalone ERP system.
+
+A domain is a list of leaves ``(field, operator, value)`` combined with the
+prefix operators ``'&'``, ``'|'`` and ``'!'``. Leaves without an explicit
+operator are implicitly joined with ``'&'``.
+"""
+
+import re
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# Domain operators and their arity
+NOT_OPERATOR = '!'
+AND_OPERATOR = '&'
+OR_OPERATOR = '|'
+DOMAIN_OPERATORS = {NOT_OPERATOR: 1, AND_OPERATOR: 2, OR_OPERATOR: 2}
+
+# Leaf operators
+TERM_OPERATORS = (
+    '=', '!=', '<>', '<', '>', '<=', '>=', '=?',
+    'in', 'not in',
+    'like', 'not like', 'ilike', 'not ilike', '=like', '=ilike',
+    'child_of', 'parent_of',
+)
+
+TRUE_LEAF = (1, '=', 1)
+FALSE_LEAF = (0, '=', 1)
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# PostgreSQL truncates identifiers longer than this
+MAX_IDENTIFIER_LENGTH = 63
+
+
+def check_identifier(name: str) -> str:
+    """Check that a table or column name is safe to embed in SQL"""
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return name
+
+
+def is_leaf(element) -> bool:
+    """Check if a domain element is a leaf"""
+    return (
+        isinstance(element, (list, tuple))
+        and len(element) == 3
+        and (element[1] in TERM_OPERATORS or tuple(element) in (TRUE_LEAF, FALSE_LEAF))
+    )
+
+
+def make_alias(parent_alias: str, field_name: str) -> str:
+    """Build the table alias for a field path, hashing aliases that are too long"""
+    alias = f"{parent_alias}__{field_name}"
+    if len(alias) <= MAX_IDENTIFIER_LENGTH:
+        return alias
+    digest = hashlib.sha1(alias.encode('utf-8')).hexdigest()[:8]
+    return f"{alias[:MAX_IDENTIFIER_LENGTH - 9]}_{digest}"
+
+
+def normalize_domain(domain: List) -> List:
+    """Return the domain in full prefix notation, adding implicit '&' operators"""
+    if not domain:
+        return [TRUE_LEAF]
+    
+    result = []
+    expected = 1
+    for token in domain:
+        if expected == 0:
+            # Previous expression was complete, AND it with the next one
+            result[0:0] = [AND_OPERATOR]
+            expected = 1
+        if isinstance(token, str) and token in DOMAIN_OPERATORS:
+            expected += DOMAIN_OPERATORS[token] - 1
+        elif is_leaf(token):
+            expected -= 1
+        else:
+            raise ValueError(f"Invalid domain term: {token!r}")
+        result.append(token)
+    
+    if expected != 0:
+        raise ValueError(f"Invalid domain: {domain!r}")
+    return result
+
+
+class SQL:
+    """Trusted SQL expression with its parameters, used as a value to write
+    
+    ``SQL('quantity - %s', 2)`` is evaluated by the database on the current
+    row. The code must never be built from user input.
+    """
+    
+    __slots__ = ('code', 'params')
+    
+    def __init__(self, code: str, *params):
+        self.code = code
+        self.params = params
+    
+    def __repr__(self):
+        return f"SQL({self.code!r}, {', '.join(map(repr, self.params))})"
+
+
+class Query:
+    """SQL query being built from a domain"""
+    
+    def __init__(self, table: str, alias: str = None):
+        self.table = check_identifier(table)
+        self.alias = check_identifier(alias or table)
+        self.joins = {}
+        self.where_clauses = []
+        self.where_params = []
+    
+    def add_where(self, clause: str, params: List = None):
+        """Add a condition that is ANDed with the others"""
+        self.where_clauses.append(clause)
+        self.where_params.extend(params or [])
+    
+    def add_left_join(self, alias: str, table: str, condition: str) -> str:
+        """Add a LEFT JOIN, reusing it if the alias is already joined"""
+        if alias not in self.joins:
+            self.joins[alias] = (check_identifier(table), condition)
+        return alias
+    
+    def from_clause(self) -> str:
+        """Get the FROM clause"""
+        if self.alias == self.table:
+            clause = self.table
+        else:
+            clause = f"{self.table} AS {self.alias}"
+        for alias, (table, condition) in self.joins.items():
+            clause += f" LEFT JOIN {table} AS {alias} ON {condition}"
+        return clause
+    
+    def where_clause(self) -> str:
+        """Get the WHERE condition"""
+        return ' AND '.join(self.where_clauses) if self.where_clauses else 'TRUE'
+    
+    def select(self, columns: List[str], limit: int = None, offset: int = None,
+               order: str = None, group_by: List[str] = None) -> Tuple[str, tuple]:
+        """Render a SELECT statement and its parameters"""
+        query = f"SELECT {', '.join(columns)} FROM {self.from_clause()} WHERE {self.where_clause()}"
+        params = list(self.where_params)
+        
+        if group_by:
+            query += f" GROUP BY {', '.join(group_by)}"
+        if order:
+            query += f" ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        if offset:
+            query += " OFFSET %s"
+            params.append(offset)
+        
+        return query, tuple(params)
+    
+    def update(self, values: Dict[str, Any]) -> Tuple[str, tuple]:
+        """Render an UPDATE statement of the matching rows and its parameters
+        
+        The conditions must be on the table itself: PostgreSQL re-checks them
+        on the latest version of a row it had to wait for, but not the joins.
+        """
+        if self.joins:
+            raise ValueError(f"Cannot update {self.table} with conditions on related records")
+        if self.alias != self.table:
+            raise ValueError(f"Cannot update {self.table} through the alias {self.alias}")
+        
+        assignments = []
+        params = []
+        for column, value in values.items():
+            if isinstance(value, SQL):
+                assignments.append(f"{check_identifier(column)} = {value.code}")
+                params.extend(value.params)
+            else:
+                assignments.append(f"{check_identifier(column)} = %s")
+                params.append(value)
+        query = f"UPDATE {self.table} SET {', '.join(assignments)} WHERE {self.where_clause()}"
+        return query, tuple(params + self.where_params)
+
+
+class DomainCompiler:
+    """Compile a domain into a SQL condition on a model table"""
+    
+    def __init__(self, model_class, query: Query, alias: str = None):
+        self.model_class = model_class
+        self.query = query
+        self.fields = model_class._get_fields() if model_class else {}
+        self.alias = alias or query.alias
+    
+    def compile(self, domain: List) -> Tuple[str, List]:
+        """Compile a domain into a SQL condition and its parameters"""
+        tokens = iter(normalize_domain(domain))
+        sql, params = self._parse(tokens)
+        
+        # Every token must have been consumed
+        if next(tokens, None) is not None:
+            raise ValueError(f"Invalid domain: {domain!r}")
+        return sql, params
+    
+    def _parse(self, tokens) -> Tuple[str, List]:
+        """Parse one prefix expression from the token stream"""
+        token = next(tokens)
+        
+        if isinstance(token, str) and token == NOT_OPERATOR:
+            sql, params = self._parse(tokens)
+            return f"(NOT {sql})", params
+        
+        if isinstance(token, str) and token in (AND_OPERATOR, OR_OPERATOR):
+            left_sql, left_params = self._parse(tokens)
+            right_sql, right_params = self._parse(tokens)
+            sql_operator = 'AND' if token == AND_OPERATOR else 'OR'
+            return f"({left_sql} {sql_operator} {right_sql})", left_params + right_params
+        
+        return self._leaf_to_sql(token)
+    
+    def _column(self, field_name: str) -> str:
+        """Get the qualified column for a field"""
+        return f"{self.alias}.{check_identifier(field_name)}"
+    
+    def _get_field(self, field_name: str):
+        """Get a field definition, validating the name against the model"""
+        if field_name == 'id':
+            return None
+        if self.model_class is None:
+            check_identifier(field_name)
+            return None
+        if field_name not in self.fields:
+            raise ValueError(f"Invalid field {field_name!r} in domain for model {self.model_class._name}")
+        return self.fields[field_name]
+    
+    def _get_comodel(self, field):
+        """Get the model class targeted by a relational field"""
+        comodel = self.model_class._get_model_class(field.comodel_name) if self.model_class else None
+        if comodel is None:
+            raise ValueError(f"Unknown model {field.comodel_name!r} in domain path")
+        return comodel
+    
+    def _path_to_sql(self, field_name: str, field, path: str, operator: str,
+                     value: Any) -> Tuple[str, List]:
+        """Compile a leaf on a dotted path through a relational field"""
+        comodel = self._get_comodel(field)
+        
+        if field.type == 'many2one':
+            # Follow Many2one links with a LEFT JOIN on the same query
+            alias = make_alias(self.alias, field_name)
+            condition = f"{alias}.id = {self._column(field_name)}"
+            self.query.add_left_join(alias, comodel._get_table_name(), condition)
+            return DomainCompiler(comodel, self.query, alias)._leaf_to_sql((path, operator, value))
+        
+        # One2many and Many2many paths become correlated EXISTS subqueries
+        subquery = Query(comodel._get_table_name(), make_alias(self.alias, field_name))
+        subquery.add_where(*self._x2many_link(field, comodel, subquery.alias))
+        compiler = DomainCompiler(comodel, subquery)
+        subquery.add_where(*compiler._leaf_to_sql((path, operator, value)))
+        sql, params = subquery.select(['1'])
+        return f"EXISTS ({sql})", list(params)
+    
+    def _x2many_link(self, field, comodel, alias: str) -> Tuple[str, List]:
+        """Get the condition linking an x2many subquery to the current row"""
+        parent_id = f"{self.alias}.id"
+        
+        if field.type == 'one2many':
+            return f"{alias}.{check_identifier(field.inverse_name)} = {parent_id}", []
+        
+        relation, column1, column2 = self._many2many_relation(field, comodel)
+        return (
+            f"{alias}.id IN (SELECT {column2} FROM {relation} WHERE {column1} = {parent_id})",
+            []
+        )
+    
+    def _many2many_relation(self, field, comodel) -> Tuple[str, str, str]:
+        """Get the relation table and its columns for a Many2many field"""
+        relation, column1, column2 = field.get_relation(self.model_class, comodel)
+        return check_identifier(relation), check_identifier(column1), check_identifier(column2)
+    
+    def _leaf_to_sql(self, leaf) -> Tuple[str, List]:
+        """Compile a single leaf"""
+        if tuple(leaf) == TRUE_LEAF:
+            return 'TRUE', []
+        if tuple(leaf) == FALSE_LEAF:
+            return 'FALSE', []
+        
+        field_name, operator, value = leaf
+        operator = operator.lower()
+        
+        # Dotted paths go through the relational field on the first segment
+        field_name, _, path = field_name.partition('.')
+        field = self._get_field(field_name)
+        field_type = getattr(field, 'type', None)
+        if path:
+            if field_type not in ('many2one', 'one2many', 'many2many'):
+                raise ValueError(f"Field {field_name!r} is not relational in path {leaf[0]!r}")
+            return self._path_to_sql(field_name, field, path, operator, value)
+        
+        if field_type in ('one2many', 'many2many'):
+            return self._x2many_to_sql(field_name, field, operator, value)
+        
+        column = self._column(field_name)
+        value = self._convert_value(value, operator)
+        
+        if operator == '=?':
+            if value is None or value is False:
+                return 'TRUE', []
+            operator = '='
+        
+        if operator in ('child_of', 'parent_of'):
+            return self._hierarchy_to_sql(field_name, field, column, operator, value)
+        
+        if operator in ('in', 'not in'):
+            return self._in_to_sql(column, operator, value)
+        
+        if operator in ('like', 'not like', 'ilike', 'not ilike', '=like', '=ilike'):
+            return self._like_to_sql(column, operator, value)
+        
+        if operator == '<>':
+            operator = '!='
+        
+        if value is None or value is False:
+            return self._null_to_sql(field, column, operator, value)
+        
+        if operator == '!=':
+            return f"({column} != %s OR {column} IS NULL)", [value]
+        
+        return f"{column} {operator} %s", [value]
+    
+    def _x2many_to_sql(self, field_name: str, field, operator: str, value: Any) -> Tuple[str, List]:
+        """Compile a leaf directly on a One2many/Many2many field"""
+        if value is None or value is False:
+            if operator not in ('=', '!='):
+                raise ValueError(f"Unsupported operator {operator!r} on empty {field_name!r}")
+            sql, params = self._path_to_sql(field_name, field, 'id', '!=', None)
+            return (sql, params) if operator == '!=' else (f"(NOT {sql})", params)
+        return self._path_to_sql(field_name, field, 'id', operator, value)
+    
+    def _convert_value(self, value: Any, operator: str) -> Any:
+        """Convert recordsets and scalars to plain values"""
+        if hasattr(value, '_ids'):
+            ids = list(value._ids)
+            if operator in ('in', 'not in', 'child_of', 'parent_of'):
+                return ids
+            return ids[0] if ids else False
+        return value
+    
+    def _null_to_sql(self, field, column: str, operator: str, value: Any) -> Tuple[str, List]:
+        """Compile comparisons against None/False"""
+        is_boolean = getattr(field, 'type', None) == 'boolean'
+        
+        if operator == '=':
+            if value is False and is_boolean:
+                return f"({column} IS NULL OR {column} = FALSE)", []
+            return f"{column} IS NULL", []
+        if operator == '!=':
+            if value is False and is_boolean:
+                return f"{column} = TRUE", []
+            return f"{column} IS NOT NULL", []
+        if value is False and is_boolean:
+            return f"{column} {operator} %s", [False]
+        
+        # Ordering comparisons against NULL never match
+        return 'FALSE', []
+    
+    def _in_to_sql(self, column: str, operator: str, value: Any) -> Tuple[str, List]:
+        """Compile 'in' and 'not in' leaves"""
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            value = [value]
+        values = [item for item in value if item is not None and item is not False]
+        has_null = len(values) != len(value)
+        
+        if operator == 'in':
+            if values:
+                sql = f"{column} = ANY(%s)"
+                params = [values]
+                if has_null:
+                    sql = f"({sql} OR {column} IS NULL)"
+                return sql, params
+            return (f"{column} IS NULL", []) if has_null else ('FALSE', [])
+        
+        if values:
+            sql = f"NOT ({column} = ANY(%s))"
+            params = [values]
+            if has_null:
+                return f"({column} IS NOT NULL AND {sql})", params
+            return f"({column} IS NULL OR {sql})", params
+        return (f"{column} IS NOT NULL", []) if has_null else ('TRUE', [])
+    
+    def _like_to_sql(self, column: str, operator: str, value: Any) -> Tuple[str, List]:
+        """Compile pattern matching leaves"""
+        negate = operator.startswith('not ')
+        sql_operator = 'ILIKE' if 'ilike' in operator else 'LIKE'
+        
+        if operator.startswith('='):
+            pattern = value
+        else:
+            pattern = f"%{value}%"
+        
+        if value is None or value is False:
+            # Matching everything against an empty pattern
+            return (f"{column} IS NULL", []) if negate else (f"{column} IS NOT NULL", [])
+        
+        if negate:
+            return f"({column} NOT {sql_operator} %s OR {column} IS NULL)", [pattern]
+        return f"{column} {sql_operator} %s", [pattern]
+    
+    def _hierarchy_to_sql(self, field_name: str, field, column: str, operator: str,
+                          value: Any) -> Tuple[str, List]:
+        """Compile child_of/parent_of leaves with a recursive query"""
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            value = [value]
+        ids = [item for item in value if item]
+        if not ids:
+            return 'FALSE', []
+        
+        if getattr(field, 'type', None) == 'many2one':
+            comodel = self._get_comodel(field)
+            table, parent_name = comodel._get_table_name(), comodel._parent_name
+        else:
+            table = self.model_class._get_table_name() if self.model_class else self.query.table
+            parent_name = getattr(self.model_class, '_parent_name', 'parent_id')
+        check_identifier(table)
+        check_identifier(parent_name)
+        
+        if operator == 'child_of':
+            step = f"SELECT h.id FROM {table} h JOIN tree ON h.{parent_name} = tree.id"
+        else:
+            step = f"SELECT h.{parent_name} FROM {table} h JOIN tree ON h.id = tree.id WHERE h.{parent_name} IS NOT NULL"
+        
+        subquery = (
+            f"WITH RECURSIVE tree(id) AS ("
+            f"SELECT id FROM {table} WHERE id = ANY(%s) UNION {step}"
+            f") SELECT id FROM tree"
+        )
+        return f"{column} IN ({subquery})", [ids]
+
+
+def compile_domain(model_class, domain: List, query: Query = None) -> Query:
+    """Compile a domain into a Query on the model table"""
+    if query is None:
+        query = Query(model_class._get_table_name())
+    if domain:
+        sql, params = DomainCompiler(model_class, query).compile(domain)
+        query.add_where(sql, params)
+    return query
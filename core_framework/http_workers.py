@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - HTTP Workers
+================================
+
+Concurrent serving modes for the web interface: a bounded thread pool in
+the server process, and a pre-fork master running several worker processes
+on one shared listening socket.
+"""
+
+import os
+import time
+import signal
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer
+
+class _RecyclingMixin:
+    """Stops serving once ``max_requests`` connections were handled"""
+    
+    max_requests = 0
+    requests_handled = 0
+    
+    def _count_request(self):
+        """Count a connection, shutting down the server at the limit"""
+        self.requests_handled += 1
+        if self.max_requests and self.requests_handled == self.max_requests:
+            # shutdown() waits for serve_forever() to return, call it from another thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+class SingleThreadHTTPServer(_RecyclingMixin, WSGIServer):
+    """HTTP server handling one connection at a time"""
+    
+    def process_request(self, request, client_address):
+        self._count_request()
+        super().process_request(request, client_address)
+
+class ThreadPoolHTTPServer(_RecyclingMixin, ThreadingMixIn, WSGIServer):
+    """HTTP server handling connections on a bounded pool of threads
+    
+    The accept loop waits while every thread is busy, leaving new
+    connections in the listen backlog (or to another worker process)
+    instead of queuing them in memory.
+    """
+    
+    def __init__(self, server_address, handler_class, threads=8, bind_and_activate=True):
+        self.threads = threads
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='http')
+        self._slots = threading.BoundedSemaphore(threads)
+        super().__init__(server_address, handler_class, bind_and_activate)
+    
+    def process_request(self, request, client_address):
+        self._count_request()
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._process_request_slot, request, client_address)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def _process_request_slot(self, request, client_address):
+        """Handle a connection on a pool thread, then free its slot"""
+        try:
+            self.process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+    
+    def server_close(self):
+        """Close the socket once the requests in progress are done"""
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+def make_http_server(host, port, handler, threads=1, sock=None, application=None):
+    """Create a single-threaded or thread pool HTTP server, optionally on an open socket
+    
+    The servers are WSGI servers, ``application`` is run by handlers
+    based on ``wsgiref.simple_server.WSGIRequestHandler``.
+    """
+    if threads > 1:
+        server = ThreadPoolHTTPServer((host, port), handler, threads=threads, bind_and_activate=sock is None)
+    else:
+        server = SingleThreadHTTPServer((host, port), handler, bind_and_activate=sock is None)
+    if sock is not None:
+        server.socket.close()
+        server.socket = sock
+        server.server_address = sock.getsockname()
+        server.server_name = socket.getfqdn(server.server_address[0])
+        server.server_port = server.server_address[1]
+        server.setup_environ()
+    server.set_app(application)
+    return server
+
+def create_listen_socket(host, port, backlog=128):
+    """Bind a listening socket that other processes can bind too (SO_REUSEPORT)"""
+    return socket.create_server(
+        (host, port), backlog=backlog, reuse_port=hasattr(socket, 'SO_REUSEPORT')
+    )
+
+class PreforkServer:
+    """Master process keeping ``workers`` forked HTTP worker processes alive
+    
+    Workers inherit the listening socket and accept on it concurrently.
+    SIGTERM/SIGINT stop them gracefully, SIGHUP replaces them with fresh
+    ones without closing the socket, and a worker exits on its own after
+    ``max_requests`` connections to be replaced by a new one.
+    """
+    
+    def __init__(self, host, port, handler, workers, threads=1, max_requests=0,
+                 graceful_timeout=30, pre_fork=None, post_fork=None, application=None):
+        self.host = host
+        self.port = port
+        self.handler = handler
+        self.application = application
+        self.worker_count = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.pre_fork = pre_fork
+        self.post_fork = post_fork
+        self.socket = None
+        self.workers = {}
+        self._stopping = False
+        self._restarting = False
+        self.logger = logging.getLogger('ERP.WebInterface.Prefork')
+    
+    def run(self):
+        """Bind the socket, then spawn and supervise the workers until stopped"""
+        self.socket = create_listen_socket(self.host, self.port)
+        self.port = self.socket.getsockname()[1]
+        if self.pre_fork:
+            # Connections and threads must not be shared with the children
+            self.pre_fork()
+        
+        previous_handlers = {
+            signum: signal.signal(signum, handler)
+            for signum, handler in (
+                (signal.SIGTERM, self._handle_stop),
+                (signal.SIGINT, self._handle_stop),
+                (signal.SIGHUP, self._handle_restart),
+            )
+        }
+        self.logger.info(f"Pre-fork master {os.getpid()} listening on {self.host}:{self.port}")
+        try:
+            while not self._stopping:
+                self._reap_workers()
+                if self._restarting:
+                    self._restarting = False
+                    self._restart_workers()
+                while len(self.workers) < self.worker_count and not self._stopping:
+                    self._spawn_worker()
+                time.sleep(0.2)
+        finally:
+            self._stop_workers()
+            self.socket.close()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            self.logger.info("Pre-fork master stopped")
+    
+    def stop(self):
+        """Ask the master loop to stop the workers and return"""
+        self._stopping = True
+    
+    def restart(self):
+        """Ask the master loop to replace every worker"""
+        self._restarting = True
+    
+    def _handle_stop(self, signum, frame):
+        self.stop()
+    
+    def _handle_restart(self, signum, frame):
+        self.restart()
+    
+    def _spawn_worker(self):
+        """Fork a worker process"""
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._run_worker()
+            except BaseException as e:
+                self.logger.error(f"Worker {os.getpid()} crashed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = time.monotonic()
+        self.logger.debug(f"Spawned worker {pid}")
+    
+    def _run_worker(self):
+        """Serve requests in a forked worker until told to stop or recycled"""
+        # The master relays Ctrl+C to the workers as a graceful SIGTERM
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        if self.post_fork:
+            self.post_fork()
+        
+        server = make_http_server(
+            self.host, self.port, self.handler, self.threads, sock=self.socket, application=self.application
+        )
+        server.max_requests = self.max_requests
+        signal.signal(
+            signal.SIGTERM,
+            lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start()
+        )
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        if self.max_requests and server.requests_handled >= self.max_requests:
+            self.logger.info(f"Worker {os.getpid()} recycled after {server.requests_handled} requests")
+    
+    def _reap_workers(self):
+        """Forget the workers that exited"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self.workers.pop(pid, None) is not None and os.waitstatus_to_exitcode(status) != 0:
+                self.logger.warning(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}")
+    
+    def _restart_workers(self):
+        """Spawn a new set of workers, then let the old ones finish their requests and exit"""
+        old_workers = list(self.workers)
+        self.logger.info(f"Restarting {len(old_workers)} workers")
+        for _ in range(self.worker_count):
+            self._spawn_worker()
+        self._signal_workers(old_workers, signal.SIGTERM)
+    
+    def _stop_workers(self):
+        """Stop every worker, killing those still busy after the graceful timeout"""
+        self._signal_workers(list(self.workers), signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self._reap_workers()
+            time.sleep(0.1)
+        if self.workers:
+            self.logger.warning(f"Killing {len(self.workers)} workers after {self.graceful_timeout}s")
+            self._signal_workers(list(self.workers), signal.SIGKILL)
+            for pid in list(self.workers):
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            self.workers.clear()
+    
+    def _signal_workers(self, pids, signum):
+        """Send a signal to worker processes that may already be gone"""
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - Query Instrumentation
+=========================================
+
+Counts the SQL statements run per request, job or transaction, logs slow
+queries with their call site and flags N+1 query patterns.
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+
+# Modules whose frames are skipped when looking for the code that ran a query
+FRAMEWORK_FILES = tuple(
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('database.py', 'orm.py', 'expression.py', 'connection_pool.py', 'instrumentation.py',
+                 'sqlite_backend.py')
+) + (os.path.dirname(extensions.__file__), contextmanager.__code__.co_filename)
+
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def statement_shape(query):
+    """Reduce a statement to its shape, with literals and whitespace normalized"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    return _WHITESPACE_PATTERN.sub(' ', _LITERAL_PATTERN.sub('?', query)).strip()
+
+def get_call_site():
+    """Get the innermost frame outside the database layer as 'file:line in function'"""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith(FRAMEWORK_FILES):
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+class QueryStats:
+    """Query counters of one request, job or transaction"""
+    
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.query_count = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.slow_queries = []
+        self.n_plus_one = []
+        self.started_at = time.monotonic()
+        self._shapes = {}
+    
+    def to_dict(self):
+        """Get the counters as a JSON-friendly dict"""
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'query_count': self.query_count,
+            'db_time_ms': round(self.db_time * 1000, 3),
+            'rows': self.rows,
+            'slow_queries': self.slow_queries,
+            'n_plus_one': self.n_plus_one,
+        }
+
+class QueryInstrumentation:
+    """Collects query statistics for a DatabaseManager"""
+    
+    def __init__(self, config):
+        db_config = config.get('database', {})
+        self.enabled = db_config.get('query_instrumentation', True)
+        self.slow_query_threshold = db_config.get('slow_query_threshold', 200) / 1000.0
+        self.n_plus_one_threshold = db_config.get('n_plus_one_threshold', 10)
+        self.logger = logging.getLogger('ERP.Database.Queries')
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._totals = {'query_count': 0, 'db_time': 0.0, 'rows': 0, 'slow_queries': 0, 'n_plus_one': 0}
+        self._recent_slow_queries = deque(maxlen=50)
+        self._recent_n_plus_one = deque(maxlen=50)
+    
+    def current_scope(self):
+        """Get the innermost scope of the current thread, if any"""
+        scopes = getattr(self._local, 'scopes', None)
+        return scopes[-1] if scopes else None
+    
+    @contextmanager
+    def scope(self, kind, name=None):
+        """Collect the statistics of the queries the current thread runs in the block"""
+        stats = QueryStats(kind, name)
+        scopes = getattr(self._local, 'scopes', None)
+        if scopes is None:
+            scopes = self._local.scopes = []
+        scopes.append(stats)
+        try:
+            yield stats
+        finally:
+            scopes.pop()
+            if stats.query_count:
+                self.logger.debug(
+                    f"{kind} {name or ''}: {stats.query_count} queries, "
+                    f"{stats.db_time * 1000:.1f} ms, {stats.rows} rows"
+                )
+    
+    def record(self, query, params, duration, rows):
+        """Record a statement run by the current thread"""
+        rows = max(rows, 0)
+        is_slow = duration >= self.slow_query_threshold
+        with self._lock:
+            self._totals['query_count'] += 1
+            self._totals['db_time'] += duration
+            self._totals['rows'] += rows
+        
+        scopes = getattr(self._local, 'scopes', None)
+        if not scopes and not is_slow:
+            return
+        
+        call_site = get_call_site()
+        if is_slow:
+            # Bound values may be passwords or personal data, only the server log gets them
+            entry = {
+                'query': statement_shape(query)[:1000],
+                'duration_ms': round(duration * 1000, 3),
+                'call_site': call_site,
+            }
+            self.logger.warning(
+                f"Slow query ({entry['duration_ms']} ms) at {call_site}: {entry['query']} params={repr(params)[:500]}"
+            )
+            with self._lock:
+                self._totals['slow_queries'] += 1
+                self._recent_slow_queries.append(entry)
+        
+        if not scopes:
+            return
+        key = (statement_shape(query), call_site)
+        for stats in scopes:
+            stats.query_count += 1
+            stats.db_time += duration
+            stats.rows += rows
+            if is_slow:
+                stats.slow_queries.append(entry)
+            count = stats._shapes.get(key, 0) + 1
+            stats._shapes[key] = count
+            if count == self.n_plus_one_threshold:
+                self._report_n_plus_one(stats, key, log=stats is scopes[0])
+    
+    def _report_n_plus_one(self, stats, key, log):
+        """Flag a statement repeated from the same call site, logging it for the outermost scope"""
+        shape, call_site = key
+        entry = {'query': shape[:1000], 'call_site': call_site, 'scope': f"{stats.kind} {stats.name or ''}".strip()}
+        stats.n_plus_one.append(entry)
+        if not log:
+            return
+        self.logger.warning(
+            f"Possible N+1 in {entry['scope']}: statement ran {self.n_plus_one_threshold} times "
+            f"from {call_site}: {entry['query']}"
+        )
+        with self._lock:
+            self._totals['n_plus_one'] += 1
+            self._recent_n_plus_one.append(entry)
+    
+    def get_metrics(self):
+        """Get process-wide query metrics"""
+        with self._lock:
+            return {
+                'query_count': self._totals['query_count'],
+                'db_time_ms': round(self._totals['db_time'] * 1000, 3),
+                'rows': self._totals['rows'],
+                'slow_query_count': self._totals['slow_queries'],
+                'n_plus_one_count': self._totals['n_plus_one'],
+                'recent_slow_queries': list(self._recent_slow_queries),
+                'recent_n_plus_one': list(self._recent_n_plus_one),
+            }
+
+class _InstrumentedCursorMixin:
+    """Times every statement and reports it to the connection's instrumentation"""
+    
+    def execute(self, query, vars=None):
+        instrumentation = self.connection.instrumentation
+        if instrumentation is None or not instrumentation.enabled:
+            return super().execute(query, vars)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            instrumentation.record(query, vars, time.perf_counter() - started, self.rowcount)
+
+class InstrumentedCursor(_InstrumentedCursorMixin, extensions.cursor):
+    """Plain cursor with query instrumentation"""
+    pass
+
+class InstrumentedRealDictCursor(_InstrumentedCursorMixin, RealDictCursor):
+    """Dict cursor with query instrumentation"""
+    pass
+
+class InstrumentedConnection(extensions.connection):
+    """Connection whose cursors report to ``instrumentation`` when it is set"""
+    
+    instrumentation = None
+    
+    def cursor(self, *args, **kwargs):
+        cursor_factory = kwargs.get('cursor_factory')
+        if cursor_factory is None:
+            kwargs['cursor_factory'] = InstrumentedCursor
+        elif cursor_factory is RealDictCursor:
+            kwargs['cursor_factory'] = InstrumentedRealDictCursor
+        return super().cursor(*args, **kwargs)
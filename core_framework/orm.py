@@ -8,60 +8,136 @@ Custom ORM system for the standalone Ocean ERP system.
 """
 
 import logging
+import hashlib
+import itertools
+import re
 from typing import Dict, List, Any, Optional, Type
-from abc import ABC, abstractmethod
+from abc import ABC, ABCMeta, abstractmethod
 from datetime import datetime
 import json
+from contextlib import contextmanager
+from dateutil.relativedelta import relativedelta
+from .expression import SQL, compile_domain, check_identifier, MAX_IDENTIFIER_LENGTH
+from .exceptions import MissingError, ValidationError
+
+# Aggregate functions allowed in read_group
+READ_GROUP_AGGREGATES = ('count', 'sum', 'avg', 'min', 'max')
+
+# Date granularities allowed in read_group and the length of each period
+READ_GROUP_PERIODS = {
+    'day': relativedelta(days=1),
+    'week': relativedelta(weeks=1),
+    'month': relativedelta(months=1),
+    'quarter': relativedelta(months=3),
+    'year': relativedelta(years=1),
+}
 
 class Field:
     """Base field class for ORM"""
     
+    type = None
+    __slots__ = ('string', 'required', 'default', 'help', 'index', 'compute', 'related', 'store', 'kwargs', 'name')
+    
     def __init__(self, string: str = None, required: bool = False, 
-                 default: Any = None, help: str = None, **kwargs):
+                 default: Any = None, help: str = None, index: bool = False,
+                 compute: str = None, related: str = None, store: bool = None, **kwargs):
         self.string = string
         self.required = required
         self.default = default
         self.help = help
+        self.index = index
+        self.compute = compute
+        self.related = related
+        # Computed fields live only in the cache unless stored explicitly
+        self.store = store if store is not None else not (compute or related)
         self.kwargs = kwargs
+        self.name = None
+    
+    @property
+    def computed(self):
+        """Check if the field value is computed"""
+        return bool(self.compute or self.related)
+    
+    def get_depends(self, model_class):
+        """Get the field paths the computed value depends on"""
+        if self.related:
+            return (self.related,)
+        method = getattr(model_class, self.compute, None)
+        return getattr(method, '_depends', ())
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, record, owner=None):
+        """Read the field value of a record through the environment cache"""
+        if record is None:
+            return self
+        return record._get_field_value(self)
+    
+    def __set__(self, record, value):
+        """Assigning a field writes it to the records, or caches it while computing"""
+        record._set_field_value(self, value)
+
+def depends(*field_paths):
+    """Declare the field paths a compute method depends on"""
+    def decorator(method):
+        method._depends = field_paths
+        return method
+    return decorator
 
 class CharField(Field):
     """Character field"""
+    type = 'char'
+    __slots__ = ('size',)
+    
     def __init__(self, size: int = 255, **kwargs):
         super().__init__(**kwargs)
         self.size = size
 
 class TextField(Field):
     """Text field"""
-    pass
+    type = 'text'
+    __slots__ = ()
 
 class IntegerField(Field):
     """Integer field"""
-    pass
+    type = 'integer'
+    __slots__ = ()
 
 class FloatField(Field):
     """Float field"""
-    pass
+    type = 'float'
+    __slots__ = ()
 
 class BooleanField(Field):
     """Boolean field"""
-    pass
+    type = 'boolean'
+    __slots__ = ()
 
 class DateField(Field):
     """Date field"""
-    pass
+    type = 'date'
+    __slots__ = ()
 
 class DateTimeField(Field):
     """DateTime field"""
-    pass
+    type = 'datetime'
+    __slots__ = ()
 
 class Many2OneField(Field):
     """Many2One relationship field"""
+    type = 'many2one'
+    __slots__ = ('comodel_name',)
+    
     def __init__(self, comodel_name: str, **kwargs):
         super().__init__(**kwargs)
         self.comodel_name = comodel_name
 
 class One2ManyField(Field):
     """One2Many relationship field"""
+    type = 'one2many'
+    __slots__ = ('comodel_name', 'inverse_name')
+    
     def __init__(self, comodel_name: str, inverse_name: str, **kwargs):
         super().__init__(**kwargs)
         self.comodel_name = comodel_name
@@ -69,18 +145,36 @@ class One2ManyField(Field):
 
 class Many2ManyField(Field):
     """Many2Many relationship field"""
+    type = 'many2many'
+    __slots__ = ('comodel_name',)
+    
     def __init__(self, comodel_name: str, **kwargs):
         super().__init__(**kwargs)
         self.comodel_name = comodel_name
+    
+    def get_relation(self, model_class, comodel_class):
+        """Get the relation table and its two columns"""
+        table = model_class._get_table_name()
+        cotable = comodel_class._get_table_name()
+        relation = self.kwargs.get('relation') or f"{'_'.join(sorted([table, cotable]))}_rel"
+        column1 = self.kwargs.get('column1') or f"{table}_id"
+        column2 = self.kwargs.get('column2') or f"{cotable}_id"
+        return relation, column1, column2
 
 class SelectionField(Field):
     """Selection field"""
+    type = 'selection'
+    __slots__ = ('selection',)
+    
     def __init__(self, selection: list, **kwargs):
         super().__init__(**kwargs)
         self.selection = selection
 
 class ImageField(Field):
     """Image field"""
+    type = 'image'
+    __slots__ = ('max_width', 'max_height')
+    
     def __init__(self, max_width: int = 1920, max_height: int = 1920, **kwargs):
         super().__init__(**kwargs)
         self.max_width = max_width
@@ -88,7 +182,30 @@ class ImageField(Field):
 
 class BinaryField(Field):
     """Binary field"""
-    pass
+    type = 'binary'
+    __slots__ = ()
+
+def get_column_type(field_def):
+    """Get the SQL column type for a field, or None if it has no column"""
+    if not field_def.store or isinstance(field_def, (One2ManyField, Many2ManyField)):
+        return None
+    if isinstance(field_def, CharField):
+        return f"VARCHAR({field_def.size})"
+    if isinstance(field_def, TextField):
+        return "TEXT"
+    if isinstance(field_def, (IntegerField, Many2OneField)):
+        return "INTEGER"
+    if isinstance(field_def, FloatField):
+        return "FLOAT"
+    if isinstance(field_def, BooleanField):
+        return "BOOLEAN"
+    if isinstance(field_def, DateField):
+        return "DATE"
+    if isinstance(field_def, DateTimeField):
+        return "TIMESTAMP"
+    if isinstance(field_def, (BinaryField, ImageField)):
+        return "BYTEA"
+    return "VARCHAR(255)"
 
 # Import mixins from core_base
 try:
@@ -103,7 +220,224 @@ except ImportError:
         """Fallback PriceMixin"""
         pass
 
-class BaseModel(ABC):
+# Model classes by technical name, filled in as models are defined
+models_registry = {}
+
+# Field types that are fetched with the record's other columns
+PREFETCH_EXCLUDED_TYPES = ('binary', 'image', 'one2many', 'many2many')
+
+# Computed fields to update when a field changes, built from the registry on demand
+_field_triggers = None
+
+# Upper bound on recompute rounds, to stop cyclic dependencies
+MAX_RECOMPUTE_ROUNDS = 100
+
+def get_field_triggers():
+    """Map (model, field) to the computed fields depending on it
+    
+    Each trigger is ``(model_name, field_name, path)`` where ``path`` leads
+    from the computed model to the changed one, or is None when the changed
+    records are the ones to recompute.
+    """
+    global _field_triggers
+    if _field_triggers is not None:
+        return _field_triggers
+    
+    logger = logging.getLogger('ERP.ORM')
+    triggers = {}
+    for model_name, model_class in models_registry.items():
+        for field_name, field_def in model_class._get_fields().items():
+            if not field_def.computed:
+                continue
+            target = (model_name, field_name)
+            for dependency in field_def.get_depends(model_class):
+                current = model_class
+                segments = dependency.split('.')
+                for position, segment in enumerate(segments):
+                    path = '.'.join(segments[:position]) or None
+                    triggers.setdefault((current._name, segment), []).append(target + (path,))
+                    segment_def = current._get_fields().get(segment)
+                    if position == len(segments) - 1:
+                        break
+                    comodel = models_registry.get(getattr(segment_def, 'comodel_name', None))
+                    if comodel is None:
+                        logger.warning(f"Cannot resolve dependency {dependency!r} of {model_name}.{field_name}")
+                        break
+                    if segment_def.type == 'one2many':
+                        # Moving a line to another parent changes both parents
+                        inverse_path = '.'.join(segments[:position + 1])
+                        triggers.setdefault((comodel._name, segment_def.inverse_name), []).append(target + (inverse_path,))
+                    current = comodel
+    
+    _field_triggers = triggers
+    return triggers
+
+def invalidate_field_triggers():
+    """Drop the dependency and inverse field maps after the registry changed"""
+    global _field_triggers, _inverse_fields
+    _field_triggers = None
+    _inverse_fields = None
+
+# One2many/Many2many fields listing records of each model, built from the registry on demand
+_inverse_fields = None
+
+def get_inverse_fields():
+    """Map a model name to the (model, field) pairs of the x2many fields targeting it"""
+    global _inverse_fields
+    if _inverse_fields is None:
+        inverse_fields = {}
+        for model_name, model_class in models_registry.items():
+            for field_name, field_def in model_class._get_fields().items():
+                if field_def.type in ('one2many', 'many2many'):
+                    inverse_fields.setdefault(field_def.comodel_name, []).append((model_name, field_name))
+        _inverse_fields = inverse_fields
+    return _inverse_fields
+
+# Columns indexed automatically because most searches filter on them
+AUTO_INDEX_COLUMNS = ('state', 'date_order', 'partner_id', 'barcode')
+
+# Value standing for NULL in the unique keys, by field type
+UNIQUE_KEY_EMPTY_VALUES = {
+    'many2one': '0',
+    'integer': '0',
+    'float': '0',
+    'char': "''",
+    'selection': "''",
+}
+
+def make_index_name(table_name, column):
+    """Build an index name that fits PostgreSQL's identifier length"""
+    index_name = f"{table_name}_{column}_index"
+    if len(index_name) <= MAX_IDENTIFIER_LENGTH:
+        return index_name
+    digest = hashlib.sha1(index_name.encode('utf-8')).hexdigest()[:8]
+    return f"{index_name[:MAX_IDENTIFIER_LENGTH - 9]}_{digest}"
+
+class RecordCache:
+    """Field values of records, keyed by (model, field) and record id"""
+    
+    def __init__(self):
+        self._data = {}
+    
+    def contains(self, model_name, field_name, record_id):
+        """Check if a field value is cached for a record"""
+        return record_id in self._data.get((model_name, field_name), ())
+    
+    def get(self, model_name, field_name, record_id, default=None):
+        """Get a cached field value"""
+        return self._data.get((model_name, field_name), {}).get(record_id, default)
+    
+    def set(self, model_name, field_name, record_id, value):
+        """Cache a field value"""
+        self._data.setdefault((model_name, field_name), {})[record_id] = value
+    
+    def get_missing_ids(self, model_name, field_name, record_ids):
+        """Get the ids whose field value is not cached, without duplicates"""
+        values = self._data.get((model_name, field_name), {})
+        seen = set()
+        missing = []
+        for record_id in record_ids:
+            if record_id not in values and record_id not in seen:
+                seen.add(record_id)
+                missing.append(record_id)
+        return missing
+    
+    def invalidate(self, model_name=None, field_names=None, record_ids=None):
+        """Drop cached values, optionally limited to a model, fields and records"""
+        for key in list(self._data):
+            if model_name is not None and key[0] != model_name:
+                continue
+            if field_names is not None and key[1] not in field_names:
+                continue
+            if record_ids is None:
+                del self._data[key]
+            else:
+                for record_id in record_ids:
+                    self._data[key].pop(record_id, None)
+
+class Environment:
+    """Database, user, context and record cache shared by recordsets"""
+    
+    def __init__(self, db, uid=None, context=None):
+        self.db = db
+        self.uid = uid
+        self.context = context or {}
+        self.cache = RecordCache()
+        # Stored computed fields waiting for recompute, as {(model, field): ids}
+        self.to_compute = {}
+        # Computed fields whose compute method is running
+        self.computing = set()
+        self.recompute_deferred = 0
+    
+    def __getitem__(self, model_name):
+        """Get an empty recordset of a model"""
+        model_class = models_registry.get(model_name)
+        if model_class is None:
+            raise KeyError(f"Unknown model: {model_name}")
+        return model_class(self, uid=self.uid, context=self.context)
+    
+    def invalidate_all(self):
+        """Drop every cached value"""
+        self.cache.invalidate()
+    
+    def recompute(self):
+        """Recompute the stored computed fields waiting for it"""
+        if self.to_compute:
+            model_name = next(iter(self.to_compute))[0]
+            self[model_name].recompute()
+    
+    @contextmanager
+    def transaction(self):
+        """Run ORM calls in one database transaction
+        
+        Recomputation of stored fields is deferred to the end of the block
+        so each record is recomputed once, just before the commit. The
+        cache is dropped when the outermost block commits or rolls back.
+        """
+        try:
+            with self.db.transaction():
+                self.recompute_deferred += 1
+                try:
+                    try:
+                        yield self
+                    finally:
+                        self.recompute_deferred -= 1
+                    if not self.recompute_deferred:
+                        self.recompute()
+                except Exception:
+                    # The cache may hold values the rollback discarded
+                    self.invalidate_all()
+                    raise
+        finally:
+            if not self.db.in_transaction():
+                # Other transactions may change the records from now on
+                self.invalidate_all()
+
+class _RelatedPrefetch:
+    """Target ids of a relational field across a prefetch set, resolved lazily"""
+    
+    def __init__(self, cache, model_name, field_name, record_ids):
+        self.cache = cache
+        self.model_name = model_name
+        self.field_name = field_name
+        self.record_ids = record_ids
+    
+    def __iter__(self):
+        for record_id in self.record_ids:
+            value = self.cache.get(self.model_name, self.field_name, record_id)
+            if isinstance(value, tuple):
+                yield from value
+            elif value:
+                yield value
+
+class MetaModel(ABCMeta):
+    """Metaclass of models, setting up their field metadata once at class creation"""
+    
+    def __init__(cls, name, bases, attrs, **kwargs):
+        super().__init__(name, bases, attrs, **kwargs)
+        cls._setup_model()
+
+class BaseModel(ABC, metaclass=MetaModel):
     """Base model class for ORM"""
     
     _name = None
@@ -111,24 +445,87 @@ class BaseModel(ABC):
     _table = None
     _fields = {}
     _fields_definitions = {}
+    _parent_name = 'parent_id'
+    _order = 'id'
+    _auto = True
+    _abstract = False
+    # Field tuples backed by a unique index, usable as upsert() conflict targets;
+    # NULL in an optional key field counts as a value, see _unique_key_expressions
+    _unique_keys = []
     
     def __init__(self, env, cr=None, uid=None, context=None):
+        self._ids = []
+        self._records = []
+        self._prefetch_ids = ()
         self.env = env
         self.cr = cr
         self.uid = uid
         self.context = context or {}
-        self._ids = []
-        self._records = []
         
+    def __init_subclass__(cls, **kwargs):
+        """Register model classes by name"""
+        super().__init_subclass__(**kwargs)
+        if cls._name:
+            models_registry[cls._name] = cls
+            invalidate_field_triggers()
+    
+    @classmethod
+    def _get_model_class(cls, model_name):
+        """Get a registered model class by name"""
+        return models_registry.get(model_name)
+    
+    @classmethod
+    def _setup_model(cls):
+        """Collect the fields of the class and precompute the metadata ORM calls use
+        
+        Runs at class creation, and must run again if fields are added to the
+        class later. Everything is set on the class itself, so a subclass
+        never sees the metadata of its parent.
+        """
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            for attr_name, attr in vars(klass).items():
+                if isinstance(attr, Field):
+                    fields[attr_name] = attr
+                elif attr_name in fields:
+                    # Overridden by something that is not a field
+                    del fields[attr_name]
+        
+        columns = ['id'] + [
+            field_name for field_name, field_def in fields.items()
+            if field_def.store and not isinstance(field_def, (One2ManyField, Many2ManyField))
+        ]
+        for magic_column in ('create_date', 'write_date', 'create_uid', 'write_uid'):
+            if magic_column not in columns:
+                columns.append(magic_column)
+        
+        cls._fields_definitions = fields
+        cls._column_names = tuple(columns)
+        cls._column_set = frozenset(columns)
+        cls._insert_columns = cls._column_names[1:]
+        cls._default_values = tuple(
+            (field_name, field_def.default) for field_name, field_def in fields.items()
+            if field_def.default is not None
+        )
+        cls._required_fields = tuple(
+            field_name for field_name, field_def in fields.items()
+            if field_def.required and not field_def.computed and field_name in cls._column_set
+        )
+        cls._stored_computed_fields = tuple(
+            field_name for field_name, field_def in fields.items() if field_def.computed and field_def.store
+        )
+        cls._relational_fields = frozenset(
+            field_name for field_name, field_def in fields.items()
+            if field_def.type in ('many2one', 'one2many', 'many2many')
+        )
+        cls._many2one_fields = frozenset(
+            field_name for field_name, field_def in fields.items() if field_def.type == 'many2one'
+        )
+        invalidate_field_triggers()
+    
     @classmethod
     def _get_fields(cls):
         """Get model fields"""
-        if not cls._fields_definitions:
-            cls._fields_definitions = {}
-            for attr_name in dir(cls):
-                attr = getattr(cls, attr_name)
-                if isinstance(attr, Field):
-                    cls._fields_definitions[attr_name] = attr
         return cls._fields_definitions
     
     @classmethod
@@ -138,22 +535,133 @@ class BaseModel(ABC):
             return cls._table
         return cls._name.replace('.', '_')
     
+    @classmethod
+    def _get_column_names(cls):
+        """Get names of fields stored as table columns"""
+        return cls._column_names
+    
+    @classmethod
+    def _unique_key_expressions(cls, key_fields):
+        """Get the SQL expressions of a unique key, the same in its index and in upserts
+        
+        Optional fields are wrapped in COALESCE, as a unique index treats
+        NULLs as distinct and would let rows with an empty key field repeat.
+        """
+        fields = cls._get_fields()
+        expressions = []
+        for field_name in key_fields:
+            field_def = fields.get(field_name)
+            empty_value = UNIQUE_KEY_EMPTY_VALUES.get(field_def.type) if field_def else None
+            if field_def is None or field_def.required or empty_value is None:
+                expressions.append(field_name)
+            else:
+                expressions.append(f"COALESCE({field_name}, {empty_value})")
+        return expressions
+    
     def create(self, vals_list):
         """Create new records"""
         if not isinstance(vals_list, list):
             vals_list = [vals_list]
         
-        created_ids = []
-        for vals in vals_list:
-            # Add default values
-            vals = self._add_default_values(vals)
-            
-            # Create record in database
-            record_id = self.env.db.insert_record(self._get_table_name(), vals)
-            created_ids.append(record_id)
+        # Add default values
+        vals_list = [self._add_default_values(vals) for vals in vals_list]
+        given_fields = set().union(*vals_list)
+        self._check_create_values(vals_list, given_fields)
+        
+        # Create all records in one batched insert; only the given columns are written, so the
+        # others keep their database default, and rows giving the same columns share a statement
+        rows = [{column: vals[column] for column in self._column_names if column in vals} for vals in vals_list]
+        created_ids = self.env.db.insert_many(self._get_table_name(), rows)
+        self._invalidate_inverse_caches()
+        records = self.browse(created_ids)
+        
+        # Compute stored fields that were not given and update dependents
+        to_compute = self._get_to_compute()
+        for field_name in self._stored_computed_fields:
+            if field_name not in given_fields:
+                to_compute.setdefault((self._name, field_name), set()).update(created_ids)
+        records._modified(given_fields)
+        self.recompute()
         
         # Return new recordset
-        return self.browse(created_ids)
+        return records
+    
+    def _check_create_values(self, vals_list, given_fields):
+        """Check that created values have a column and fill the required fields"""
+        for field_name in given_fields:
+            if field_name not in self._column_set:
+                raise ValueError(f"Field {field_name} of {self._name} has no column")
+        for vals in vals_list:
+            missing = [field_name for field_name in self._required_fields if vals.get(field_name) is None]
+            if missing:
+                raise ValidationError(f"Missing required fields on {self._name}: {', '.join(missing)}")
+    
+    def upsert(self, vals_list, conflict_fields, update_fields=None):
+        """Create records, or update those whose conflict fields already exist
+        
+        ``conflict_fields`` must match a unique index, see ``_unique_keys``.
+        ``update_fields`` lists the fields to overwrite with the new values
+        (by default every given field but the conflict ones), or maps fields
+        to SQL expressions in which ``EXCLUDED.<field>`` is the new value and
+        a bare column the current one, e.g.
+        ``{'quantity': 'quantity + EXCLUDED.quantity'}``. Expressions are
+        trusted SQL and must never be built from user input.
+        """
+        if not isinstance(vals_list, list):
+            vals_list = [vals_list]
+        if not vals_list:
+            return self.browse([])
+        
+        table_name = self._get_table_name()
+        columns = self._get_column_names()
+        vals_list = [self._add_default_values(self._convert_to_write(vals)) for vals in vals_list]
+        given_fields = set().union(*vals_list)
+        for field in list(conflict_fields) + list(update_fields or []):
+            check_identifier(field)
+            if field not in columns:
+                raise ValueError(f"Field {field} of {self._name} has no column")
+        if set(conflict_fields) not in [set(key) for key in self._unique_keys]:
+            raise ValueError(f"Fields {', '.join(conflict_fields)} are not a unique key of {self._name}")
+        conflict_fields = list(conflict_fields)
+        
+        if update_fields is None:
+            update_fields = [field for field in given_fields if field not in conflict_fields and field != 'create_date']
+        if isinstance(update_fields, dict):
+            assignments = {
+                field: self._qualify_upsert_expression(expression, table_name, columns)
+                for field, expression in update_fields.items()
+            }
+        else:
+            # None stands for the new value, only set by rows that give the field
+            assignments = {field: None for field in update_fields}
+        if 'write_date' in columns:
+            assignments.setdefault('write_date', None)
+        
+        results = self.env.db.upsert_many(
+            table_name, vals_list, conflict_fields, assignments,
+            conflict_target=self._unique_key_expressions(conflict_fields)
+        )
+        ids = [record_id for record_id, inserted in results]
+        created_ids = [record_id for record_id, inserted in results if inserted]
+        updated_ids = [record_id for record_id, inserted in results if not inserted]
+        
+        self._get_cache().invalidate(self._name, list(assignments), updated_ids)
+        self._invalidate_inverse_caches()
+        
+        to_compute = self._get_to_compute()
+        for field_name in self._stored_computed_fields:
+            if field_name not in given_fields and created_ids:
+                to_compute.setdefault((self._name, field_name), set()).update(created_ids)
+        self.browse(created_ids)._modified(given_fields)
+        self.browse(updated_ids)._modified(assignments)
+        self.recompute()
+        
+        return self.browse(list(dict.fromkeys(ids)))
+    
+    def _qualify_upsert_expression(self, expression, table_name, columns):
+        """Prefix the bare column names of an upsert expression with the table name"""
+        pattern = r'(?<![\w."])\b(' + '|'.join(re.escape(column) for column in columns) + r')\b(?![\w"(])'
+        return re.sub(pattern, lambda match: f"{table_name}.{match.group(1)}", expression)
     
     def browse(self, ids):
         """Browse records by IDs"""
@@ -162,6 +670,7 @@ class BaseModel(ABC):
         
         new_recordset = self.__class__(self.env, self.cr, self.uid, self.context)
         new_recordset._ids = ids
+        new_recordset._prefetch_ids = ids
         return new_recordset
     
     def read(self, fields=None):
@@ -171,20 +680,32 @@ class BaseModel(ABC):
         
         # Get all fields if not specified
         if not fields:
-            fields = list(self._get_fields().keys())
+            fields = list(self._fields_definitions)
         
         # Add id field
         if 'id' not in fields:
-            fields.insert(0, 'id')
+            fields = ['id'] + list(fields)
         
-        # Read from database
-        results = []
-        for record_id in self._ids:
-            record_data = self.env.db.get_record(self._get_table_name(), record_id)
-            if record_data:
-                # Filter fields
-                filtered_data = {field: record_data.get(field) for field in fields if field in record_data}
-                results.append(filtered_data)
+        # Only fetch requested fields that are backed by a column
+        columns = [field for field in fields if field in self._column_set]
+        
+        # Read all records in batched queries
+        results = self.env.db.read_records(self._get_table_name(), self._ids, columns)
+        
+        # Keep the values for attribute access
+        cache = self._get_cache()
+        for row in results:
+            for column, value in row.items():
+                cache.set(self._name, column, row['id'], value)
+        
+        # Fill in the computed fields that have no column
+        field_defs = self._get_fields()
+        computed_fields = [field for field in fields if field in field_defs and not field_defs[field].store]
+        if computed_fields:
+            records = self.browse([row['id'] for row in results])
+            for index, row in enumerate(results):
+                for field in computed_fields:
+                    row[field] = self._convert_to_cache(field_defs[field], getattr(records[index], field))
         
         return results
     
@@ -193,38 +714,112 @@ class BaseModel(ABC):
         if not self._ids:
             return True
         
-        # Update each record
-        for record_id in self._ids:
-            self.env.db.update_record(self._get_table_name(), record_id, vals)
+        vals = self._convert_to_write(vals)
+        
+        # Records depending on the old relations must be recomputed as well
+        relational_fields = [field for field in vals if field in self._relational_fields]
+        self._modified(relational_fields)
+        
+        # Update all records in one statement
+        self.env.db.update_records(self._get_table_name(), self._ids, vals)
+        self._get_cache().invalidate(self._name, list(vals), self._ids)
+        if not self._many2one_fields.isdisjoint(vals):
+            self._invalidate_inverse_caches()
+        
+        self._modified(vals)
+        self.recompute()
         
         return True
     
+    def write_if(self, vals, condition_domain):
+        """Write values to the records that still match a domain, atomically
+        
+        The condition is checked by the UPDATE itself on the latest version
+        of each row, so two concurrent callers cannot both pass it. Values
+        may be ``SQL`` expressions on the current row, e.g. a stock decrement
+        ``quant.write_if({'quantity': SQL('quantity - %s', qty)},
+        [('quantity', '>=', qty)])``. Returns the number of records written.
+        """
+        if not self._ids:
+            return 0
+        
+        vals = self._convert_to_write(vals)
+        for field in vals:
+            if field not in self._column_set:
+                raise ValueError(f"Field {field} of {self._name} has no column")
+        
+        query = self._where_calc(condition_domain)
+        query.add_where(f"{query.alias}.id = ANY(%s)", [list(self._ids)])
+        statement, params = query.update(vals)
+        
+        relational_fields = [field for field in vals if field in self._relational_fields]
+        self._modified(relational_fields)
+        
+        affected_rows = self.env.db.execute_update(statement, params)
+        self._get_cache().invalidate(self._name, list(vals), self._ids)
+        if not self._many2one_fields.isdisjoint(vals):
+            self._invalidate_inverse_caches()
+        
+        if affected_rows:
+            self._modified(vals)
+        self.recompute()
+        
+        return affected_rows
+    
+    def lock_for_update(self, nowait=False, skip_locked=False):
+        """Lock the rows of the records until the end of the current transaction
+        
+        Rows are locked in id order to avoid deadlocks between callers, and
+        their cached values are dropped so the next reads see the latest
+        committed version. With ``nowait`` a row locked by another transaction
+        raises at once; with ``skip_locked`` it is left out of the returned
+        recordset. Must run inside ``env.transaction()``.
+        """
+        if nowait and skip_locked:
+            raise ValueError("nowait and skip_locked cannot be combined")
+        if not self.env.db.in_transaction():
+            raise ValidationError(f"Locking {self._name} records requires a transaction")
+        if not self._ids:
+            return self.browse([])
+        
+        query = f"SELECT id FROM {self._get_table_name()} WHERE id = ANY(%s) ORDER BY id FOR UPDATE"
+        if nowait:
+            query += " NOWAIT"
+        elif skip_locked:
+            query += " SKIP LOCKED"
+        locked_ids = {row['id'] for row in self.env.db.execute_query(query, (list(self._ids),))}
+        self._get_cache().invalidate(self._name, None, locked_ids)
+        
+        return self.browse([record_id for record_id in self._ids if record_id in locked_ids])
+    
     def unlink(self):
         """Delete records"""
         if not self._ids:
             return True
         
-        # Delete each record
-        for record_id in self._ids:
-            self.env.db.delete_record(self._get_table_name(), record_id)
+        # Find the dependent records while the deleted ones are still there
+        self._modified(self._get_fields())
+        
+        # Delete all records in one statement
+        self.env.db.delete_records(self._get_table_name(), self._ids)
+        self._get_cache().invalidate(self._name, record_ids=self._ids)
+        self._invalidate_inverse_caches()
+        self.recompute()
         
         return True
     
     def search(self, domain=None, limit=None, offset=None, order=None):
         """Search records"""
-        if not domain:
-            domain = []
-        
-        # Convert domain to SQL filters
-        filters = self._domain_to_filters(domain)
+        # Compile domain to a SQL query on the model table
+        query = self._where_calc(domain or [])
+        order_terms = self._parse_order(order or self._order)
+        sql, params = query.select(
+            [f"{query.alias}.id"], limit, offset,
+            order=self._order_by_clause(query.alias, order_terms)
+        )
         
         # Search in database
-        results = self.env.db.search_records(
-            self._get_table_name(), 
-            filters, 
-            limit, 
-            offset
-        )
+        results = self.env.db.execute_query(sql, params, readonly=True)
         
         # Get IDs
         ids = [record['id'] for record in results]
@@ -232,39 +827,283 @@ class BaseModel(ABC):
         # Return recordset
         return self.browse(ids)
     
-    def _domain_to_filters(self, domain):
-        """Convert domain to database filters"""
-        filters = {}
-        i = 0
-        while i < len(domain):
-            if i + 2 < len(domain):
-                field, operator, value = domain[i], domain[i+1], domain[i+2]
-                if operator == '=':
-                    filters[field] = value
-                elif operator == '!=':
-                    # Handle not equal in search_records method
-                    pass
-                elif operator == 'in':
-                    # Handle in operator
-                    pass
-                elif operator == 'not in':
-                    # Handle not in operator
-                    pass
-                i += 3
+    def search_iter(self, domain=None, batch_size=1000, order=None, fields=None):
+        """Iterate over the records matching a domain in batches
+        
+        Yields recordsets of up to ``batch_size`` records, or lists of row
+        tuples with the given column ``fields``. Rows are streamed from a
+        server-side cursor and each batch leaves the cache once consumed, so
+        memory stays flat however many records match.
+        """
+        query = self._where_calc(domain or [])
+        order_terms = self._parse_order(order or self._order)
+        for field in fields or ():
+            if field not in self._column_set:
+                raise ValueError(f"Field {field} of {self._name} has no column")
+        columns = [f"{query.alias}.{field}" for field in (fields or ['id'])]
+        sql, params = query.select(columns, order=self._order_by_clause(query.alias, order_terms))
+        
+        rows = self.env.db.stream_query(sql, params, itersize=batch_size, as_dict=False, readonly=True)
+        cache = self._get_cache()
+        while True:
+            batch = [row if fields else row[0] for row in itertools.islice(rows, batch_size)]
+            if not batch:
+                return
+            if fields:
+                yield batch
+                continue
+            yield self.browse(batch)
+            # The consumer is done with the batch, keep the cache from growing
+            cache.invalidate(self._name, record_ids=batch)
+    
+    def search_after(self, cursor=None, limit=80, domain=None, order=None):
+        """Search one page of records using keyset pagination
+        
+        Returns the page and the cursor to pass for the next page, or None
+        when there are no more records. Each page costs the same whatever its
+        depth because it seeks past the cursor on the order columns instead
+        of skipping rows with OFFSET.
+        """
+        query = self._where_calc(domain or [])
+        order_terms = self._parse_order(order or self._order)
+        
+        # The id makes the order total, so the cursor points at exactly one row
+        if not any(field_name == 'id' for field_name, _, _ in order_terms):
+            order_terms.append(('id', 'ASC', None))
+        
+        if cursor is not None:
+            if len(cursor) != len(order_terms):
+                raise ValueError(f"Invalid cursor {cursor!r} for order {order or self._order!r}")
+            sql, params = self._keyset_condition(query.alias, order_terms, cursor)
+            query.add_where(sql, params)
+        
+        # The order terms include the id, so it is selected with them
+        columns = [f"{query.alias}.{field_name} AS {field_name}" for field_name, _, _ in order_terms]
+        sql, params = query.select(
+            columns, limit,
+            order=self._order_by_clause(query.alias, order_terms)
+        )
+        rows = self.env.db.execute_query(sql, params, readonly=True)
+        
+        next_cursor = None
+        if rows and limit and len(rows) == limit:
+            next_cursor = tuple(rows[-1][field_name] for field_name, _, _ in order_terms)
+        return self.browse([row['id'] for row in rows]), next_cursor
+    
+    def _parse_order(self, order):
+        """Parse an order spec into (field, direction, nulls) terms"""
+        stored_columns = self._column_set
+        terms = []
+        for term in order.split(','):
+            parts = term.strip().split()
+            if not parts:
+                continue
+            field_name = parts[0]
+            direction = parts[1].upper() if len(parts) > 1 else 'ASC'
+            nulls = ' '.join(parts[2:]).upper() or None
+            if (field_name not in stored_columns or direction not in ('ASC', 'DESC')
+                    or nulls not in (None, 'NULLS FIRST', 'NULLS LAST')):
+                raise ValueError(f"Invalid order {order!r} for model {self._name}")
+            terms.append((field_name, direction, nulls))
+        return terms
+    
+    @staticmethod
+    def _nulls_order(direction, nulls):
+        """Get the NULL ordering of an order term, PostgreSQL's default when unspecified"""
+        return nulls or ('NULLS LAST' if direction == 'ASC' else 'NULLS FIRST')
+    
+    def _order_by_clause(self, table_alias, order_terms):
+        """Render parsed order terms as an ORDER BY clause
+        
+        The NULL ordering is always written, so every backend sorts NULLs
+        the way ``_keyset_condition`` expects.
+        """
+        clauses = []
+        for field_name, direction, nulls in order_terms:
+            clauses.append(f"{table_alias}.{field_name} {direction} {self._nulls_order(direction, nulls)}")
+        return ', '.join(clauses) or None
+    
+    def _keyset_condition(self, table_alias, order_terms, cursor):
+        """Build the condition selecting rows that sort after the cursor"""
+        alternatives = []
+        equal_sql, equal_params = [], []
+        for (field_name, direction, nulls), value in zip(order_terms, cursor):
+            column = f"{table_alias}.{field_name}"
+            comparator = '>' if direction == 'ASC' else '<'
+            nulls_last = self._nulls_order(direction, nulls) == 'NULLS LAST'
+            
+            if value is None:
+                after_sql, after_params = (None, []) if nulls_last else (f"{column} IS NOT NULL", [])
+            elif nulls_last:
+                after_sql, after_params = f"({column} {comparator} %s OR {column} IS NULL)", [value]
+            else:
+                after_sql, after_params = f"{column} {comparator} %s", [value]
+            
+            if after_sql:
+                alternatives.append((' AND '.join(equal_sql + [after_sql]), equal_params + after_params))
+            
+            if value is None:
+                equal_sql.append(f"{column} IS NULL")
             else:
-                i += 1
+                equal_sql.append(f"{column} = %s")
+                equal_params = equal_params + [value]
         
-        return filters
+        if not alternatives:
+            return 'FALSE', []
+        sql = ' OR '.join(f"({alternative})" for alternative, _ in alternatives)
+        params = [param for _, alternative_params in alternatives for param in alternative_params]
+        return f"({sql})", params
+    
+    def search_count(self, domain=None):
+        """Count records matching a domain"""
+        query = self._where_calc(domain or [])
+        sql, params = query.select(['COUNT(*) AS count'])
+        return self.env.db.execute_query(sql, params, readonly=True)[0]['count']
+    
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=None, lazy=True):
+        """Aggregate records matching a domain, grouped by fields
+        
+        ``fields`` items are ``'field'``, ``'field:agg'`` or ``'name:agg(field)'``
+        with agg one of count, sum, avg, min or max. ``groupby`` items are field
+        names, optionally with a date granularity such as ``'date_order:month'``.
+        With ``lazy`` only the first groupby is applied.
+        """
+        if isinstance(groupby, str):
+            groupby = [groupby]
+        groupby = list(groupby or [])
+        if lazy and groupby:
+            groupby = groupby[:1]
+        
+        domain = list(domain or [])
+        query = self._where_calc(domain)
+        table_alias = query.alias
+        
+        # Group by columns, truncating dates to the requested period
+        groups = [self._read_group_groupby(table_alias, spec) for spec in groupby]
+        aggregates = self._read_group_aggregates(table_alias, fields, [group['field'] for group in groups])
+        count_key = f"{groupby[0]}_count" if lazy and groupby else '__count'
+        
+        select = [f"{group['expr']} AS {group['alias']}" for group in groups]
+        select += [f"{aggregate['expr']} AS {aggregate['alias']}" for aggregate in aggregates]
+        select.append("COUNT(*) AS __count")
+        
+        order = self._read_group_orderby(orderby, groups, aggregates, count_key)
+        sql, params = query.select(
+            select, limit, offset,
+            order=order,
+            group_by=[group['expr'] for group in groups]
+        )
+        
+        results = []
+        for row in self.env.db.execute_query(sql, params, readonly=True):
+            for group in groups:
+                if group['granularity'] and isinstance(row[group['alias']], str):
+                    # Backends without a timestamp type return the period start as ISO text
+                    period_start = datetime.fromisoformat(row[group['alias']])
+                    row[group['alias']] = period_start.date() if group['type'] == 'date' else period_start
+            result = {group['name']: row[group['alias']] for group in groups}
+            for aggregate in aggregates:
+                result[aggregate['name']] = row[aggregate['alias']]
+            result[count_key] = row['__count']
+            result['__domain'] = domain + self._read_group_domain(groups, row)
+            results.append(result)
+        
+        return results
+    
+    def _read_group_groupby(self, table_alias, spec):
+        """Parse a groupby spec into its SQL expression"""
+        field_name, _, granularity = spec.partition(':')
+        field_def = self._get_fields().get(field_name)
+        if field_name != 'id' and (field_def is None or field_def.type in ('one2many', 'many2many')):
+            raise ValueError(f"Invalid groupby field {field_name!r} for model {self._name}")
+        
+        column = f"{table_alias}.{check_identifier(field_name)}"
+        if not granularity:
+            return {'name': spec, 'field': field_name, 'alias': field_name,
+                    'expr': column, 'granularity': None}
+        
+        if granularity not in READ_GROUP_PERIODS or field_def is None or field_def.type not in ('date', 'datetime'):
+            raise ValueError(f"Invalid groupby granularity {spec!r} for model {self._name}")
+        # date_trunc gives a timestamp, date fields are grouped by date
+        expr = f"date_trunc('{granularity}', {column})"
+        if field_def.type == 'date':
+            expr += '::date'
+        return {'name': spec, 'field': field_name, 'alias': f"{field_name}__{granularity}",
+                'expr': expr, 'granularity': granularity, 'type': field_def.type}
+    
+    def _read_group_aggregates(self, table_alias, fields, groupby_fields):
+        """Parse read_group field specs into aggregate expressions"""
+        aggregates = []
+        for spec in fields or []:
+            name, _, func = spec.partition(':')
+            field_name = name
+            if '(' in func:
+                func, _, field_name = func.partition('(')
+                field_name = field_name.rstrip(')')
+            
+            field_def = self._get_fields().get(field_name)
+            if field_name != 'id' and field_def is None:
+                raise ValueError(f"Invalid field {field_name!r} in read_group for model {self._name}")
+            if not func:
+                # Plain numeric fields default to a sum, anything else is skipped
+                if field_name in groupby_fields or field_def is None or field_def.type not in ('integer', 'float'):
+                    continue
+                func = 'sum'
+            
+            func = func.lower()
+            if func not in READ_GROUP_AGGREGATES:
+                raise ValueError(f"Invalid aggregate function {func!r} in read_group")
+            aggregates.append({
+                'name': name,
+                'alias': check_identifier(name),
+                'expr': f"{func.upper()}({table_alias}.{check_identifier(field_name)})",
+            })
+        return aggregates
+    
+    def _read_group_orderby(self, orderby, groups, aggregates, count_key):
+        """Translate a read_group orderby into SQL on the selected aliases"""
+        if not orderby:
+            return ', '.join(f"{group['alias']} ASC {self._nulls_order('ASC', None)}" for group in groups) or None
+        
+        aliases = {group['name']: group['alias'] for group in groups}
+        aliases.update({aggregate['name']: aggregate['alias'] for aggregate in aggregates})
+        aliases[count_key] = '__count'
+        aliases['__count'] = '__count'
+        
+        terms = []
+        for term in orderby.split(','):
+            parts = term.split()
+            if not parts or parts[0] not in aliases or len(parts) > 2:
+                raise ValueError(f"Invalid read_group orderby {orderby!r}")
+            direction = parts[1].upper() if len(parts) == 2 else 'ASC'
+            if direction not in ('ASC', 'DESC'):
+                raise ValueError(f"Invalid read_group orderby {orderby!r}")
+            terms.append(f"{aliases[parts[0]]} {direction} {self._nulls_order(direction, None)}")
+        return ', '.join(terms)
+    
+    def _read_group_domain(self, groups, row):
+        """Build the domain selecting the records of one group"""
+        domain = []
+        for group in groups:
+            value = row[group['alias']]
+            if group['granularity'] and value is not None:
+                domain += [
+                    (group['field'], '>=', value),
+                    (group['field'], '<', value + READ_GROUP_PERIODS[group['granularity']]),
+                ]
+            else:
+                domain.append((group['field'], '=', value))
+        return domain
+    
+    def _where_calc(self, domain):
+        """Compile a domain into a Query on the model table"""
+        return compile_domain(self.__class__, domain)
     
     def _add_default_values(self, vals):
         """Add default values to vals"""
-        fields = self._get_fields()
-        for field_name, field_def in fields.items():
-            if field_name not in vals and field_def.default is not None:
-                if callable(field_def.default):
-                    vals[field_name] = field_def.default()
-                else:
-                    vals[field_name] = field_def.default
+        for field_name, default in self._default_values:
+            if field_name not in vals:
+                vals[field_name] = default() if callable(default) else default
         
         # Add create_date and write_date
         now = datetime.now()
@@ -275,13 +1114,326 @@ class BaseModel(ABC):
         
         return vals
     
+    @property
+    def id(self):
+        """Get the id of a single record, or False for an empty recordset"""
+        if not self._ids:
+            return False
+        self.ensure_one()
+        return self._ids[0]
+    
+    @property
+    def ids(self):
+        """Get the ids of the records"""
+        return list(self._ids)
+    
+    def ensure_one(self):
+        """Check that the recordset holds exactly one record"""
+        if len(self._ids) != 1:
+            raise ValueError(f"Expected singleton: {self._name}{tuple(self._ids)}")
+        return self
+    
+    def mapped(self, path):
+        """Get field values of all records, following a dotted path"""
+        field_name, _, rest = path.partition('.')
+        field_def = self._get_fields().get(field_name)
+        
+        if field_def is not None and field_def.type in ('many2one', 'one2many', 'many2many'):
+            ids = []
+            for record in self:
+                ids.extend(getattr(record, field_name)._ids)
+            comodel = self._get_model_class(field_def.comodel_name)(self.env, self.cr, self.uid, self.context)
+            result = comodel.browse(list(dict.fromkeys(ids)))
+            return result.mapped(rest) if rest else result
+        
+        return [getattr(record, field_name) for record in self]
+    
+    def _get_cache(self):
+        """Get the record cache of the environment"""
+        cache = getattr(self.env, 'cache', None)
+        if cache is None:
+            cache = RecordCache()
+            if self.env is not None:
+                self.env.cache = cache
+        return cache
+    
+    def _get_field_value(self, field_def):
+        """Get a field value of a single record, fetching it for the prefetch set on a miss"""
+        if not self._ids:
+            return self._convert_to_record(field_def, False)
+        record_id = self.ensure_one()._ids[0]
+        
+        # Stored computed values waiting for recompute are stale in the cache
+        pending_ids = self._get_to_compute().get((self._name, field_def.name))
+        if pending_ids and record_id in pending_ids:
+            self._recompute_field(field_def.name)
+        
+        cache = self._get_cache()
+        if not cache.contains(self._name, field_def.name, record_id):
+            self._fetch_field(field_def)
+            if not cache.contains(self._name, field_def.name, record_id):
+                raise MissingError(f"Record does not exist or has been deleted: {self._name}({record_id})")
+        
+        return self._convert_to_record(field_def, cache.get(self._name, field_def.name, record_id))
+    
+    def _fetch_field(self, field_def):
+        """Load a field for the current record and every uncached record of its prefetch set"""
+        cache = self._get_cache()
+        ids = cache.get_missing_ids(self._name, field_def.name, list(self._ids) + list(self._prefetch_ids))
+        if not ids:
+            return
+        
+        if not field_def.store:
+            self.browse(ids)._compute_fields(self._get_fields_computed_with(field_def))
+        elif field_def.type == 'one2many':
+            self._fetch_one2many(field_def, ids)
+        elif field_def.type == 'many2many':
+            self._fetch_many2many(field_def, ids)
+        else:
+            # Fetch the other plain columns too, they are usually read next
+            columns = [field_def.name] + [
+                name for name, other in self._get_fields().items()
+                if name != field_def.name and other.store and other.type not in PREFETCH_EXCLUDED_TYPES
+            ]
+            for row in self.env.db.read_records(self._get_table_name(), ids, columns):
+                for column, value in row.items():
+                    if column != 'id':
+                        cache.set(self._name, column, row['id'], value)
+    
+    def _fetch_one2many(self, field_def, ids):
+        """Load a One2many field for several records in one query"""
+        comodel = self._get_model_class(field_def.comodel_name)
+        query = compile_domain(comodel, [(field_def.inverse_name, 'in', ids)])
+        comodel_recordset = comodel(self.env, self.cr, self.uid, self.context)
+        sql, params = query.select(
+            [f"{query.alias}.id AS id", f"{query.alias}.{field_def.inverse_name} AS inverse_id"],
+            order=comodel_recordset._order_by_clause(query.alias, comodel_recordset._parse_order(comodel._order))
+        )
+        
+        lines = {record_id: [] for record_id in ids}
+        for row in self.env.db.execute_query(sql, params, readonly=True):
+            lines[row['inverse_id']].append(row['id'])
+        
+        cache = self._get_cache()
+        for record_id, line_ids in lines.items():
+            cache.set(self._name, field_def.name, record_id, tuple(line_ids))
+    
+    def _fetch_many2many(self, field_def, ids):
+        """Load a Many2many field for several records in one query"""
+        comodel = self._get_model_class(field_def.comodel_name)
+        relation, column1, column2 = field_def.get_relation(self.__class__, comodel)
+        sql = f"SELECT {column1} AS record_id, {column2} AS target_id FROM {relation} WHERE {column1} = ANY(%s)"
+        
+        targets = {record_id: [] for record_id in ids}
+        for row in self.env.db.execute_query(sql, (ids,), readonly=True):
+            targets[row['record_id']].append(row['target_id'])
+        
+        cache = self._get_cache()
+        for record_id, target_ids in targets.items():
+            cache.set(self._name, field_def.name, record_id, tuple(target_ids))
+    
+    def _convert_to_record(self, field_def, value):
+        """Convert a cached value to what attribute access returns"""
+        if field_def.type not in ('many2one', 'one2many', 'many2many'):
+            return value
+        
+        comodel = self._get_model_class(field_def.comodel_name)
+        recordset = comodel(self.env, self.cr, self.uid, self.context)
+        if isinstance(value, tuple):
+            recordset._ids = list(value)
+        else:
+            recordset._ids = [value] if value else []
+        
+        # Share the targets of the whole prefetch set so their fields load in one query
+        recordset._prefetch_ids = _RelatedPrefetch(
+            self._get_cache(), self._name, field_def.name, self._prefetch_ids or self._ids
+        )
+        return recordset
+    
+    def _convert_to_cache(self, field_def, value):
+        """Convert an assigned value to what the record cache holds"""
+        if isinstance(value, BaseModel):
+            if field_def.type == 'many2one':
+                return value._ids[0] if value._ids else None
+            return tuple(value._ids)
+        if field_def.type in ('one2many', 'many2many'):
+            return tuple(value or ())
+        return value
+    
+    def _set_field_value(self, field_def, value):
+        """Assign a field on the records, in the cache only while it is computed"""
+        if (self._name, field_def.name) not in getattr(self.env, 'computing', ()):
+            self.write({field_def.name: value})
+            return
+        
+        cache = self._get_cache()
+        value = self._convert_to_cache(field_def, value)
+        for record_id in self._ids:
+            cache.set(self._name, field_def.name, record_id, value)
+    
+    def _get_to_compute(self):
+        """Get the stored computed fields waiting for recompute in the environment"""
+        to_compute = getattr(self.env, 'to_compute', None)
+        if to_compute is None:
+            to_compute = {}
+            if self.env is not None:
+                self.env.to_compute = to_compute
+                self.env.computing = set()
+                self.env.recompute_deferred = 0
+        return to_compute
+    
+    def _get_fields_computed_with(self, field_def):
+        """Get the names of the fields assigned by the same compute method"""
+        if not field_def.compute:
+            return [field_def.name]
+        return [
+            name for name, other in self._get_fields().items()
+            if other.compute == field_def.compute and other.store == field_def.store
+        ]
+    
+    def _modified(self, field_names):
+        """Mark the computed fields depending on the given fields of the records"""
+        if not self._ids:
+            return
+        
+        triggers = get_field_triggers()
+        to_compute = self._get_to_compute()
+        # Fields computed on the same records share one search of them
+        targets_by_path = {}
+        for field_name in field_names:
+            for model_name, target_field, path in triggers.get((self._name, field_name), ()):
+                model_class = models_registry[model_name]
+                targets = targets_by_path.get((model_name, path))
+                if targets is None:
+                    records = model_class(self.env, self.cr, self.uid, self.context)
+                    targets = records.browse(self._ids) if path is None else records.search([(path, 'in', self._ids)])
+                    targets_by_path[(model_name, path)] = targets
+                if not targets._ids:
+                    continue
+                
+                if model_class._get_fields()[target_field].store:
+                    to_compute.setdefault((model_name, target_field), set()).update(targets._ids)
+                else:
+                    # Nothing to write, drop the cached values and follow the chain
+                    targets._get_cache().invalidate(model_name, [target_field], targets._ids)
+                    targets._modified([target_field])
+    
+    def _compute_fields(self, field_names):
+        """Run the compute method of the fields on the records, filling the cache"""
+        field_def = self._get_fields()[field_names[0]]
+        computing = [(self._name, name) for name in field_names]
+        self._get_to_compute()
+        self.env.computing.update(computing)
+        try:
+            if field_def.related:
+                self._compute_related(field_def)
+            else:
+                getattr(self, field_def.compute)()
+        finally:
+            self.env.computing.difference_update(computing)
+    
+    def _compute_related(self, field_def):
+        """Compute a related field by following its path on each record"""
+        segments = field_def.related.split('.')
+        for record in self:
+            value = record
+            for segment in segments[:-1]:
+                value = getattr(value, segment)[:1]
+            setattr(record, field_def.name, getattr(value, segments[-1]) if value else False)
+    
+    def _recompute_field(self, field_name):
+        """Recompute a stored field on its pending records and write the new values"""
+        field_def = self._get_fields()[field_name]
+        field_names = self._get_fields_computed_with(field_def)
+        to_compute = self._get_to_compute()
+        
+        ids = set()
+        for name in field_names:
+            ids.update(to_compute.pop((self._name, name), ()))
+        if not ids:
+            return
+        
+        # Records deleted since they were marked have nothing to recompute
+        table_name = self._get_table_name()
+        existing_ids = [row['id'] for row in self.env.db.read_records(table_name, sorted(ids), ['id'])]
+        if not existing_ids:
+            return
+        
+        records = self.browse(existing_ids)
+        records._get_cache().invalidate(self._name, field_names, existing_ids)
+        records._compute_fields(field_names)
+        
+        cache = records._get_cache()
+        fields = self._get_fields()
+        rows = [
+            (record_id,) + tuple(
+                cache.get(self._name, name, record_id) if cache.contains(self._name, name, record_id) else None
+                for name in field_names
+            )
+            for record_id in existing_ids
+        ]
+        column_types = [get_column_type(fields[name]).lower() for name in field_names]
+        self.env.db.update_many(table_name, field_names, rows, column_types)
+        
+        # Other computed fields may depend on the new values
+        records._modified(field_names)
+    
+    def recompute(self):
+        """Recompute the stored computed fields waiting in the environment"""
+        if getattr(self.env, 'recompute_deferred', 0):
+            return
+        
+        to_compute = self._get_to_compute()
+        self.env.recompute_deferred += 1
+        try:
+            for _ in range(MAX_RECOMPUTE_ROUNDS):
+                if not to_compute:
+                    return
+                model_name, field_name = next(iter(to_compute))
+                model_class = models_registry[model_name]
+                model_class(self.env, self.cr, self.uid, self.context)._recompute_field(field_name)
+            raise ValidationError(f"Recompute did not settle, check for cyclic dependencies: {list(to_compute)}")
+        finally:
+            self.env.recompute_deferred -= 1
+    
+    def _convert_to_write(self, vals):
+        """Convert recordset values to ids before writing"""
+        result = {}
+        for field_name, value in vals.items():
+            if isinstance(value, BaseModel):
+                value = value.id
+            result[field_name] = value
+        return result
+    
+    def _invalidate_inverse_caches(self):
+        """Drop cached One2many/Many2many values that may list records of this model"""
+        cache = self._get_cache()
+        for model_name, field_name in get_inverse_fields().get(self._name, ()):
+            cache.invalidate(model_name, [field_name])
+    
+    def __eq__(self, other):
+        """Recordsets are equal when they hold the same records of the same model"""
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return self._name == other._name and list(self._ids) == list(other._ids)
+    
+    def __hash__(self):
+        return hash((self._name, tuple(self._ids)))
+    
+    def __repr__(self):
+        return f"{self._name}{tuple(self._ids)}"
+    
     def __getitem__(self, key):
         """Get record by index"""
         if isinstance(key, int):
             if 0 <= key < len(self._ids):
-                return self.browse([self._ids[key]])
+                record = self.browse([self._ids[key]])
+                record._prefetch_ids = self._prefetch_ids
+                return record
         elif isinstance(key, slice):
-            return self.browse(self._ids[key])
+            records = self.browse(self._ids[key])
+            records._prefetch_ids = self._prefetch_ids
+            return records
         raise IndexError("Record index out of range")
     
     def __len__(self):
@@ -296,9 +1448,10 @@ class BaseModel(ABC):
 class ORMManager:
     """ORM Manager for ERP System"""
     
-    def __init__(self, config):
+    def __init__(self, config, db_manager=None):
         """Initialize ORM manager"""
         self.config = config
+        self.db_manager = db_manager
         self.models = {}
         self.logger = logging.getLogger('ERP.ORM')
         
@@ -326,55 +1479,157 @@ class ORMManager:
         """Register a model class"""
         if hasattr(model_class, '_name') and model_class._name:
             self.models[model_class._name] = model_class
+            models_registry[model_class._name] = model_class
+            invalidate_field_triggers()
             self.logger.info(f"Registered model: {model_class._name}")
     
     def get_model(self, model_name):
         """Get model class by name"""
         return self.models.get(model_name)
     
+    def _get_all_models(self):
+        """Get all model classes, defined or explicitly registered"""
+        models = dict(models_registry)
+        models.update(self.models)
+        return models
+    
     def create_tables(self):
-        """Create database tables for all models"""
-        for model_name, model_class in self.models.items():
+        """Create or update database tables for all models"""
+        for model_name, model_class in self._get_all_models().items():
+            if model_class._abstract or not model_class._auto:
+                continue
             self._create_model_table(model_class)
     
+    def _get_column_type(self, field_def):
+        """Get the SQL column type for a field, or None if it has no column"""
+        return get_column_type(field_def)
+    
+    def _get_model_columns(self, model_class):
+        """Get column definitions for a model"""
+        columns = {'id': 'SERIAL PRIMARY KEY'}
+        
+        for field_name, field_def in model_class._get_fields().items():
+            column_type = self._get_column_type(field_def)
+            if column_type:
+                columns[field_name] = column_type
+        
+        # Add standard fields
+        columns.setdefault('create_date', "TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+        columns.setdefault('write_date', "TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+        columns.setdefault('create_uid', "INTEGER")
+        columns.setdefault('write_uid', "INTEGER")
+        
+        return columns
+    
+    def _get_model_indexes(self, model_class):
+        """Get index definitions for a model as {index_name: column}"""
+        table_name = model_class._get_table_name()
+        indexes = {}
+        
+        for field_name, field_def in model_class._get_fields().items():
+            if self._get_column_type(field_def) is None:
+                continue
+            if field_def.index or isinstance(field_def, Many2OneField) or field_name in AUTO_INDEX_COLUMNS:
+                indexes[make_index_name(table_name, field_name)] = field_name
+        
+        return indexes
+    
+    def _get_model_unique_indexes(self, model_class):
+        """Get unique index definitions for a model as {index_name: expressions}"""
+        table_name = model_class._get_table_name()
+        return {
+            make_index_name(table_name, '_'.join(fields) + '_key'): ', '.join(model_class._unique_key_expressions(fields))
+            for fields in model_class._unique_keys
+        }
+    
+    def _create_unique_indexes(self, model_class, concurrently):
+        """Build missing unique indexes, leaving none behind half-built
+        
+        Unique indexes of keys the model no longer declares are dropped, so
+        they cannot make rows conflict on a subset of the current key.
+        """
+        table_name = model_class._get_table_name()
+        db = self.db_manager
+        existing_indexes = db.get_table_indexes(table_name)
+        unique_indexes = self._get_model_unique_indexes(model_class)
+        mode = 'CONCURRENTLY ' if concurrently else ''
+        for index_name in db.get_table_unique_indexes(table_name):
+            if index_name.startswith(f"{table_name}_") and index_name not in unique_indexes:
+                db.execute_ddl(f"DROP INDEX {mode}IF EXISTS {index_name}", autocommit=concurrently)
+                self.logger.info(f"Dropped unique index {index_name}")
+        
+        for index_name, columns in unique_indexes.items():
+            if index_name in existing_indexes:
+                continue
+            try:
+                db.execute_ddl(
+                    f"CREATE UNIQUE INDEX {mode}IF NOT EXISTS {index_name} ON {table_name} ({columns})",
+                    autocommit=concurrently
+                )
+                self.logger.info(f"Created unique index {index_name}")
+            except Exception as e:
+                # Duplicates already in the table; a failed concurrent build leaves an invalid index
+                self.logger.warning(f"Cannot create unique index {index_name} on {table_name}: {e}")
+                if concurrently:
+                    db.execute_ddl(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}", autocommit=True)
+    
     def _create_model_table(self, model_class):
-        """Create table for a model"""
+        """Create table for a model, or bring an existing table up to date"""
         try:
             table_name = model_class._get_table_name()
-            fields = model_class._get_fields()
+            db = self.db_manager
+            if db is None:
+                raise Exception("Database manager not set on ORM manager")
             
-            # Build column definitions
-            columns = {'id': 'SERIAL PRIMARY KEY'}
-            
-            for field_name, field_def in fields.items():
-                if isinstance(field_def, CharField):
-                    columns[field_name] = f"VARCHAR({field_def.size})"
-                elif isinstance(field_def, TextField):
-                    columns[field_name] = "TEXT"
-                elif isinstance(field_def, IntegerField):
-                    columns[field_name] = "INTEGER"
-                elif isinstance(field_def, FloatField):
-                    columns[field_name] = "FLOAT"
-                elif isinstance(field_def, BooleanField):
-                    columns[field_name] = "BOOLEAN"
-                elif isinstance(field_def, DateField):
-                    columns[field_name] = "DATE"
-                elif isinstance(field_def, DateTimeField):
-                    columns[field_name] = "TIMESTAMP"
-                elif isinstance(field_def, Many2OneField):
-                    columns[field_name] = "INTEGER"
-                else:
-                    columns[field_name] = "VARCHAR(255)"
+            columns = self._get_model_columns(model_class)
+            indexes = self._get_model_indexes(model_class)
             
-            # Add standard fields
-            columns['create_date'] = "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
-            columns['write_date'] = "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
-            columns['create_uid'] = "INTEGER"
-            columns['write_uid'] = "INTEGER"
+            if not db.table_exists(table_name):
+                # Fresh table: indexes can be built inside the transaction
+                db.create_table(table_name, columns)
+                for index_name, column in indexes.items():
+                    db.execute_ddl(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column})")
+                self._create_unique_indexes(model_class, concurrently=False)
+                self.logger.info(f"Table {table_name} created with {len(indexes)} indexes")
+            else:
+                # Existing table: add missing columns and build missing indexes without locking writes
+                existing_columns = db.get_table_columns(table_name)
+                for column, column_type in columns.items():
+                    if column not in existing_columns:
+                        db.execute_ddl(f"ALTER TABLE {table_name} ADD COLUMN {column} {column_type}")
+                        self.logger.info(f"Added column {table_name}.{column}")
+                
+                existing_indexes = db.get_table_indexes(table_name)
+                for index_name, column in indexes.items():
+                    if index_name not in existing_indexes:
+                        db.execute_ddl(
+                            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table_name} ({column})",
+                            autocommit=True
+                        )
+                        self.logger.info(f"Created index {index_name}")
+                self._create_unique_indexes(model_class, concurrently=True)
             
-            # Create table
-            # This would use the database manager to create the table
-            self.logger.info(f"Table structure defined for {table_name}")
+            self._create_relation_tables(model_class)
             
         except Exception as e:
-            self.logger.error(f"Failed to create table for {model_class._name}: {e}")
\ No newline at end of file
+            self.logger.error(f"Failed to create table for {model_class._name}: {e}")
+    
+    def _create_relation_tables(self, model_class):
+        """Create relation tables for Many2many fields"""
+        for field_name, field_def in model_class._get_fields().items():
+            if not isinstance(field_def, Many2ManyField):
+                continue
+            comodel_class = self._get_all_models().get(field_def.comodel_name)
+            if comodel_class is None:
+                self.logger.warning(f"Skipping relation {model_class._name}.{field_name}: unknown model {field_def.comodel_name}")
+                continue
+            
+            relation, column1, column2 = field_def.get_relation(model_class, comodel_class)
+            self.db_manager.execute_ddl(
+                f"CREATE TABLE IF NOT EXISTS {relation} ("
+                f"{column1} INTEGER NOT NULL, {column2} INTEGER NOT NULL, "
+                f"PRIMARY KEY ({column1}, {column2}))"
+            )
+            self.db_manager.execute_ddl(
+                f"CREATE INDEX IF NOT EXISTS {make_index_name(relation, column2)} ON {relation} ({column2})"
+            )
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - URL Routing
+===============================
+
+Declarative routes compiled into a segment trie for the standalone ERP system.
+
+Handlers are registered with the ``route`` decorator, using the addon
+``@http.route`` pattern syntax: ``/api/website/page/<int:page_id>``. Each
+path segment is looked up in a dict, so dispatch time depends on the depth
+of the path and not on the number of routes.
+
+Addon controllers subclass ``Controller``; the addon manager imports the
+``controllers`` package of each installed addon, so their routes are
+compiled with the built-in ones.
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+# Pattern segment holding a parameter, e.g. <int:page_id> or <name>
+_PARAMETER = re.compile(r'^<(?:(?P<converter>[a-z]+):)?(?P<name>[A-Za-z_][A-Za-z0-9_]*)>$')
+
+class NotFound(Exception):
+    """No route matches the path"""
+    pass
+
+class MethodNotAllowed(Exception):
+    """A route matches the path, but not for the request method"""
+    
+    def __init__(self, allowed_methods):
+        super().__init__(f"Allowed methods: {', '.join(allowed_methods)}")
+        self.allowed_methods = allowed_methods
+
+def to_int(segment: str) -> int:
+    """Convert an <int:...> segment, only plain digits match"""
+    if not (segment.isascii() and segment.isdigit()):
+        raise ValueError(segment)
+    return int(segment)
+
+def to_float(segment: str) -> float:
+    """Convert a <float:...> segment, only digits with a decimal point match"""
+    whole, dot, fraction = segment.partition('.')
+    if not (dot and whole.isascii() and whole.isdigit() and fraction.isascii() and fraction.isdigit()):
+        raise ValueError(segment)
+    return float(segment)
+
+def to_string(segment: str) -> str:
+    """Convert a <string:...> segment, any non-empty segment matches"""
+    if not segment:
+        raise ValueError(segment)
+    return segment
+
+# Converters of one segment, tried in this order when several match
+CONVERTERS = {
+    'int': to_int,
+    'float': to_float,
+    'string': to_string,
+}
+CONVERTER_PRIORITY = ('int', 'float', 'string')
+
+# Matches the rest of the path, slashes included
+PATH_CONVERTER = 'path'
+
+def route(paths, type='http', auth='user', methods=None, **options):
+    """Register the decorated method as the handler of one or more URL patterns
+    
+    ``methods`` limits the HTTP methods, all are accepted by default. The
+    other options (``type``, ``auth``, ``csrf``, ...) are kept on the route
+    for the handler to check.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    
+    def decorator(function):
+        routes = list(getattr(function, 'routes', ()))
+        for path in paths:
+            routes.append((path, {
+                'type': type,
+                'auth': auth,
+                'methods': [method.upper() for method in methods] if methods else None,
+                **options,
+            }))
+        function.routes = routes
+        return function
+    return decorator
+
+class Controller:
+    """Base class of addon controllers, whose routes are served by the web interface"""
+    
+    registry = []
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Controller.registry.append(cls)
+
+class Endpoint:
+    """Handler of a route, with the class it is defined on and its options"""
+    
+    __slots__ = ('owner', 'function', 'pattern', 'options')
+    
+    def __init__(self, owner, function, pattern, options):
+        self.owner = owner
+        self.function = function
+        self.pattern = pattern
+        self.options = options
+    
+    def __repr__(self):
+        return f"Endpoint({self.pattern!r}, {self.owner.__name__}.{self.function.__name__})"
+
+class _Node:
+    """Trie node of one path segment"""
+    
+    __slots__ = ('static', 'dynamic', 'path', 'endpoints')
+    
+    def __init__(self):
+        self.static = {}
+        self.dynamic = []
+        self.path = None
+        self.endpoints = {}
+
+class Router:
+    """Segment trie of the registered routes"""
+    
+    def __init__(self):
+        self.root = _Node()
+        self.routes = []
+        # Endpoints of the patterns without parameters, matched in one lookup
+        self.static_routes = {}
+    
+    def add(self, pattern: str, endpoint: Any, methods: List[str] = None):
+        """Register an endpoint for a URL pattern and HTTP methods (all by default)"""
+        if not pattern.startswith('/'):
+            raise ValueError(f"Route {pattern} must start with /")
+        
+        node = self.root
+        segments = pattern.split('/')[1:]
+        for index, segment in enumerate(segments):
+            parameter = _PARAMETER.match(segment)
+            if not parameter:
+                node = node.static.setdefault(segment, _Node())
+                continue
+            
+            converter = parameter.group('converter') or 'string'
+            name = parameter.group('name')
+            if converter == PATH_CONVERTER:
+                if index != len(segments) - 1:
+                    raise ValueError(f"Route {pattern}: <path:{name}> must be the last segment")
+                if node.path is None:
+                    node.path = (name, _Node())
+                elif node.path[0] != name:
+                    raise ValueError(f"Route {pattern}: parameter {name} conflicts with {node.path[0]}")
+                node = node.path[1]
+                continue
+            if converter not in CONVERTERS:
+                raise ValueError(f"Route {pattern}: unknown converter {converter}")
+            
+            for child_converter, child_name, child in node.dynamic:
+                if child_converter == converter:
+                    if child_name != name:
+                        raise ValueError(f"Route {pattern}: parameter {name} conflicts with {child_name}")
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.dynamic.append((converter, name, child))
+                node.dynamic.sort(key=lambda item: CONVERTER_PRIORITY.index(item[0]))
+                node = child
+        
+        for method in methods or ['*']:
+            if method in node.endpoints:
+                raise ValueError(f"Route {pattern} is already registered for {method}")
+            node.endpoints[method] = endpoint
+        if '<' not in pattern:
+            self.static_routes[pattern] = node.endpoints
+        self.routes.append((pattern, methods, endpoint))
+    
+    def add_routes(self, owner):
+        """Register the methods of a class decorated with ``route``"""
+        for name in dir(owner):
+            function = getattr(owner, name, None)
+            for pattern, options in getattr(function, 'routes', ()):
+                self.add(pattern, Endpoint(owner, function, pattern, options), options.get('methods'))
+    
+    def match(self, path: str, method: str) -> Tuple[Any, Dict[str, Any]]:
+        """Get the endpoint and converted parameters of a path
+        
+        Raises NotFound when no route matches the path and MethodNotAllowed
+        when routes match it but none accepts the method.
+        """
+        endpoints = self.static_routes.get(path)
+        if endpoints is not None:
+            endpoint = endpoints.get(method) or endpoints.get('*')
+            if endpoint is not None:
+                return endpoint, {}
+        
+        allowed_methods = []
+        result = self._match(self.root, path.split('/')[1:], 0, {}, method, allowed_methods)
+        if result is not None:
+            return result
+        if allowed_methods:
+            raise MethodNotAllowed(sorted(set(allowed_methods)))
+        raise NotFound(path)
+    
+    def _match(self, node, segments, index, params, method, allowed_methods):
+        """Walk the trie, static segments first then converters, backtracking on dead ends"""
+        if index == len(segments):
+            endpoint = node.endpoints.get(method) or node.endpoints.get('*')
+            if endpoint is not None:
+                return endpoint, params
+            allowed_methods.extend(node.endpoints)
+            return None
+        
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            result = self._match(child, segments, index + 1, params, method, allowed_methods)
+            if result is not None:
+                return result
+        
+        for converter, name, child in node.dynamic:
+            try:
+                value = CONVERTERS[converter](segment)
+            except ValueError:
+                continue
+            result = self._match(child, segments, index + 1, dict(params, **{name: value}), method, allowed_methods)
+            if result is not None:
+                return result
+        
+        if node.path is not None:
+            rest = '/'.join(segments[index:])
+            if rest:
+                name, child = node.path
+                return self._match(child, [], 0, dict(params, **{name: rest}), method, allowed_methods)
+        return None
@@ -33,9 +33,10 @@ class ERPServer:
         """Initialize the ERP Server"""
         self.config = Config(config_path)
         self.db_manager = DatabaseManager(self.config)
-        self.orm_manager = ORMManager(self.config)
+        self.orm_manager = ORMManager(self.config, self.db_manager)
         self.addon_manager = AddonManager(self.config)
         self.web_interface = WebInterface(self.config)
+        self.web_interface.set_erp_server(self)
         
         # Initialize new components
         self.auth_manager = AuthenticationManager(self.config)
@@ -98,11 +99,14 @@ class ERPServer:
             self.logger.error(f"Failed to initialize ERP system: {e}")
             return False
     
-    def start(self, host='localhost', port=8069):
+    def start(self, host='localhost', port=8069, workers=None, threads=None, wsgi=False):
         """Start the ERP server"""
         try:
             self.logger.info(f"Starting ERP server on {host}:{port}")
-            self.web_interface.start_server(host, port)
+            if wsgi:
+                self.web_interface.start_wsgi_server(host, port)
+            else:
+                self.web_interface.start_server(host, port, workers=workers, threads=threads)
         except Exception as e:
             self.logger.error(f"Failed to start server: {e}")
             return False
@@ -121,6 +125,10 @@ def main():
     parser.add_argument('--config', help='Configuration file path')
     parser.add_argument('--host', default='localhost', help='Server host')
     parser.add_argument('--port', type=int, default=8069, help='Server port')
+    parser.add_argument('--workers', type=int, help='Worker processes, 0 serves in the main process')
+    parser.add_argument('--threads', type=int, help='Request threads per process')
+    parser.add_argument('--wsgi', action='store_true',
+                        help='Serve with the standard library WSGI server, validating the application')
     parser.add_argument('--init', action='store_true', help='Initialize database')
     parser.add_argument('--update', action='store_true', help='Update addons')
     parser.add_argument('--install', action='store_true', help='Install addons')
@@ -148,7 +156,7 @@ def main():
     
     # Start server
     if server.initialize():
-        server.start(args.host, args.port)
+        server.start(args.host, args.port, workers=args.workers, threads=args.threads, wsgi=args.wsgi)
     else:
         print("Failed to initialize ERP system!")
         sys.exit(1)
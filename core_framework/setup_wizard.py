@@ -205,7 +205,7 @@ class DatabaseSetupWizard:
                 return False
             
             # Initialize ORM manager
-            orm_manager = ORMManager(config)
+            orm_manager = ORMManager(config, db_manager)
             if not orm_manager.initialize():
                 return False
             
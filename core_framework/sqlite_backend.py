@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - SQLite Backend
+==================================
+
+In-process SQLite implementation of the DatabaseManager, for test suites
+and benchmarks that should not need a PostgreSQL server. Statements are
+written in the PostgreSQL dialect the ORM generates and translated here.
+
+Needs SQLite 3.30 or later, for the NULLS FIRST/LAST the ORM writes in
+every ORDER BY.
+"""
+
+import re
+import json
+import logging
+import sqlite3
+import threading
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+from .database import DatabaseManager
+from .instrumentation import _InstrumentedCursorMixin
+
+# Column types converted back to Python values when read
+sqlite3.register_converter('BOOLEAN', lambda value: value not in (b'0', b''))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('JSONB', lambda value: json.loads(value))
+sqlite3.register_converter('JSON', lambda value: json.loads(value))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(Decimal, str)
+
+# Oldest SQLite with NULLS FIRST/LAST
+MIN_SQLITE_VERSION = (3, 30, 0)
+
+# String literals are matched first so nothing inside them is rewritten
+_TRANSLATE_PATTERN = re.compile(
+    r"(?P<string>'(?:[^']|'')*')"
+    r"|(?P<ilike>(?<![\w.])(?P<ilike_left>[\w.]+)\s+(?P<ilike_not>NOT\s+)?ILIKE\s+"
+    r"(?P<ilike_right>%s|%\(\w+\)s|\$\d+|'(?:[^']|'')*'))"
+    r"|(?P<any>=\s*ANY\s*\(\s*(?P<array>%s|\$\d+)(?:::\w+(?:\[\])?)?\s*\))"
+    r"|(?P<cast>::\w+(?:\s*\(\d+(?:,\s*\d+)?\))?(?:\[\])?)"
+    r"|(?P<named>%\((?P<name>\w+)\)s)"
+    r"|(?P<percent>%%)"
+    r"|(?P<positional>%s)"
+    r"|(?P<numbered>\$(?P<number>\d+))"
+    r"|(?P<lock>\bFOR\s+(?:UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)(?:\s+OF\s+\w+(?:\s*,\s*\w+)*)?"
+    r"(?:\s+NOWAIT|\s+SKIP\s+LOCKED)?)"
+    r"|(?P<concurrently>\bCONCURRENTLY\s+)"
+    r"|(?P<serial>\b(?:BIG)?SERIAL\s+PRIMARY\s+KEY\b)",
+    re.IGNORECASE
+)
+
+def translate_query(query: str) -> str:
+    """Rewrite a PostgreSQL statement for SQLite
+    
+    Placeholders become qmark or named ones, ``= ANY(array)`` reads the
+    array parameter as JSON, casts and row locks are dropped (SQLite locks
+    the whole database on write) and ``a ILIKE b`` becomes
+    ``LOWER(a) LIKE LOWER(b)``, LIKE being case-sensitive as in PostgreSQL.
+    """
+    def replace(match):
+        kind = match.lastgroup
+        if kind == 'string':
+            return match.group(0)
+        if kind == 'any':
+            array = match.group('array')
+            array = '?' if array == '%s' else '?' + array[1:]
+            return f"IN (SELECT value FROM json_each({array}))"
+        if kind == 'named':
+            return f":{match.group('name')}"
+        if kind == 'positional':
+            return '?'
+        if kind == 'percent':
+            return '%'
+        if kind == 'numbered':
+            return f"?{match.group('number')}"
+        if kind == 'ilike':
+            right = _TRANSLATE_PATTERN.sub(replace, match.group('ilike_right'))
+            negate = 'NOT ' if match.group('ilike_not') else ''
+            return f"LOWER({match.group('ilike_left')}) {negate}LIKE LOWER({right})"
+        if kind == 'serial':
+            return 'INTEGER PRIMARY KEY AUTOINCREMENT'
+        # cast, lock and concurrently
+        return ''
+    return _TRANSLATE_PATTERN.sub(replace, query)
+
+def adapt_parameter(value: Any) -> Any:
+    """Convert a parameter SQLite cannot bind, arrays and JSON become JSON text"""
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, default=str)
+    if isinstance(value, memoryview):
+        return bytes(value)
+    return value
+
+def adapt_parameters(params):
+    """Convert the parameters of a statement"""
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return {key: adapt_parameter(value) for key, value in params.items()}
+    return tuple(adapt_parameter(value) for value in params)
+
+def _greatest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+def _least(*values):
+    values = [value for value in values if value is not None]
+    return min(values) if values else None
+
+def _lower(value):
+    # SQLite's own lower() only folds ASCII letters
+    return value.lower() if isinstance(value, str) else value
+
+def _date_trunc(granularity, value):
+    """PostgreSQL's date_trunc on ISO text, weeks start on Monday"""
+    if value is None:
+        return None
+    value = datetime.fromisoformat(value).replace(hour=0, minute=0, second=0, microsecond=0)
+    granularity = granularity.lower()
+    if granularity == 'week':
+        value -= timedelta(days=value.weekday())
+    elif granularity == 'month':
+        value = value.replace(day=1)
+    elif granularity == 'quarter':
+        value = value.replace(month=(value.month - 1) // 3 * 3 + 1, day=1)
+    elif granularity == 'year':
+        value = value.replace(month=1, day=1)
+    elif granularity != 'day':
+        raise ValueError(f"Unsupported date_trunc granularity {granularity!r}")
+    return value.isoformat(' ')
+
+class _SQLiteCursor:
+    """psycopg2-like cursor over an SQLite connection"""
+    
+    def __init__(self, connection, as_dict: bool = False):
+        self.connection = connection
+        self.as_dict = as_dict
+        self.itersize = 2000
+        self.closed = False
+        self._cursor = connection.raw.cursor()
+    
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+    
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+    
+    @property
+    def description(self):
+        return self._cursor.description
+    
+    def execute(self, query, vars=None):
+        """Translate and run a statement, opening a transaction unless in autocommit"""
+        connection = self.connection
+        if not connection.autocommit and not connection.raw.in_transaction:
+            connection.raw.execute('BEGIN')
+        self._cursor.execute(translate_query(query), adapt_parameters(vars))
+    
+    def executemany(self, query, vars_list):
+        """Run a statement once per parameter set"""
+        connection = self.connection
+        if not connection.autocommit and not connection.raw.in_transaction:
+            connection.raw.execute('BEGIN')
+        self._cursor.executemany(translate_query(query), [adapt_parameters(vars) for vars in vars_list])
+    
+    def _make_row(self, row):
+        if row is None or not self.as_dict:
+            return row
+        return dict(zip([column[0] for column in self._cursor.description], row))
+    
+    def fetchone(self):
+        return self._make_row(self._cursor.fetchone())
+    
+    def fetchmany(self, size=None):
+        rows = self._cursor.fetchmany(size or self.itersize)
+        return [self._make_row(row) for row in rows]
+    
+    def fetchall(self):
+        return [self._make_row(row) for row in self._cursor.fetchall()]
+    
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(self.itersize)
+            if not rows:
+                return
+            yield from rows
+    
+    def close(self):
+        self._cursor.close()
+        self.closed = True
+
+class SQLiteCursor(_InstrumentedCursorMixin, _SQLiteCursor):
+    """SQLite cursor with query instrumentation"""
+    pass
+
+class SQLiteConnection:
+    """psycopg2-like connection wrapping an SQLite connection"""
+    
+    instrumentation = None
+    
+    def __init__(self, raw):
+        self.raw = raw
+        self.autocommit = False
+        self.closed = 0
+        # Checkouts of this connection still open in its thread
+        self.checkouts = 0
+    
+    @property
+    def info(self):
+        return self
+    
+    @property
+    def transaction_status(self):
+        if self.raw.in_transaction:
+            return extensions.TRANSACTION_STATUS_INTRANS
+        return extensions.TRANSACTION_STATUS_IDLE
+    
+    def cursor(self, name=None, cursor_factory=None):
+        """Get a cursor, named cursors stream natively in SQLite"""
+        as_dict = cursor_factory is not None and issubclass(cursor_factory, RealDictCursor)
+        return SQLiteCursor(self, as_dict=as_dict)
+    
+    def commit(self):
+        if self.raw.in_transaction:
+            self.raw.commit()
+    
+    def rollback(self):
+        if self.raw.in_transaction:
+            self.raw.rollback()
+    
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+            self.closed = 1
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """DatabaseManager backed by an in-memory or file SQLite database
+    
+    Each thread gets its own connection. File databases use WAL so readers
+    do not block the writer; an in-memory database is shared between the
+    threads of the manager through SQLite's shared cache.
+    """
+    
+    def __init__(self, config):
+        """Initialize the SQLite database manager"""
+        super().__init__(config)
+        self.logger = logging.getLogger('ERP.Database.SQLite')
+        self.database_path = None
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Keeps a shared in-memory database alive while threads come and go
+        self._keeper = None
+    
+    def initialize(self):
+        """Open the database"""
+        try:
+            if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+                raise Exception(f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or later is required, "
+                                f"found {sqlite3.sqlite_version}")
+            path = self.config.get('database', {}).get('sqlite_path', ':memory:')
+            if path == ':memory:':
+                self.database_path = f"file:erp_memory_{id(self)}?mode=memory&cache=shared"
+            else:
+                self.database_path = f"file:{path}"
+            self._keeper = self._connect()
+            self.logger.info(f"SQLite database opened at {path}")
+            self._test_connection()
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to initialize database: {e}")
+            return False
+    
+    def _connect(self) -> SQLiteConnection:
+        """Open a connection with the pragmas and functions the ORM relies on"""
+        db_config = self.config.get('database', {})
+        raw = sqlite3.connect(
+            self.database_path,
+            uri=True,
+            isolation_level=None,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=db_config.get('pool_timeout', 30),
+        )
+        if not self.database_path.startswith('file:erp_memory_'):
+            raw.execute(f"PRAGMA journal_mode = {db_config.get('sqlite_journal_mode', 'wal')}")
+            raw.execute("PRAGMA synchronous = NORMAL")
+        raw.execute("PRAGMA case_sensitive_like = ON")
+        raw.create_function('now', 0, lambda: datetime.now().isoformat(' '))
+        raw.create_function('lower', 1, _lower, deterministic=True)
+        raw.create_function('greatest', -1, _greatest)
+        raw.create_function('least', -1, _least)
+        raw.create_function('date_trunc', 2, _date_trunc)
+        connection = SQLiteConnection(raw)
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+    
+    def get_connection(self, statement_timeout: int = None, readonly: bool = False):
+        """Get the connection of the current thread, or the one pinned by its transaction"""
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            return pinned
+        if self._keeper is None:
+            raise Exception("Database not initialized")
+        
+        conn = getattr(self._local, 'sqlite_connection', None)
+        if conn is None or conn.closed:
+            conn = self._local.sqlite_connection = self._connect()
+        conn.checkouts += 1
+        conn.instrumentation = self.instrumentation
+        return conn
+    
+    def return_connection(self, conn):
+        """Release a checkout, ending a read left open by the last one"""
+        if conn is getattr(self._local, 'connection', None):
+            return
+        conn.checkouts = max(conn.checkouts - 1, 0)
+        if not conn.checkouts and not conn.closed:
+            # Like a pool reset: the next checkout must see other threads' commits
+            conn.rollback()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection statistics"""
+        with self._connections_lock:
+            connections = [conn for conn in self._connections if not conn.closed]
+        return {
+            'backend': 'sqlite',
+            'connections': len(connections),
+            'in_use': sum(1 for conn in connections if conn.checkouts),
+        }
+    
+    def _execute_prepared(self, cursor, shape: tuple, query: str, params: tuple = ()):
+        """Execute a statement, SQLite keeps its own per-connection statement cache"""
+        cursor.execute(query, tuple(params))
+    
+    def table_exists(self, table_name: str) -> bool:
+        """Check if a table exists"""
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s"
+        return bool(self.execute_query(query, (table_name,)))
+    
+    def get_table_columns(self, table_name: str) -> Dict[str, str]:
+        """Get the columns of a table and their declared types"""
+        rows = self.execute_query("SELECT name, type FROM pragma_table_info(%s)", (table_name,))
+        return {row['name']: row['type'].lower() for row in rows}
+    
+    def get_table_indexes(self, table_name: str) -> List[str]:
+        """Get the index names of a table"""
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s"
+        return [row['name'] for row in self.execute_query(query, (table_name,))]
+    
+    def get_table_unique_indexes(self, table_name: str) -> List[str]:
+        """Get the names of the unique indexes of a table, those of constraints and primary keys left out"""
+        query = "SELECT name FROM pragma_index_list(%s) WHERE \"unique\" AND origin = 'c'"
+        return [row['name'] for row in self.execute_query(query, (table_name,))]
+    
+    def insert_many(self, table_name: str, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert several records in one transaction and return IDs in input order"""
+        if not rows:
+            return []
+        
+        ids = []
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            # In-process inserts are cheap, one per row keeps the IDs in input order
+            for row in rows:
+                columns = tuple(row.keys())
+                placeholders = ', '.join(['%s'] * len(columns))
+                cursor.execute(
+                    f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+                    tuple(row.values())
+                )
+                ids.append(cursor.lastrowid)
+            self._commit(conn)
+            cursor.close()
+            return ids
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Failed to insert records into {table_name}: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def upsert_many(self, table_name: str, rows: List[Dict[str, Any]], conflict_columns: List[str],
+                    update_columns: Dict[str, Optional[str]], conflict_target: List[str] = None) -> List[tuple]:
+        """Insert rows, updating those that conflict, and return (id, inserted) in input order
+        
+        SQLite has no xmax, so each row is looked up before its upsert to
+        tell inserts from updates; rows run in order, so a repeated key
+        updates the row its first occurrence inserted.
+        """
+        if not rows:
+            return []
+        
+        key_condition = ' AND '.join(f"{expression} IS {expression.replace(column, '%s', 1)}"
+                                     for column, expression in zip(conflict_columns, conflict_target or conflict_columns))
+        results = []
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            for row in rows:
+                columns = tuple(row.keys())
+                set_clauses = [
+                    f"{column} = {expression or f'EXCLUDED.{column}'}"
+                    for column, expression in update_columns.items()
+                    if expression is not None or column in columns
+                ]
+                if not set_clauses:
+                    set_clauses = [f"{conflict_columns[0]} = EXCLUDED.{conflict_columns[0]}"]
+                
+                cursor.execute(
+                    f"SELECT id FROM {table_name} WHERE {key_condition}",
+                    tuple(row.get(column) for column in conflict_columns)
+                )
+                existing = cursor.fetchone()
+                cursor.execute(
+                    f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+                    f"ON CONFLICT ({', '.join(conflict_target or conflict_columns)}) DO UPDATE SET {', '.join(set_clauses)} "
+                    f"RETURNING id",
+                    tuple(row.values())
+                )
+                results.append((cursor.fetchone()[0], existing is None))
+            self._commit(conn)
+            cursor.close()
+            return results
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Failed to upsert records into {table_name}: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def update_many(self, table_name: str, columns: List[str], rows: List[tuple],
+                    column_types: List[str] = None) -> int:
+        """Update records with per-record values, one prepared UPDATE run per row"""
+        if not rows or not columns:
+            return 0
+        
+        set_clauses = ', '.join(f"{col} = %s" for col in columns)
+        query = f"UPDATE {table_name} SET {set_clauses} WHERE id = %s"
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(query, [tuple(row[1:]) + (row[0],) for row in rows])
+            affected_rows = cursor.rowcount
+            self._commit(conn)
+            cursor.close()
+            return affected_rows
+        except Exception as e:
+            if conn:
+                self._rollback(conn)
+            self.logger.error(f"Failed to update records in {table_name}: {e}")
+            raise
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
+    def close(self):
+        """Close every connection"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._keeper = None
+        self.logger.info("SQLite database closed")
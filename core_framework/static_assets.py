@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - Static Assets
+=================================
+
+Serves the static directory with validators and caching:
+
+- ``url()`` gives content-hashed URLs (``/static/css/app.3f2a9c1b0d4e.css``)
+  that are cached for a year, plain URLs are revalidated on every use
+- ``ETag`` and ``Last-Modified`` answer conditional requests with 304
+- ``.br``/``.gz`` files written by ``precompress()`` at build time are
+  served to clients accepting them
+- files up to ``static_sendfile_threshold`` bytes are kept in an LRU
+  cache, larger ones are streamed from disk with ``os.sendfile``
+
+Build the compressed variants with ``python -m core_framework.static_assets``.
+"""
+
+import os
+import re
+import sys
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from .compression import COMPRESSIBLE_TYPES, accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Asset URL with a content hash before the extension
+_HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{12})(?P<suffix>\.[A-Za-z0-9]+)$')
+
+# Precompressed variants, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+MIN_COMPRESS_SIZE = 1024
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+class Asset:
+    """Metadata of a static file, refreshed when its size or mtime change"""
+    
+    __slots__ = ('path', 'size', 'mtime_ns', 'content_hash', 'content_type', 'variants')
+    
+    def __init__(self, path, stat, content_hash, content_type, variants):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.content_hash = content_hash
+        self.content_type = content_type
+        self.variants = variants
+    
+    @property
+    def last_modified(self):
+        return formatdate(self.mtime_ns // 1_000_000_000, usegmt=True)
+    
+    def etag(self, encoding=None):
+        """Get the entity tag of the file or of one of its encodings"""
+        return f'"{self.content_hash}-{encoding}"' if encoding else f'"{self.content_hash}"'
+
+class StaticResponse:
+    """Status, headers and body (bytes or an open file) of a static asset"""
+    
+    __slots__ = ('status', 'headers', 'body')
+    
+    def __init__(self, status, headers, body=b''):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+class StaticAssets:
+    """Static directory with hashed URLs, conditional GET and a small-file cache"""
+    
+    def __init__(self, root, cache_size=16 * 1024 * 1024, sendfile_threshold=64 * 1024):
+        self.root = os.path.realpath(root)
+        self.cache_size = cache_size
+        self.sendfile_threshold = sendfile_threshold
+        self.logger = logging.getLogger('ERP.StaticAssets')
+        self._assets = {}
+        self._contents = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+    
+    def resolve(self, relative_path):
+        """Get the absolute path of a file under the root, or None"""
+        full_path = os.path.realpath(os.path.join(self.root, relative_path))
+        if not full_path.startswith(self.root + os.sep) or not os.path.isfile(full_path):
+            return None
+        return full_path
+    
+    def get_asset(self, relative_path):
+        """Get the metadata of a static file, hashing it again only after a change"""
+        full_path = self.resolve(relative_path)
+        if full_path is None:
+            return None
+        stat = os.stat(full_path)
+        asset = self._assets.get(full_path)
+        if asset is not None and asset.size == stat.st_size and asset.mtime_ns == stat.st_mtime_ns:
+            return asset
+        
+        content_hash = hashlib.sha256()
+        with open(full_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                content_hash.update(block)
+        variants = {}
+        for encoding, extension in ENCODINGS:
+            variant_path = full_path + extension
+            if os.path.isfile(variant_path) and os.stat(variant_path).st_mtime_ns >= stat.st_mtime_ns:
+                variants[encoding] = variant_path
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        
+        asset = Asset(full_path, stat, content_hash.hexdigest()[:12], content_type, variants)
+        self._assets[full_path] = asset
+        return asset
+    
+    def url(self, relative_path):
+        """Get the content-hashed URL of a static file, or its plain URL if it is missing"""
+        asset = self.get_asset(relative_path)
+        if asset is None:
+            return f"/static/{relative_path}"
+        stem, suffix = os.path.splitext(relative_path)
+        return f"/static/{stem}.{asset.content_hash}{suffix}"
+    
+    def serve(self, relative_path, request_headers):
+        """Get the response to a GET of a static file, None if there is no such file"""
+        asset = self.get_asset(relative_path)
+        cache_control = REVALIDATE_CACHE_CONTROL
+        if asset is None:
+            hashed = _HASHED_NAME.match(relative_path)
+            if hashed is None:
+                return None
+            asset = self.get_asset(hashed.group('stem') + hashed.group('suffix'))
+            if asset is None:
+                return None
+            # An outdated hash still gets the current file, just not for a year
+            if asset.content_hash == hashed.group('hash'):
+                cache_control = IMMUTABLE_CACHE_CONTROL
+        
+        encoding = self._negotiate_encoding(asset, request_headers.get('Accept-Encoding', ''))
+        headers = [
+            ('Cache-Control', cache_control),
+            ('ETag', asset.etag(encoding)),
+            ('Last-Modified', asset.last_modified),
+        ]
+        if asset.variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+        
+        if self._is_not_modified(asset, request_headers):
+            return StaticResponse(304, headers)
+        
+        headers.append(('Content-Type', asset.content_type))
+        path = asset.variants[encoding] if encoding else asset.path
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        size = os.path.getsize(path)
+        headers.append(('Content-Length', str(size)))
+        if size > self.sendfile_threshold:
+            return StaticResponse(200, headers, open(path, 'rb'))
+        return StaticResponse(200, headers, self._get_content(path, asset.mtime_ns))
+    
+    def _negotiate_encoding(self, asset, accept_encoding):
+        """Pick the preferred precompressed variant the client accepts"""
+        if not asset.variants:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, extension in ENCODINGS:
+            if encoding in asset.variants and (encoding in accepted or '*' in accepted):
+                return encoding
+        return None
+    
+    def _is_not_modified(self, asset, request_headers):
+        """Check the conditional request headers against the asset"""
+        if_none_match = request_headers.get('If-None-Match')
+        if if_none_match:
+            if if_none_match.strip() == '*':
+                return True
+            etags = {asset.etag()} | {asset.etag(encoding) for encoding in asset.variants}
+            return any(tag.strip().removeprefix('W/') in etags for tag in if_none_match.split(','))
+        
+        if_modified_since = request_headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return asset.mtime_ns // 1_000_000_000 <= since
+        return False
+    
+    def _get_content(self, path, mtime_ns):
+        """Read a small file through the LRU cache"""
+        key = (path, mtime_ns)
+        with self._lock:
+            content = self._contents.get(key)
+            if content is not None:
+                self._contents.move_to_end(key)
+                return content
+        
+        with open(path, 'rb') as f:
+            content = f.read()
+        
+        with self._lock:
+            if key not in self._contents:
+                self._contents[key] = content
+                self._cached_bytes += len(content)
+                while self._cached_bytes > self.cache_size and self._contents:
+                    evicted_key, evicted = self._contents.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return content
+    
+    def get_cache_stats(self):
+        """Get the number of files and bytes in the content cache"""
+        with self._lock:
+            return {'files': len(self._contents), 'bytes': self._cached_bytes, 'max_bytes': self.cache_size}
+
+def is_compressible(path):
+    """Check whether a file type benefits from compression"""
+    content_type = mimetypes.guess_type(path)[0] or ''
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def precompress(root):
+    """Write .gz (and .br when brotli is installed) variants next to the compressible files
+    
+    Variants that are not smaller than the file are removed. Returns the
+    number of variants written.
+    """
+    written = 0
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    
+    for directory, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if filename.endswith(('.gz', '.br')) or not is_compressible(path):
+                continue
+            if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            for extension, compress in encoders:
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    if os.path.exists(path + extension):
+                        os.remove(path + extension)
+                    continue
+                with open(path + extension, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    return written
+
+def main():
+    """Precompress the static directory"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Build the precompressed static asset variants')
+    parser.add_argument('root', nargs='?', default=os.path.join(os.path.dirname(__file__), '..', 'static'),
+                        help='Static directory')
+    args = parser.parse_args()
+    
+    written = precompress(args.root)
+    print(f"Wrote {written} compressed variants in {os.path.realpath(args.root)}")
+    if brotli is None:
+        print("brotli is not installed, only gzip variants were written")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -15,6 +15,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Call of a context function with one string literal, e.g. static_url('css/app.css')
+_CALL = re.compile(r"""^(?P<name>\w+)\(\s*(?P<quote>['"])(?P<argument>[^'"]*)(?P=quote)\s*\)$""")
+
 class TemplateEngine:
     """Template Engine for ERP System"""
     
@@ -107,9 +110,13 @@ class TemplateEngine:
             return template_content
     
     def _process_variables(self, content: str, context: Dict[str, Any]) -> str:
-        """Process template variables"""
+        """Process template variables and calls of context functions"""
         def replace_variable(match):
             var_name = match.group(1).strip()
+            call = _CALL.match(var_name)
+            if call:
+                function = context.get(call.group('name'))
+                return str(function(call.group('argument'))) if callable(function) else ''
             return str(self._get_context_value(var_name, context))
         
         return re.sub(r'\{\{\s*([^}]+)\s*\}\}', replace_variable, content)
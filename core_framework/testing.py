@@ -109,6 +109,47 @@ class SystemTestCase(TestCase):
         pass
 
 
+class DatabaseTestCase(TestCase):
+    """Test Case running models against a private in-memory SQLite database
+    
+    Tables of the ``models`` classes are created once per class; their rows
+    are deleted after each test. ``self.env`` is a fresh environment.
+    """
+    
+    models = ()
+    
+    @classmethod
+    def setUpClass(cls):
+        """Create the database and the model tables"""
+        super().setUpClass()
+        from .database import DatabaseManager
+        from .orm import ORMManager
+        
+        config = {'database': {'backend': 'sqlite', 'sqlite_path': ':memory:'}}
+        cls.db = DatabaseManager(config)
+        if not cls.db.initialize():
+            raise RuntimeError("Failed to open the test database")
+        orm_manager = ORMManager(config, cls.db)
+        for model_class in cls.models:
+            orm_manager._create_model_table(model_class)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Drop the database"""
+        cls.db.close()
+        super().tearDownClass()
+    
+    def setup_test_environment(self):
+        """Give the test an empty record cache"""
+        from .orm import Environment
+        self.env = Environment(self.db)
+    
+    def cleanup_test_environment(self):
+        """Delete the rows the test created"""
+        for model_class in self.models:
+            self.db.execute_update(f"DELETE FROM {model_class._get_table_name()}")
+
+
 class TestRunner:
     """Test Runner for ERP System"""
     
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+from . import test_expression
+from . import test_compute
+from . import test_upsert
+from . import test_instrumentation
+from . import test_sqlite_backend
+from . import test_models
+from . import test_locking
+from . import test_http_workers
+from . import test_wsgi
+from . import test_routing
+from . import test_static_assets
+from . import test_compression
+from . import test_pagination
+from . import test_connection_pool
+from . import test_read_group
+from . import test_replicas
+from . import test_prepared_statements
+from . import test_cache
+from . import test_bulk_insert
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date
+from unittest import mock
+
+from core_framework.testing import TestCase
+from core_framework.database import DatabaseManager
+
+
+class FakeCursor:
+    """Cursor stand-in handing out sequence values and keeping the rows written"""
+    
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def execute(self, query, params=None):
+        self.connection.statements.append(query)
+        if query.startswith("SELECT nextval"):
+            start = self.connection.sequence
+            self.connection.sequence += params[1]
+            self._result = [(record_id,) for record_id in range(start, self.connection.sequence)]
+        elif query.startswith("EXECUTE"):
+            self._result = [(self.connection.sequence,)]
+            self.connection.sequence += 1
+    
+    def fetchone(self):
+        return self._result[0]
+    
+    def fetchall(self):
+        return self._result
+    
+    def copy_expert(self, sql, buffer):
+        self.connection.copies.append((sql, buffer.read()))
+    
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.sequence = 1
+        self.statements = []
+        self.copies = []
+    
+    def cursor(self):
+        return FakeCursor(self)
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+
+
+class FakePool:
+
+    def __init__(self):
+        self.connection = FakeConnection()
+    
+    def getconn(self, timeout=None, statement_timeout=None):
+        return self.connection
+    
+    def putconn(self, connection, close=False):
+        pass
+
+
+class TestInsertMany(TestCase):
+    """Test cases for the PostgreSQL bulk insert, on a fake connection"""
+    
+    def _db(self, copy_threshold):
+        db = DatabaseManager({'database': {'backend': 'postgresql', 'copy_threshold': copy_threshold}})
+        db.connection_pool = FakePool()
+        return db
+    
+    def test_values_ids(self):
+        """Test ids are reserved before the INSERT and given back in input order"""
+        db = self._db(copy_threshold=0)
+        with mock.patch('core_framework.database.execute_values') as execute_values:
+            ids = db.insert_many('product', [
+                {'name': 'A'}, {'id': 100, 'name': 'B'}, {'name': 'C', 'qty': 2}, {'name': 'D'},
+            ])
+        self.assertEqual(ids, [1, 100, 3, 2])
+        statements = [(call.args[1], call.args[2]) for call in execute_values.call_args_list]
+        self.assertEqual(statements, [
+            ("INSERT INTO product (id, name) VALUES %s", [(1, 'A'), (2, 'D')]),
+            ("INSERT INTO product (id, name) VALUES %s", [(100, 'B')]),
+        ])
+        self.assertNotIn('RETURNING', ''.join(statement for statement, _ in statements))
+        # A single row is inserted in one prepared statement
+        name = db._statement_names[('insert', 'product', ('name', 'qty'))]
+        self.assertEqual(db.connection_pool.connection.statements[-2:], [
+            f"PREPARE {name} AS INSERT INTO product (name, qty) VALUES ($1, $2) RETURNING id",
+            f"EXECUTE {name} (%s, %s)",
+        ])
+    
+    def test_single_row(self):
+        """Test one record is inserted with RETURNING, without reserving its id"""
+        db = self._db(copy_threshold=0)
+        self.assertEqual(db.insert_many('product', [{'name': 'A'}]), [1])
+        self.assertEqual(db.insert_many('product', [{'name': 'B'}]), [2])
+        name = db._statement_names[('insert', 'product', ('name',))]
+        self.assertEqual(db.connection_pool.connection.statements, [
+            f"PREPARE {name} AS INSERT INTO product (name) VALUES ($1) RETURNING id",
+            f"EXECUTE {name} (%s)", f"EXECUTE {name} (%s)",
+        ])
+    
+    def test_copy(self):
+        """Test the COPY data keeps NULL apart from every string"""
+        db = self._db(copy_threshold=2)
+        rows = [
+            {'name': '\\N', 'note': None, 'active': True, 'date': date(2024, 1, 2)},
+            {'name': '', 'note': 'Say "hi",\nthen leave', 'active': False, 'date': None},
+            {'name': 'NULL', 'note': '\\', 'active': None, 'date': date(2024, 3, 4)},
+        ]
+        ids = db.insert_many('product', rows)
+        self.assertEqual(ids, [1, 2, 3])
+        
+        [(sql, data)] = db.connection_pool.connection.copies
+        self.assertEqual(sql, "COPY product (id, name, note, active, date) FROM STDIN WITH (FORMAT csv)")
+        # PostgreSQL reads an unquoted empty field as NULL and anything quoted as a string
+        self.assertEqual(data.split('\n'), [
+            '"1","\\N",,"t","2024-01-02"',
+            '"2","","Say ""hi"",',
+            'then leave","f",',
+            '"3","NULL","\\",,"2024-03-04"',
+            '',
+        ])
+
+
+class TestUpsertMany(TestCase):
+    """Test cases for the PostgreSQL bulk upsert, on a fake connection"""
+    
+    def test_match_by_key(self):
+        """Test returned rows are matched to the input by conflict key, in whatever order they come"""
+        db = DatabaseManager({'database': {'backend': 'postgresql'}})
+        db.connection_pool = FakePool()
+        rows = [
+            {'product_id': 1, 'lot_id': 10, 'quantity': 2.0},
+            {'product_id': 1, 'lot_id': None, 'quantity': 3.0},
+            {'product_id': 2, 'lot_id': 10, 'quantity': 4.0},
+        ]
+        returned = [(13, True, 2, 10), (12, False, 1, 0), (11, True, 1, 10)]
+        with mock.patch('core_framework.database.execute_values', return_value=returned) as execute_values:
+            results = db.upsert_many('quant', rows, ['product_id', 'lot_id'], {'quantity': None},
+                                     conflict_target=['product_id', 'COALESCE(lot_id, 0)'])
+        self.assertEqual(results, [(11, True), (12, False), (13, True)])
+        self.assertTrue(execute_values.call_args.args[1].endswith(
+            "RETURNING id, (xmax = 0) AS inserted, product_id, COALESCE(lot_id, 0)"))
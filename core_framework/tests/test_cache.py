@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import DatabaseTestCase
+from core_framework.orm import BaseModel, CharField, IntegerField, Many2OneField
+from core_framework.exceptions import MissingError
+
+
+class CachePartner(BaseModel):
+    _name = 'cache.partner'
+    _table = 'cache_partner'
+    
+    name = CharField(string='Name')
+
+
+class CacheLine(BaseModel):
+    _name = 'cache.line'
+    _table = 'cache_line'
+    
+    partner_id = Many2OneField('cache.partner', string='Partner')
+    qty = IntegerField(string='Quantity')
+
+
+class TestRecordCache(DatabaseTestCase):
+    """Test cases for prefetching and invalidation of the record cache"""
+    
+    models = [CachePartner, CacheLine]
+    
+    def setUp(self):
+        super().setUp()
+        partners = self.env['cache.partner'].create([{'name': f'Partner {index}'} for index in range(5)])
+        self.env['cache.line'].create([
+            {'partner_id': partners.ids[index % 5], 'qty': index} for index in range(20)
+        ])
+        self.env.invalidate_all()
+    
+    def _query_count(self, function):
+        with self.db.instrumentation.scope('test') as stats:
+            function()
+        return stats.query_count
+    
+    def test_prefetch(self):
+        """Test reading a field on a recordset fetches all its records in one query"""
+        lines = self.env['cache.line'].search([])
+        self.assertEqual(self._query_count(lambda: [line.qty for line in lines]), 1)
+        # The other columns came with it
+        self.assertEqual(self._query_count(lambda: [line.partner_id.id for line in lines]), 0)
+        # The partners of all the lines are read together
+        self.assertEqual(self._query_count(lambda: [line.partner_id.name for line in lines]), 1)
+        self.assertEqual(sorted({line.partner_id.name for line in lines}), [f'Partner {index}' for index in range(5)])
+    
+    def test_write_and_unlink(self):
+        """Test writes and deletes drop the cached values they change"""
+        lines = self.env['cache.line'].search([], order='id')
+        self.assertEqual(lines[0].qty, 0)
+        lines[0].write({'qty': 42})
+        self.assertEqual(lines[0].qty, 42)
+        self.assertEqual(self.env['cache.line'].search([('qty', '=', 42)]).ids, lines.ids[:1])
+        
+        lines[1].unlink()
+        with self.assertRaises(MissingError):
+            lines[1].qty
+        self.assertEqual(lines[2].qty, 2)
+    
+    def test_transaction_end(self):
+        """Test the cache is dropped when a transaction commits or rolls back"""
+        line = self.env['cache.line'].search([], order='id', limit=1)
+        with self.env.transaction():
+            self.assertEqual(line.qty, 0)
+        # Another transaction changes the row once ours committed
+        self.db.execute_update("UPDATE cache_line SET qty = 7 WHERE id = %s", (line.id,))
+        self.assertEqual(line.qty, 7)
+        
+        with self.assertRaises(ZeroDivisionError):
+            with self.env.transaction():
+                line.write({'qty': 8})
+                self.assertEqual(line.qty, 8)
+                1 / 0
+        self.assertEqual(line.qty, 7)
+        
+        with self.env.transaction():
+            with self.env.transaction():
+                self.assertEqual(line.qty, 7)
+            # A savepoint ending keeps the cache of the outer transaction
+            self.assertEqual(self._query_count(lambda: line.qty), 0)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import json
+import gzip
+import zlib
+
+from core_framework.testing import TestCase
+from core_framework.compression import (
+    accepted_encodings, negotiate_encoding, compress, compress_chunks, iter_json, iter_json_chunks,
+)
+
+
+class TestCompression(TestCase):
+    """Test cases for response compression and the streaming JSON encoder"""
+    
+    def test_negotiation(self):
+        """Test Accept-Encoding parsing and encoding preference"""
+        self.assertEqual(accepted_encodings('gzip, deflate;q=0.5, br;q=0'), {'gzip', 'deflate'})
+        self.assertEqual(negotiate_encoding('deflate, gzip'), 'gzip')
+        self.assertEqual(negotiate_encoding('gzip;q=0, deflate'), 'deflate')
+        self.assertEqual(negotiate_encoding('*'), 'gzip')
+        self.assertIsNone(negotiate_encoding('br'))
+        self.assertIsNone(negotiate_encoding(None))
+    
+    def test_compress(self):
+        """Test whole and chunked compression decode to the original"""
+        data = b'{"name": "T-shirt", "size": "4-5Y"}, ' * 500
+        self.assertEqual(gzip.decompress(compress(data, 'gzip')), data)
+        self.assertEqual(zlib.decompress(compress(data, 'deflate')), data)
+        
+        chunks = list(compress_chunks(iter([data[:100], b'', data[100:]]), 'gzip'))
+        # Each chunk is flushed, so what arrived so far can be decoded
+        decompressor = zlib.decompressobj(31)
+        self.assertEqual(decompressor.decompress(chunks[0]), data[:100])
+        self.assertEqual(gzip.decompress(b''.join(chunks)), data)
+    
+    def test_iter_json(self):
+        """Test the streaming encoder matches json.dumps"""
+        value = {
+            'records': [{'id': index, 'name': f'Product {index}', 'price': 99.5, 'active': True} for index in range(3)],
+            'empty': [], 'nested': {'none': None, 1: 'one', 'tuple': (1, 'é')},
+        }
+        self.assertEqual(''.join(iter_json(value)), json.dumps(value))
+        self.assertEqual(json.loads(''.join(iter_json({'records': (index for index in range(5))}))),
+                         {'records': [0, 1, 2, 3, 4]})
+        with self.assertRaises(TypeError):
+            list(iter_json({'value': object()}))
+        
+        chunks = list(iter_json_chunks({'records': [{'id': index} for index in range(2000)]}, chunk_size=1024))
+        self.assertGreater(len(chunks), 10)
+        self.assertTrue(all(len(chunk) < 1100 for chunk in chunks))
+        self.assertEqual(len(json.loads(b''.join(chunks))['records']), 2000)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from core_framework.testing import TestCase
+from core_framework.orm import (
+    BaseModel, CharField, IntegerField, FloatField, Many2OneField, One2ManyField,
+    Environment, depends, get_field_triggers, invalidate_field_triggers, models_registry,
+)
+
+
+class TestComputedFields(TestCase):
+    """Test cases for computed field declarations and dependencies"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._saved_registry = dict(models_registry)
+        
+        class ComputeProduct(BaseModel):
+            _name = 'compute.product'
+            _table = 'compute_product'
+            
+            name = CharField(string='Name')
+            price = FloatField(string='Price')
+        
+        class ComputeOrder(BaseModel):
+            _name = 'compute.order'
+            _table = 'compute_order'
+            
+            name = CharField(string='Name')
+            line_ids = One2ManyField('compute.line', 'order_id', string='Lines')
+            amount_total = FloatField(string='Total', compute='_compute_amounts', store=True)
+            line_count = IntegerField(string='Line Count', compute='_compute_amounts', store=True)
+            display_name = CharField(string='Display Name', compute='_compute_display_name')
+            
+            @depends('line_ids.subtotal')
+            def _compute_amounts(self):
+                for order in self:
+                    order.amount_total = sum(line.subtotal for line in order.line_ids)
+                    order.line_count = len(order.line_ids)
+            
+            @depends('name', 'amount_total')
+            def _compute_display_name(self):
+                for order in self:
+                    order.display_name = f"{order.name} ({order.amount_total})"
+        
+        class ComputeLine(BaseModel):
+            _name = 'compute.line'
+            _table = 'compute_line'
+            
+            order_id = Many2OneField('compute.order', string='Order')
+            product_id = Many2OneField('compute.product', string='Product')
+            qty = IntegerField(string='Quantity')
+            subtotal = FloatField(string='Subtotal', compute='_compute_subtotal', store=True)
+            product_name = CharField(string='Product Name', related='product_id.name')
+            
+            @depends('qty', 'product_id.price')
+            def _compute_subtotal(self):
+                for line in self:
+                    line.subtotal = line.qty * line.product_id.price
+        
+        cls.ComputeOrder = ComputeOrder
+        cls.ComputeLine = ComputeLine
+    
+    @classmethod
+    def tearDownClass(cls):
+        models_registry.clear()
+        models_registry.update(cls._saved_registry)
+        invalidate_field_triggers()
+        super().tearDownClass()
+    
+    def test_store_defaults(self):
+        """Test computed fields are stored only when asked"""
+        columns = self.ComputeOrder._get_column_names()
+        self.assertIn('amount_total', columns)
+        self.assertNotIn('display_name', columns)
+        self.assertNotIn('product_name', self.ComputeLine._get_column_names())
+        self.assertTrue(self.ComputeLine._get_fields()['qty'].store)
+    
+    def test_triggers(self):
+        """Test dependencies are inverted into triggers along their paths"""
+        triggers = get_field_triggers()
+        self.assertIn(('compute.line', 'subtotal', None), triggers[('compute.line', 'qty')])
+        self.assertIn(('compute.line', 'subtotal', 'product_id'), triggers[('compute.product', 'price')])
+        self.assertIn(('compute.order', 'amount_total', 'line_ids'), triggers[('compute.line', 'subtotal')])
+        self.assertIn(('compute.order', 'amount_total', 'line_ids'), triggers[('compute.line', 'order_id')])
+        self.assertIn(('compute.order', 'display_name', None), triggers[('compute.order', 'amount_total')])
+        self.assertIn(('compute.line', 'product_name', 'product_id'), triggers[('compute.product', 'name')])
+    
+    def test_assign_while_computing(self):
+        """Test assignments inside a compute method only fill the cache"""
+        env = Environment(None)
+        orders = env['compute.order'].browse([1, 2])
+        orders._get_cache().set('compute.order', 'line_ids', 1, ())
+        orders._get_cache().set('compute.order', 'line_ids', 2, ())
+        orders._compute_fields(['amount_total', 'line_count'])
+        self.assertEqual(env.cache.get('compute.order', 'amount_total', 2), 0)
+        self.assertEqual(env.cache.get('compute.order', 'line_count', 1), 0)
+        self.assertFalse(env.computing)
+    
+    def test_modified_search_once(self):
+        """Test the records depending on changed fields are searched once per path"""
+        env = Environment(None)
+        lines = env['compute.line'].browse([1, 2])
+        orders = env['compute.order'].browse([7])
+        with mock.patch.object(self.ComputeOrder, 'search', return_value=orders) as search:
+            lines._modified(['order_id', 'subtotal'])
+        search.assert_called_once_with([('line_ids', 'in', [1, 2])])
+        self.assertEqual(env.to_compute[('compute.order', 'amount_total')], {7})
+        self.assertEqual(env.to_compute[('compute.order', 'line_count')], {7})
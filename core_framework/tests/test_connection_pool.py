@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from unittest import mock
+
+from psycopg2 import extensions
+
+from core_framework.testing import TestCase
+from core_framework.connection_pool import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def execute(self, query, params=None):
+        if self.connection.broken:
+            raise RuntimeError("server closed the connection")
+        self.connection.statements.append((query, params))
+    
+    def close(self):
+        pass
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    """Connection stand-in recording the statements run on it"""
+    
+    def __init__(self, **kwargs):
+        self.closed = 0
+        self.broken = False
+        self.info = FakeInfo()
+        self.statements = []
+    
+    def cursor(self):
+        return FakeCursor(self)
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool(TestCase):
+    """Test cases for the connection pool, on fake connections"""
+    
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('core_framework.connection_pool.psycopg2.connect', FakeConnection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _pool(self, **kwargs):
+        options = dict(minconn=0, maxconn=2, validation_interval=60, leak_timeout=0)
+        options.update(kwargs)
+        pool = ConnectionPool(**options)
+        self.addCleanup(pool.closeall)
+        return pool
+    
+    def test_checkout_timeout(self):
+        """Test a full pool raises PoolTimeout after the wait and a returned connection wakes waiters"""
+        pool = self._pool(maxconn=1)
+        connection = pool.getconn()
+        started = time.monotonic()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(timeout=0.05)
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(pool.get_stats()['timeouts'], 1)
+        
+        threading.Timer(0.05, pool.putconn, (connection,)).start()
+        self.assertIs(pool.getconn(timeout=5), connection)
+    
+    def test_lifo_reuse(self):
+        """Test the most recently returned connection is handed out first"""
+        pool = self._pool(max_idle=1)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+        # Only max_idle connections are kept
+        self.assertTrue(second.closed)
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(pool.get_stats()['created'], 2)
+    
+    def test_validation(self):
+        """Test idle connections are checked before reuse and broken ones replaced"""
+        pool = self._pool(validation_interval=0)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        self.assertIs(pool.getconn(), connection)
+        self.assertIn(("SELECT 1", None), connection.statements)
+        pool.putconn(connection)
+        
+        connection.broken = True
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.get_stats()['validation_failures'], 1)
+    
+    def test_max_lifetime(self):
+        """Test connections older than max_lifetime are closed instead of reused"""
+        pool = self._pool(max_lifetime=0.05)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        self.assertIs(pool.getconn(), connection)
+        time.sleep(0.06)
+        pool.putconn(connection)
+        self.assertTrue(connection.closed)
+        self.assertIsNot(pool.getconn(), connection)
+    
+    def test_statement_timeout(self):
+        """Test the statement timeout is set per checkout and reset to the pool default"""
+        pool = self._pool(maxconn=1, statement_timeout=0)
+        connection = pool.getconn(statement_timeout=500)
+        self.assertEqual(connection.statements, [("SET statement_timeout = %s", (500,))])
+        pool.putconn(connection)
+        
+        pool.getconn(statement_timeout=500)
+        self.assertEqual(len(connection.statements), 1)
+        pool.putconn(connection)
+        pool.getconn()
+        self.assertEqual(connection.statements[-1], ("SET statement_timeout = %s", (0,)))
+    
+    def test_leak_report(self):
+        """Test a connection held past the leak timeout is logged once with its checkout stack"""
+        pool = self._pool(leak_timeout=0.01)
+        pool.getconn()
+        time.sleep(0.02)
+        with self.assertLogs('ERP.Database.Pool', level='WARNING') as logs:
+            self.assertEqual(pool.get_stats()['leaks'], 1)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('test_leak_report', logs.output[0])
+        self.assertEqual(pool.get_stats()['leaks'], 1)
+    
+    def test_wait_histogram(self):
+        """Test every checkout lands in one wait time bucket"""
+        pool = self._pool(maxconn=1)
+        for _ in range(3):
+            pool.putconn(pool.getconn())
+        connection = pool.getconn()
+        threading.Timer(0.06, pool.putconn, (connection,)).start()
+        pool.putconn(pool.getconn(timeout=5))
+        
+        stats = pool.get_stats()
+        histogram = stats['wait_time_histogram']
+        self.assertEqual(sum(histogram.values()), stats['checkouts'])
+        self.assertEqual(stats['checkouts'], 5)
+        self.assertEqual(histogram['0.1'], 1)
+        self.assertGreater(stats['wait_time_avg'], 0)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import TestCase
+from core_framework.expression import normalize_domain, compile_domain, AND_OPERATOR
+from core_framework.orm import (
+    BaseModel, CharField, IntegerField, BooleanField, Many2OneField, One2ManyField, Many2ManyField,
+    models_registry,
+)
+
+
+class ExpressionCategory(BaseModel):
+    _name = 'expression.category'
+    _table = 'expression_category'
+    
+    name = CharField(string='Name')
+    parent_id = Many2OneField('expression.category', string='Parent')
+
+
+class ExpressionProduct(BaseModel):
+    _name = 'expression.product'
+    _table = 'expression_product'
+    
+    name = CharField(string='Name')
+    qty = IntegerField(string='Quantity')
+    active = BooleanField(string='Active')
+    categ_id = Many2OneField('expression.category', string='Category')
+
+
+class TestExpression(TestCase):
+    """Test cases for the domain to SQL compiler"""
+    
+    def _compile(self, domain):
+        query = compile_domain(ExpressionProduct, domain)
+        return query.where_clause(), query.where_params
+    
+    def test_normalize_domain(self):
+        """Test implicit '&' insertion"""
+        leaf_a, leaf_b, leaf_c = ('qty', '=', 1), ('qty', '=', 2), ('qty', '=', 3)
+        self.assertEqual(normalize_domain([leaf_a, leaf_b]), [AND_OPERATOR, leaf_a, leaf_b])
+        self.assertEqual(normalize_domain(['|', leaf_a, leaf_b, leaf_c]),
+                         [AND_OPERATOR, '|', leaf_a, leaf_b, leaf_c])
+        with self.assertRaises(ValueError):
+            normalize_domain(['|', leaf_a])
+    
+    def test_comparison_operators(self):
+        """Test comparison operators are parameterized"""
+        for operator in ('=', '<', '>', '<=', '>='):
+            sql, params = self._compile([('qty', operator, 5)])
+            self.assertEqual(sql, f"expression_product.qty {operator} %s")
+            self.assertEqual(params, [5])
+        
+        sql, params = self._compile([('name', '!=', 'Shirt')])
+        self.assertEqual(sql, "(expression_product.name != %s OR expression_product.name IS NULL)")
+        self.assertEqual(params, ['Shirt'])
+    
+    def test_null_comparisons(self):
+        """Test None and False values"""
+        self.assertEqual(self._compile([('categ_id', '=', False)])[0], "expression_product.categ_id IS NULL")
+        self.assertEqual(self._compile([('categ_id', '!=', None)])[0], "expression_product.categ_id IS NOT NULL")
+        self.assertEqual(self._compile([('active', '=', False)])[0],
+                         "(expression_product.active IS NULL OR expression_product.active = FALSE)")
+    
+    def test_in_operators(self):
+        """Test 'in' and 'not in'"""
+        sql, params = self._compile([('qty', 'in', [1, 2])])
+        self.assertEqual(sql, "expression_product.qty = ANY(%s)")
+        self.assertEqual(params, [[1, 2]])
+        
+        self.assertEqual(self._compile([('qty', 'in', [])])[0], "FALSE")
+        self.assertEqual(self._compile([('qty', 'not in', [])])[0], "TRUE")
+        
+        sql, params = self._compile([('qty', 'not in', [1, None])])
+        self.assertEqual(sql, "(expression_product.qty IS NOT NULL AND NOT (expression_product.qty = ANY(%s)))")
+        self.assertEqual(params, [[1]])
+    
+    def test_like_operators(self):
+        """Test pattern operators"""
+        sql, params = self._compile([('name', 'ilike', 'shirt')])
+        self.assertEqual(sql, "expression_product.name ILIKE %s")
+        self.assertEqual(params, ['%shirt%'])
+        
+        sql, params = self._compile([('name', '=like', 'SH%')])
+        self.assertEqual(sql, "expression_product.name LIKE %s")
+        self.assertEqual(params, ['SH%'])
+    
+    def test_optional_equality(self):
+        """Test '=?' ignores empty values"""
+        self.assertEqual(self._compile([('qty', '=?', False)])[0], "TRUE")
+        self.assertEqual(self._compile([('qty', '=?', 3)]), ("expression_product.qty = %s", [3]))
+    
+    def test_logical_operators(self):
+        """Test '&', '|' and '!' in prefix notation"""
+        sql, params = self._compile(['|', ('qty', '=', 1), '!', ('name', '=', 'A'), ('active', '=', True)])
+        self.assertEqual(
+            sql,
+            "((expression_product.qty = %s OR (NOT expression_product.name = %s)) "
+            "AND expression_product.active = %s)"
+        )
+        self.assertEqual(params, [1, 'A', True])
+    
+    def test_child_of(self):
+        """Test child_of uses a recursive query on the target hierarchy"""
+        sql, params = self._compile([('categ_id', 'child_of', 7)])
+        self.assertTrue(sql.startswith("expression_product.categ_id IN (WITH RECURSIVE tree(id)"))
+        self.assertIn("expression_category h JOIN tree ON h.parent_id = tree.id", sql)
+        self.assertEqual(params, [[7]])
+    
+    def test_invalid_field(self):
+        """Test unknown fields are rejected"""
+        with self.assertRaises(ValueError):
+            self._compile([('missing', '=', 1)])
+
+
+class TestExpressionPaths(TestCase):
+    """Test cases for dotted-path domains on pos.order -> pos.session -> pos.config"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._saved_registry = dict(models_registry)
+        
+        class PosConfig(BaseModel):
+            _name = 'pos.config'
+            _table = 'pos_config'
+            
+            name = CharField(string='Name')
+            session_ids = One2ManyField('pos.session', 'config_id', string='Sessions')
+            payment_method_ids = Many2ManyField('pos.payment.method', string='Payment Methods')
+        
+        class PosPaymentMethod(BaseModel):
+            _name = 'pos.payment.method'
+            _table = 'pos_payment_method'
+            
+            name = CharField(string='Name')
+        
+        class PosSession(BaseModel):
+            _name = 'pos.session'
+            _table = 'pos_session'
+            
+            name = CharField(string='Name')
+            state = CharField(string='State')
+            config_id = Many2OneField('pos.config', string='POS Configuration')
+            order_ids = One2ManyField('pos.order', 'session_id', string='Orders')
+        
+        class PosOrder(BaseModel):
+            _name = 'pos.order'
+            _table = 'pos_order'
+            
+            name = CharField(string='Order Reference')
+            state = CharField(string='State')
+            session_id = Many2OneField('pos.session', string='Session')
+        
+        cls.PosConfig = PosConfig
+        cls.PosSession = PosSession
+        cls.PosOrder = PosOrder
+    
+    @classmethod
+    def tearDownClass(cls):
+        models_registry.clear()
+        models_registry.update(cls._saved_registry)
+        super().tearDownClass()
+    
+    def test_many2one_path_joins(self):
+        """Test Many2one paths become LEFT JOINs"""
+        query = compile_domain(self.PosOrder, [
+            ('session_id.config_id', '=', 3),
+            ('state', '=', 'done'),
+        ])
+        sql, params = query.select(['pos_order.id'])
+        self.assertEqual(
+            sql,
+            "SELECT pos_order.id FROM pos_order "
+            "LEFT JOIN pos_session AS pos_order__session_id ON pos_order__session_id.id = pos_order.session_id "
+            "WHERE (pos_order__session_id.config_id = %s AND pos_order.state = %s)"
+        )
+        self.assertEqual(params, (3, 'done'))
+    
+    def test_many2one_path_reuses_join(self):
+        """Test a path used twice joins its table once"""
+        query = compile_domain(self.PosOrder, [
+            '|', ('session_id.config_id.name', '=', 'Main'), ('session_id.state', '=', 'opened'),
+        ])
+        self.assertEqual(list(query.joins), ['pos_order__session_id', 'pos_order__session_id__config_id'])
+        self.assertEqual(
+            query.where_clause(),
+            "(pos_order__session_id__config_id.name = %s OR pos_order__session_id.state = %s)"
+        )
+    
+    def test_one2many_path_exists(self):
+        """Test One2many paths become EXISTS subqueries"""
+        query = compile_domain(self.PosConfig, [('session_ids.order_ids.state', '=', 'done')])
+        self.assertEqual(
+            query.where_clause(),
+            "EXISTS (SELECT 1 FROM pos_session AS pos_config__session_ids "
+            "WHERE pos_config__session_ids.config_id = pos_config.id AND "
+            "EXISTS (SELECT 1 FROM pos_order AS pos_config__session_ids__order_ids "
+            "WHERE pos_config__session_ids__order_ids.session_id = pos_config__session_ids.id AND "
+            "pos_config__session_ids__order_ids.state = %s))"
+        )
+        self.assertEqual(query.where_params, ['done'])
+    
+    def test_many2many_path_exists(self):
+        """Test Many2many paths go through the relation table"""
+        query = compile_domain(self.PosConfig, [('payment_method_ids.name', 'ilike', 'cash')])
+        self.assertIn(
+            "pos_config__payment_method_ids.id IN (SELECT pos_payment_method_id FROM "
+            "pos_config_pos_payment_method_rel WHERE pos_config_id = pos_config.id)",
+            query.where_clause()
+        )
+    
+    def test_empty_one2many(self):
+        """Test '=' False on a One2many field means no linked records"""
+        query = compile_domain(self.PosSession, [('order_ids', '=', False)])
+        self.assertTrue(query.where_clause().startswith("(NOT EXISTS (SELECT 1 FROM pos_order"))
+    
+    def test_path_on_non_relational_field(self):
+        """Test paths through plain fields are rejected"""
+        with self.assertRaises(ValueError):
+            compile_domain(self.PosOrder, [('state.name', '=', 'x')])
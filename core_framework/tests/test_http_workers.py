@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler
+
+from core_framework.testing import TestCase
+from core_framework.http_workers import make_http_server, ThreadPoolHTTPServer, SingleThreadHTTPServer
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers after a short wait"""
+    
+    def do_GET(self):
+        time.sleep(0.2)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHTTPWorkers(TestCase):
+    """Test cases for the concurrent HTTP serving modes"""
+    
+    def _start(self, threads, max_requests=0):
+        server = make_http_server('127.0.0.1', 0, SlowHandler, threads)
+        server.max_requests = max_requests
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server, thread
+    
+    def _get(self, server):
+        return urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}/', timeout=5).read()
+    
+    def test_server_class(self):
+        """Test the thread count picks the server class"""
+        for threads, server_class in ((1, SingleThreadHTTPServer), (4, ThreadPoolHTTPServer)):
+            server = make_http_server('127.0.0.1', 0, SlowHandler, threads)
+            self.assertIsInstance(server, server_class)
+            server.server_close()
+    
+    def test_thread_pool_concurrency(self):
+        """Test slow requests are served in parallel"""
+        server, thread = self._start(threads=4)
+        try:
+            started = time.monotonic()
+            clients = [threading.Thread(target=self._get, args=(server,)) for _ in range(4)]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            self.assertLess(time.monotonic() - started, 0.6)
+        finally:
+            server.shutdown()
+            server.server_close()
+    
+    def test_max_requests(self):
+        """Test the server stops after the configured number of requests"""
+        server, thread = self._start(threads=2, max_requests=2)
+        self.assertEqual(self._get(server), b'ok')
+        self.assertEqual(self._get(server), b'ok')
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        server.server_close()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import TestCase
+from core_framework.instrumentation import QueryInstrumentation, statement_shape
+
+
+class TestInstrumentation(TestCase):
+    """Test cases for the query instrumentation"""
+    
+    def test_statement_shape(self):
+        """Test literals and whitespace are normalized"""
+        self.assertEqual(
+            statement_shape("SELECT *  FROM res_partner\n WHERE id = 42 AND name = 'O''Neil'"),
+            'SELECT * FROM res_partner WHERE id = ? AND name = ?'
+        )
+        self.assertEqual(statement_shape(b"SELECT 1.5"), 'SELECT ?')
+    
+    def test_scope_counters(self):
+        """Test nested scopes each count the queries run inside them"""
+        instrumentation = QueryInstrumentation({'database': {'slow_query_threshold': 1000}})
+        with instrumentation.scope('request', 'GET /') as request:
+            instrumentation.record("SELECT 1", None, 0.002, 1)
+            with instrumentation.scope('transaction') as transaction:
+                instrumentation.record("SELECT 2", None, 0.003, 4)
+            self.assertIs(instrumentation.current_scope(), request)
+        self.assertIsNone(instrumentation.current_scope())
+        self.assertEqual((request.query_count, request.rows), (2, 5))
+        self.assertEqual((transaction.query_count, transaction.rows), (1, 4))
+        self.assertEqual(instrumentation.get_metrics()['query_count'], 2)
+    
+    def test_slow_query(self):
+        """Test statements above the threshold are logged with their call site"""
+        instrumentation = QueryInstrumentation({'database': {'slow_query_threshold': 10}})
+        with instrumentation.scope('job') as stats, self.assertLogs(instrumentation.logger, 'WARNING') as logs:
+            instrumentation.record("SELECT pg_sleep(1)", ('secret',), 0.5, 1)
+            instrumentation.record("SELECT 1", None, 0.001, 1)
+        self.assertEqual(len(stats.slow_queries), 1)
+        self.assertIn("params=('secret',)", logs.output[0])
+        slow = instrumentation.get_metrics()['recent_slow_queries'][0]
+        self.assertNotIn('secret', repr(slow))
+        self.assertIn('test_instrumentation.py', slow['call_site'])
+    
+    def test_n_plus_one(self):
+        """Test a statement repeated from one call site is flagged once"""
+        instrumentation = QueryInstrumentation({'database': {'n_plus_one_threshold': 3}})
+        with instrumentation.scope('request') as stats:
+            for record_id in range(5):
+                instrumentation.record(f"SELECT name FROM res_partner WHERE id = {record_id}", None, 0.001, 1)
+        self.assertEqual(len(stats.n_plus_one), 1)
+        self.assertEqual(stats.n_plus_one[0]['query'], 'SELECT name FROM res_partner WHERE id = ?')
+        self.assertEqual(instrumentation.get_metrics()['n_plus_one_count'], 1)
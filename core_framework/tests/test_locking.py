@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import DatabaseTestCase
+from core_framework.orm import BaseModel, CharField, FloatField, Many2OneField, SQL, depends
+from core_framework.exceptions import ValidationError
+
+
+class LockingLocation(BaseModel):
+    _name = 'locking.location'
+    _table = 'locking_location'
+    
+    name = CharField(string='Name')
+
+
+class LockingQuant(BaseModel):
+    _name = 'locking.quant'
+    _table = 'locking_quant'
+    
+    location_id = Many2OneField('locking.location', string='Location')
+    quantity = FloatField(string='Quantity')
+    cost = FloatField(string='Cost')
+    value = FloatField(string='Value', compute='_compute_value', store=True)
+    
+    @depends('quantity', 'cost')
+    def _compute_value(self):
+        for quant in self:
+            quant.value = (quant.quantity or 0.0) * (quant.cost or 0.0)
+
+
+class TestLocking(DatabaseTestCase):
+    """Test cases for compare-and-set writes and row locks"""
+    
+    models = [LockingLocation, LockingQuant]
+    
+    def test_write_if(self):
+        """Test the write only applies to the records matching the condition"""
+        quants = self.env['locking.quant'].create([
+            {'quantity': 5, 'cost': 2.0},
+            {'quantity': 1, 'cost': 2.0},
+        ])
+        
+        updated = quants.write_if({'quantity': SQL('quantity - %s', 3)}, [('quantity', '>=', 3)])
+        self.assertEqual(updated, 1)
+        self.assertEqual([quant.quantity for quant in quants], [2, 1])
+        self.assertEqual([quant.value for quant in quants], [4.0, 2.0])
+        
+        self.assertEqual(quants[1].write_if({'quantity': 0}, [('quantity', '>=', 3)]), 0)
+        self.assertEqual(quants[1].quantity, 1)
+    
+    def test_write_if_rejects_related_conditions(self):
+        """Test conditions through a many2one are refused"""
+        location = self.env['locking.location'].create([{'name': 'Shelf'}])
+        quant = self.env['locking.quant'].create([{'quantity': 5, 'location_id': location.id}])
+        with self.assertRaises(ValueError):
+            quant.write_if({'quantity': 0}, [('location_id.name', '=', 'Shelf')])
+    
+    def test_lock_for_update(self):
+        """Test locking needs a transaction and drops the cached values"""
+        quant = self.env['locking.quant'].create([{'quantity': 5}])
+        with self.assertRaises(ValidationError):
+            quant.lock_for_update()
+        
+        self.assertEqual(quant.quantity, 5)
+        self.db.execute_update("UPDATE locking_quant SET quantity = 2 WHERE id = %s", (quant.id,))
+        with self.env.transaction():
+            locked = quant.lock_for_update(skip_locked=True)
+            self.assertEqual(locked.ids, quant.ids)
+            self.assertEqual(locked.quantity, 2)
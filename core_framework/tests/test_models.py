@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import TestCase, DatabaseTestCase
+from core_framework.exceptions import ValidationError
+from core_framework.orm import (
+    BaseModel, CharField, IntegerField, FloatField, BooleanField, DateField, One2ManyField, Many2OneField,
+    Many2ManyField, ORMManager, models_registry, invalidate_field_triggers,
+)
+
+
+class SetupPartner(BaseModel):
+    _name = 'setup.partner'
+    _table = 'setup_partner'
+    
+    name = CharField(string='Name', required=True)
+    ref = CharField(string='Reference', default=lambda: 'NEW')
+    credit = FloatField(string='Credit', default=0.0)
+    contact_ids = One2ManyField('setup.contact', 'partner_id', string='Contacts')
+
+
+class SetupContact(BaseModel):
+    _name = 'setup.contact'
+    _table = 'setup_contact'
+    
+    partner_id = Many2OneField('setup.partner', string='Partner')
+    name = CharField(string='Name')
+
+
+class SetupStamp(BaseModel):
+    _name = 'setup.stamp'
+    _table = 'setup_stamp'
+    
+    name = CharField(string='Name')
+    flag = IntegerField(string='Flag')
+
+
+class SetupTag(BaseModel):
+    _name = 'setup.tag'
+    _table = 'setup_tag'
+    _unique_keys = [('code',)]
+    
+    code = CharField(string='Code', size=16, required=True)
+    state = CharField(string='State')
+    partner_id = Many2OneField('setup.partner', string='Partner')
+    sequence = IntegerField(string='Sequence', index=True)
+    date_start = DateField(string='Start Date')
+    contact_ids = Many2ManyField('setup.contact', string='Contacts')
+
+
+class SetupTagNext(SetupTag):
+    """Next version of setup.tag, as an upgrade finds it"""
+    _name = 'setup.tag.next'
+    _table = 'setup_tag'
+    
+    active = BooleanField(string='Active')
+    priority = IntegerField(string='Priority', index=True)
+
+
+class TestModelSetup(TestCase):
+    """Test cases for the metadata models get at class creation"""
+    
+    def test_field_order(self):
+        """Test fields and columns keep their definition order"""
+        self.assertEqual(list(SetupPartner._get_fields()), ['name', 'ref', 'credit', 'contact_ids'])
+        self.assertEqual(
+            SetupPartner._get_column_names(),
+            ('id', 'name', 'ref', 'credit', 'create_date', 'write_date', 'create_uid', 'write_uid')
+        )
+        self.assertEqual(SetupPartner._required_fields, ('name',))
+        self.assertEqual(SetupContact._many2one_fields, frozenset(['partner_id']))
+    
+    def test_subclass_fields(self):
+        """Test a subclass gets its own fields even after its parent was set up"""
+        SetupPartner._get_fields()
+        
+        class SetupCustomer(SetupPartner):
+            _name = 'setup.customer'
+            
+            level = IntegerField(string='Level')
+            ref = None
+        
+        self.assertEqual(list(SetupCustomer._get_fields()), ['name', 'credit', 'contact_ids', 'level'])
+        self.assertNotIn('level', SetupPartner._get_fields())
+        self.assertIn('level', SetupCustomer._get_column_names())
+        del models_registry['setup.customer']
+        invalidate_field_triggers()
+    
+    def test_field_slots(self):
+        """Test field descriptors carry no instance dict"""
+        self.assertFalse(hasattr(SetupPartner._get_fields()['name'], '__dict__'))
+
+
+class TestModelCreate(DatabaseTestCase):
+    """Test cases for create() with the precomputed metadata"""
+    
+    models = [SetupPartner, SetupContact]
+    
+    def test_defaults_and_required(self):
+        """Test defaults are applied and required fields enforced"""
+        partner = self.env['setup.partner'].create({'name': 'Tiny Tots'})
+        self.assertEqual(partner.read(['ref', 'credit'])[0], {'id': partner.id, 'ref': 'NEW', 'credit': 0.0})
+        with self.assertRaises(ValidationError):
+            self.env['setup.partner'].create({'ref': 'X'})
+        with self.assertRaises(ValueError):
+            self.env['setup.partner'].create({'name': 'X', 'unknown': 1})
+    
+    def test_missing_columns(self):
+        """Test columns a row does not give keep their database default"""
+        self.db.execute_ddl(
+            "CREATE TABLE setup_stamp (id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR, flag INTEGER DEFAULT 7, "
+            "create_date TIMESTAMP, write_date TIMESTAMP, create_uid INTEGER, write_uid INTEGER)"
+        )
+        self.addCleanup(self.db.execute_ddl, "DROP TABLE setup_stamp")
+        stamps = self.env['setup.stamp'].create([
+            {'name': 'Given', 'flag': 1, 'id': 1000},
+            {'name': 'Default'},
+        ])
+        self.assertEqual(stamps.ids[0], 1000)
+        self.assertNotIn(stamps.ids[1], (None, 1000))
+        self.assertEqual([row['flag'] for row in stamps.read(['flag'])], [1, 7])
+    
+    def test_inverse_cache(self):
+        """Test creating a line drops the cached One2many of its parent"""
+        partner = self.env['setup.partner'].create({'name': 'Tiny Tots'})
+        self.assertEqual(len(partner.contact_ids), 0)
+        self.env['setup.contact'].create({'partner_id': partner.id, 'name': 'Asha'})
+        self.assertEqual(len(partner.contact_ids), 1)
+
+
+class TestModelTable(DatabaseTestCase):
+    """Test cases for creating and upgrading model tables"""
+    
+    models = [SetupPartner, SetupContact]
+    
+    def setUp(self):
+        super().setUp()
+        self.orm_manager = ORMManager(self.db.config, self.db)
+        self.addCleanup(self.db.execute_ddl, "DROP TABLE IF EXISTS setup_tag")
+    
+    def _create_table(self, model_class):
+        with self.assertNoLogs('ERP.ORM', level='ERROR'):
+            self.orm_manager._create_model_table(model_class)
+    
+    def test_create_table(self):
+        """Test the columns, automatic indexes and relation table of a new table"""
+        self._create_table(SetupTag)
+        self.assertEqual(self.db.get_table_columns('setup_tag'), {
+            'id': 'integer', 'code': 'varchar(16)', 'state': 'varchar(255)', 'partner_id': 'integer',
+            'sequence': 'integer', 'date_start': 'date', 'create_date': 'timestamp', 'write_date': 'timestamp',
+            'create_uid': 'integer', 'write_uid': 'integer',
+        })
+        # Many2one, index=True and the commonly filtered columns get an index, the unique key a unique one
+        self.assertEqual(set(self.db.get_table_indexes('setup_tag')), {
+            'setup_tag_state_index', 'setup_tag_partner_id_index', 'setup_tag_sequence_index',
+            'setup_tag_code_key_index',
+        })
+        relation = SetupTag._get_fields()['contact_ids'].get_relation(SetupTag, SetupContact)[0]
+        self.addCleanup(self.db.execute_ddl, f"DROP TABLE IF EXISTS {relation}")
+        self.assertTrue(self.db.table_exists(relation))
+        
+        self.env['setup.tag'].create({'code': 'NEW'})
+        with self.assertRaises(Exception):
+            self.env['setup.tag'].create({'code': 'NEW'})
+    
+    def test_upgrade_table(self):
+        """Test an existing table gets the new columns and indexes and keeps its rows"""
+        self._create_table(SetupTag)
+        tag = self.env['setup.tag'].create({'code': 'OLD', 'sequence': 3})
+        
+        self._create_table(SetupTagNext)
+        columns = self.db.get_table_columns('setup_tag')
+        self.assertEqual(columns['active'], 'boolean')
+        self.assertEqual(columns['priority'], 'integer')
+        self.assertIn('setup_tag_priority_index', self.db.get_table_indexes('setup_tag'))
+        self.assertEqual(self.env['setup.tag.next'].browse(tag.id).read(['code', 'sequence', 'active']),
+                         [{'id': tag.id, 'code': 'OLD', 'sequence': 3, 'active': None}])
+        
+        # Running it again changes nothing
+        self._create_table(SetupTagNext)
+        self.assertEqual(self.db.get_table_columns('setup_tag'), columns)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import DatabaseTestCase
+from core_framework.orm import BaseModel, CharField, IntegerField
+
+
+class PageItem(BaseModel):
+    _name = 'page.item'
+    _table = 'page_item'
+    _order = 'seq desc, id desc'
+    
+    name = CharField(string='Name')
+    seq = IntegerField(string='Sequence')
+
+
+class TestSearchAfter(DatabaseTestCase):
+    """Test cases for keyset pagination"""
+    
+    models = [PageItem]
+    
+    def setUp(self):
+        super().setUp()
+        # A nullable order column with ties and NULLs on every page
+        self.env['page.item'].create([
+            {'name': f'Item {index}', 'seq': None if index % 4 == 0 else index % 3}
+            for index in range(20)
+        ])
+    
+    def _page_all(self, order, limit):
+        ids = []
+        cursor = None
+        while True:
+            page, cursor = self.env['page.item'].search_after(cursor, limit=limit, order=order)
+            ids += page.ids
+            if cursor is None:
+                return ids
+    
+    def test_nullable_order(self):
+        """Test paging a nullable column in both directions matches search()"""
+        for order in (None, 'seq desc, id desc', 'seq asc, id asc', 'seq asc, id desc',
+                      'seq asc nulls first, id asc', 'seq desc nulls last, id asc'):
+            expected = self.env['page.item'].search([], order=order).ids
+            self.assertEqual(len(expected), 20)
+            for limit in (1, 3, 7):
+                self.assertEqual(self._page_all(order, limit), expected, f"order {order!r}, limit {limit}")
+    
+    def test_null_placement(self):
+        """Test NULLs sort last ascending and first descending unless told otherwise"""
+        records = self.env['page.item'].search([], order='seq asc, id asc')
+        self.assertIsNone(records.browse(records.ids[-1]).seq)
+        records = self.env['page.item'].search([], order='seq desc, id asc')
+        self.assertIsNone(records.browse(records.ids[0]).seq)
+        records = self.env['page.item'].search([], order='seq asc nulls first, id asc')
+        self.assertIsNone(records.browse(records.ids[0]).seq)
+    
+    def test_domain_and_cursor(self):
+        """Test the domain is kept across pages and invalid cursors are refused"""
+        page, cursor = self.env['page.item'].search_after(limit=2, domain=[('seq', '!=', None)], order='seq asc')
+        self.assertEqual(len(page), 2)
+        ids = page.ids
+        while cursor is not None:
+            page, cursor = self.env['page.item'].search_after(cursor, limit=2, domain=[('seq', '!=', None)],
+                                                              order='seq asc')
+            ids += page.ids
+        self.assertEqual(ids, self.env['page.item'].search([('seq', '!=', None)], order='seq asc, id asc').ids)
+        with self.assertRaises(ValueError):
+            self.env['page.item'].search_after((1,), order='seq asc')
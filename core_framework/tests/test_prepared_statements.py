@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import TestCase
+from core_framework.database import DatabaseManager
+from core_framework.orm import BaseModel, CharField, Environment
+
+
+class PreparedProduct(BaseModel):
+    _name = 'prepared.product'
+    _table = 'prepared_product'
+    
+    name = CharField(string='Name')
+
+
+class FakeConnection:
+    """Connection stand-in recording the statements run on it"""
+    
+    def __init__(self):
+        self.statements = []
+        self.sequence = 0
+    
+    def cursor(self):
+        return FakeCursor(self)
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+
+
+class FakeCursor:
+    
+    rowcount = 1
+    
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def execute(self, query, params=None):
+        self.connection.statements.append(query.split(' (')[0])
+    
+    def fetchone(self):
+        self.connection.sequence += 1
+        return (self.connection.sequence,)
+    
+    def close(self):
+        pass
+
+
+class FakePool:
+
+    def __init__(self):
+        self.connection = FakeConnection()
+    
+    def getconn(self, timeout=None, statement_timeout=None):
+        return self.connection
+    
+    def putconn(self, connection, close=False):
+        pass
+
+
+class TestPreparedStatements(TestCase):
+    """Test cases for the per-connection prepared statement cache"""
+    
+    def setUp(self):
+        super().setUp()
+        self.db = DatabaseManager({'database': {'backend': 'postgresql', 'prepared_statement_cache_size': 2}})
+    
+    def _execute(self, connection, table):
+        self.db._execute_prepared(FakeCursor(connection), ('get', table), f"SELECT * FROM {table} WHERE id = $1", (1,))
+        return self.db._statement_names[('get', table)]
+    
+    def test_hits_and_misses(self):
+        """Test a statement is prepared once per connection and executed on each use"""
+        connection, other = FakeConnection(), FakeConnection()
+        name = self._execute(connection, 'product')
+        self._execute(connection, 'product')
+        self._execute(other, 'product')
+        self.assertEqual(connection.statements, [
+            f"PREPARE {name} AS SELECT * FROM product WHERE id = $1", f"EXECUTE {name}", f"EXECUTE {name}",
+        ])
+        self.assertEqual(len(other.statements), 2)
+        self.assertEqual(self.db.statement_stats, {'hits': 1, 'misses': 2, 'evictions': 0})
+    
+    def test_lru_eviction(self):
+        """Test the least recently used statement is deallocated past the cache size"""
+        connection = FakeConnection()
+        product = self._execute(connection, 'product')
+        partner = self._execute(connection, 'partner')
+        self._execute(connection, 'product')
+        order = self._execute(connection, 'sale_order')
+        self.assertEqual(connection.statements[-2:], [f"DEALLOCATE {partner}", f"EXECUTE {order}"])
+        self.assertEqual(self.db.statement_stats['evictions'], 1)
+        
+        del connection.statements[:]
+        self._execute(connection, 'product')
+        self._execute(connection, 'partner')
+        self.assertEqual(connection.statements[0], f"EXECUTE {product}")
+        self.assertEqual(connection.statements[1:3], [
+            f"PREPARE {partner} AS SELECT * FROM partner WHERE id = $1", f"DEALLOCATE {order}",
+        ])
+        self.assertEqual(self.db.statement_stats, {'hits': 2, 'misses': 4, 'evictions': 2})
+    
+    def test_invalidation(self):
+        """Test a schema change deallocates everything once and prepares again"""
+        connection = FakeConnection()
+        name = self._execute(connection, 'product')
+        self.db.invalidate_prepared_statements()
+        del connection.statements[:]
+        self._execute(connection, 'product')
+        self._execute(connection, 'product')
+        self.assertEqual(connection.statements, [
+            "DEALLOCATE ALL", f"PREPARE {name} AS SELECT * FROM product WHERE id = $1",
+            f"EXECUTE {name}", f"EXECUTE {name}",
+        ])
+        
+        # A connection first used after the change has nothing to drop
+        other = FakeConnection()
+        self._execute(other, 'product')
+        self.assertNotIn("DEALLOCATE ALL", other.statements)
+    
+    def test_orm_writes(self):
+        """Test create(), write() and unlink() of one record reuse their prepared statements"""
+        self.db.config['database']['prepared_statement_cache_size'] = 16
+        self.db.connection_pool = FakePool()
+        env = Environment(self.db)
+        for index in range(3):
+            product = env['prepared.product'].create({'name': f'Product {index}'})
+            product.write({'name': f'Renamed {index}'})
+            product.unlink()
+        self.assertEqual(self.db.statement_stats, {'hits': 6, 'misses': 3, 'evictions': 0})
+        statements = self.db.connection_pool.connection.statements
+        self.assertEqual(sum(statement.startswith('EXECUTE') for statement in statements), 9)
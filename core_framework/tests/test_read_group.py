@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date, datetime
+
+from core_framework.testing import DatabaseTestCase
+from core_framework.orm import BaseModel, CharField, IntegerField, FloatField, DateField, DateTimeField
+
+
+class GroupSale(BaseModel):
+    _name = 'group.sale'
+    _table = 'group_sale'
+    
+    name = CharField(string='Name')
+    state = CharField(string='State')
+    qty = IntegerField(string='Quantity')
+    amount = FloatField(string='Amount')
+    date_order = DateField(string='Order Date')
+    create_time = DateTimeField(string='Created At')
+
+
+class TestReadGroup(DatabaseTestCase):
+    """Test cases for read_group and search_count"""
+    
+    models = [GroupSale]
+    
+    def setUp(self):
+        super().setUp()
+        self.env['group.sale'].create([
+            {'name': 'S1', 'state': 'draft', 'qty': 1, 'amount': 10.0,
+             'date_order': date(2024, 1, 31), 'create_time': datetime(2024, 1, 31, 23, 30)},
+            {'name': 'S2', 'state': 'draft', 'qty': 3, 'amount': 30.0,
+             'date_order': date(2024, 2, 1), 'create_time': datetime(2024, 2, 1, 8, 0)},
+            {'name': 'S3', 'state': 'done', 'qty': 5, 'amount': 50.0,
+             'date_order': date(2024, 2, 4), 'create_time': datetime(2024, 2, 4, 12, 0)},
+            {'name': 'S4', 'state': 'done', 'qty': 7, 'amount': 70.0,
+             'date_order': date(2024, 2, 5), 'create_time': datetime(2024, 2, 5, 0, 0)},
+            {'name': 'S5', 'state': None, 'qty': 9, 'amount': 90.0, 'date_order': None},
+        ])
+    
+    def _names(self, domain):
+        return sorted(self.env['group.sale'].search(domain).mapped('name'))
+    
+    def test_search_count(self):
+        """Test search_count counts the records of a domain"""
+        self.assertEqual(self.env['group.sale'].search_count(), 5)
+        self.assertEqual(self.env['group.sale'].search_count([('state', '=', 'done')]), 2)
+        self.assertEqual(self.env['group.sale'].search_count([('qty', '>', 100)]), 0)
+    
+    def test_aggregates(self):
+        """Test grouping by a field with default and explicit aggregates"""
+        groups = self.env['group.sale'].read_group(
+            [('state', '!=', None)], ['qty', 'amount:avg', 'top:max(qty)', 'name:count'], ['state'],
+        )
+        self.assertEqual([group['state'] for group in groups], ['done', 'draft'])
+        done, draft = groups
+        self.assertEqual(done['qty'], 12)
+        self.assertEqual(done['amount'], 60.0)
+        self.assertEqual(done['top'], 7)
+        self.assertEqual(done['name'], 2)
+        self.assertEqual(done['state_count'], 2)
+        self.assertEqual(draft['qty'], 4)
+        self.assertEqual(draft['top'], 3)
+        
+        groups = self.env['group.sale'].read_group([], ['qty'], ['state'], orderby='qty desc')
+        self.assertEqual([group['qty'] for group in groups], [12, 9, 4])
+        with self.assertRaises(ValueError):
+            self.env['group.sale'].read_group([], ['qty:median'], ['state'])
+    
+    def test_lazy(self):
+        """Test lazy grouping applies only the first groupby"""
+        groups = self.env['group.sale'].read_group([('state', '!=', None)], ['qty'], ['state', 'date_order:month'])
+        self.assertEqual(len(groups), 2)
+        self.assertIn('state_count', groups[0])
+        self.assertNotIn('date_order:month', groups[0])
+        
+        groups = self.env['group.sale'].read_group([('state', '!=', None)], ['qty'], ['state', 'date_order:month'],
+                                                   lazy=False)
+        self.assertEqual([(group['state'], group['date_order:month'], group['__count']) for group in groups], [
+            ('done', date(2024, 2, 1), 2),
+            ('draft', date(2024, 1, 1), 1),
+            ('draft', date(2024, 2, 1), 1),
+        ])
+    
+    def test_date_granularity(self):
+        """Test date and datetime fields grouped by month and by week"""
+        groups = self.env['group.sale'].read_group([], ['qty'], ['date_order:month'])
+        self.assertEqual([(group['date_order:month'], group['qty']) for group in groups],
+                         [(date(2024, 1, 1), 1), (date(2024, 2, 1), 15), (None, 9)])
+        
+        # Weeks start on Monday: 2024-01-29 and 2024-02-05
+        groups = self.env['group.sale'].read_group([('date_order', '!=', None)], ['qty'], ['date_order:week'])
+        self.assertEqual([(group['date_order:week'], group['qty']) for group in groups],
+                         [(date(2024, 1, 29), 9), (date(2024, 2, 5), 7)])
+        
+        groups = self.env['group.sale'].read_group([('create_time', '!=', None)], ['qty'], ['create_time:month'])
+        self.assertEqual([(group['create_time:month'], group['qty']) for group in groups],
+                         [(datetime(2024, 1, 1), 1), (datetime(2024, 2, 1), 15)])
+        with self.assertRaises(ValueError):
+            self.env['group.sale'].read_group([], ['qty'], ['name:month'])
+    
+    def test_group_domain(self):
+        """Test each group's __domain selects exactly the records of the group"""
+        for groupby in (['state'], ['date_order:month'], ['date_order:week'], ['create_time:month'],
+                        ['state', 'date_order:week']):
+            groups = self.env['group.sale'].read_group([('qty', '>', 1)], ['qty'], groupby, lazy=False)
+            for group in groups:
+                names = self._names(group['__domain'])
+                self.assertEqual(len(names), group['__count'], f"groupby {groupby}: {group}")
+                self.assertEqual(sum(self.env['group.sale'].search(group['__domain']).mapped('qty')), group['qty'])
+            self.assertEqual(sum(group['__count'] for group in groups), 4)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from psycopg2 import extensions
+
+from core_framework.testing import TestCase
+from core_framework.database import DatabaseManager, REPLICA_LAG_QUERY
+
+
+class FakeCursor:
+
+    rowcount = 1
+    closed = False
+    
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def execute(self, query, params=None):
+        self.connection.pool.statements.append(query)
+    
+    def fetchone(self):
+        return (self.connection.pool.lag,)
+    
+    def fetchall(self):
+        return [{'server': self.connection.pool.name}]
+    
+    def __iter__(self):
+        return iter(self.fetchall())
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.info = self
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+    
+    def cursor(self, name=None, cursor_factory=None):
+        return FakeCursor(self)
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    """Pool stand-in of one server, recording the statements run on it"""
+    
+    def __init__(self, name, lag=0):
+        self.name = name
+        self.lag = lag
+        self.failing = False
+        self.in_use = 0
+        self.statements = []
+    
+    def getconn(self, timeout=None, statement_timeout=None):
+        if self.failing:
+            raise RuntimeError("connection refused")
+        self.in_use += 1
+        return FakeConnection(self)
+    
+    def putconn(self, connection, close=False):
+        self.in_use -= 1
+    
+    def get_stats(self):
+        return {'in_use': self.in_use}
+
+
+class TestReplicaRouting(TestCase):
+    """Test cases for routing reads to replicas, on stubbed pools"""
+    
+    def setUp(self):
+        super().setUp()
+        self.db = DatabaseManager({'database': {
+            'backend': 'postgresql', 'replica_max_lag': 30, 'replica_lag_check_interval': 0,
+        }})
+        self.primary = self.db.connection_pool = FakePool('primary')
+        self.replica = FakePool('replica')
+        self.db.replicas.append({
+            'name': 'replica', 'pool': self.replica, 'lag': None, 'checked_at': None, 'lock': threading.Lock(),
+        })
+    
+    def _server(self, query="SELECT 1", **kwargs):
+        return self.db.execute_query(query, **kwargs)[0]['server']
+    
+    def test_readonly_routing(self):
+        """Test only statements declared readonly go to a replica, never inside a transaction"""
+        self.assertEqual(self._server(readonly=True), 'replica')
+        self.assertEqual(list(self.db.stream_query("SELECT 1", readonly=True))[0]['server'], 'replica')
+        # The statement text does not decide, a SELECT may call a writing function
+        self.assertEqual(self._server("SELECT create_invoice(1)"), 'primary')
+        with self.db.transaction():
+            self.assertEqual(self._server(readonly=True), 'primary')
+        self.assertEqual(self.replica.in_use, 0)
+        self.assertEqual(self.primary.in_use, 0)
+        self.assertNotIn("SELECT create_invoice(1)", self.replica.statements)
+    
+    def test_lag_threshold(self):
+        """Test a replica lagging past replica_max_lag is skipped"""
+        self.replica.lag = 60
+        self.assertEqual(self._server(readonly=True), 'primary')
+        self.assertEqual(self.db.get_pool_stats()['replicas']['replica']['lag'], 60)
+        self.replica.lag = 5
+        self.assertEqual(self._server(readonly=True), 'replica')
+        self.assertEqual(self.replica.statements.count(REPLICA_LAG_QUERY), 2)
+    
+    def test_read_your_writes(self):
+        """Test a thread reads from the primary until a replica caught up with its commit"""
+        self.replica.lag = 1
+        self.db.execute_update("UPDATE product SET active = TRUE")
+        self.assertEqual(self._server(readonly=True), 'primary')
+        with self.db.replica_reads():
+            self.assertEqual(self._server(readonly=True), 'replica')
+            self.assertEqual(self._server(), 'primary')
+        self.assertEqual(self._server(readonly=True), 'primary')
+    
+    def test_fallback(self):
+        """Test reads fall back to the primary when the replica cannot be reached"""
+        self.assertEqual(self._server(readonly=True), 'replica')
+        self.replica.failing = True
+        self.assertEqual(self._server(readonly=True), 'primary')
+        self.assertIsNone(self.db.replicas[0]['lag'])
+        self.replica.failing = False
+        self.assertEqual(self._server(readonly=True), 'replica')
+        
+        self.db.replicas[0]['lag'] = 0
+        self.db.config['database']['replica_lag_check_interval'] = 60
+        self.replica.failing = True
+        # A replica failing at checkout is marked unavailable until measured again
+        with self.assertLogs('ERP.Database', level='WARNING'):
+            self.assertEqual(self._server(readonly=True), 'primary')
+        self.assertIsNone(self.db.replicas[0]['lag'])
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+
+from core_framework.testing import TestCase
+from core_framework.routing import Router, Controller, MethodNotAllowed, NotFound, route
+from core_framework.addon_manager import AddonManager
+
+
+class TestRouter(TestCase):
+    """Test cases for the route trie"""
+    
+    def setUp(self):
+        super().setUp()
+        self.router = Router()
+        for pattern, methods in (
+            ('/', ['GET']),
+            ('/api/website/pages', ['GET']),
+            ('/api/website/page/<int:page_id>', ['GET']),
+            ('/api/website/page/<string:slug>', ['GET']),
+            ('/api/website/page/<int:page_id>/publish', ['POST']),
+            ('/api/rate/<float:rate>', None),
+            ('/static/<path:file_path>', ['GET']),
+        ):
+            self.router.add(pattern, pattern, methods)
+    
+    def test_static_and_typed_segments(self):
+        """Test static segments, converters and their priority"""
+        self.assertEqual(self.router.match('/', 'GET'), ('/', {}))
+        self.assertEqual(self.router.match('/api/website/pages', 'GET'), ('/api/website/pages', {}))
+        self.assertEqual(
+            self.router.match('/api/website/page/42', 'GET'),
+            ('/api/website/page/<int:page_id>', {'page_id': 42})
+        )
+        self.assertEqual(
+            self.router.match('/api/website/page/about-us', 'GET'),
+            ('/api/website/page/<string:slug>', {'slug': 'about-us'})
+        )
+        self.assertEqual(self.router.match('/api/rate/1.5', 'PUT')[1], {'rate': 1.5})
+        self.assertEqual(self.router.match('/static/css/main.css', 'GET')[1], {'file_path': 'css/main.css'})
+    
+    def test_errors(self):
+        """Test unknown paths, wrong methods and invalid patterns"""
+        with self.assertRaises(NotFound):
+            self.router.match('/api/website/page/42/unknown', 'GET')
+        with self.assertRaises(NotFound):
+            self.router.match('/api/rate/abc', 'GET')
+        with self.assertRaises(MethodNotAllowed) as context:
+            self.router.match('/api/website/page/42/publish', 'GET')
+        self.assertEqual(context.exception.allowed_methods, ['POST'])
+        
+        with self.assertRaises(ValueError):
+            self.router.add('/api/website/page/<int:other_id>', 'conflict', ['GET'])
+        with self.assertRaises(ValueError):
+            self.router.add('/api/website/pages', 'duplicate', ['GET'])
+        with self.assertRaises(ValueError):
+            self.router.add('/api/<uuid:key>', 'converter', ['GET'])
+    
+    def test_declarative_routes(self):
+        """Test routes declared on a controller class"""
+        saved_registry = list(Controller.registry)
+        self.addCleanup(lambda: Controller.registry.__setitem__(slice(None), saved_registry))
+        
+        class PageController(Controller):
+            @route(['/page/<int:page_id>', '/p/<int:page_id>'], type='http', auth='public', website=True)
+            def page(self, page_id, **kwargs):
+                return page_id
+        
+        self.assertIn(PageController, Controller.registry)
+        router = Router()
+        router.add_routes(PageController)
+        endpoint, params = router.match('/p/7', 'GET')
+        self.assertIs(endpoint.owner, PageController)
+        self.assertEqual(endpoint.options['auth'], 'public')
+        self.assertEqual(endpoint.function(PageController(), **params), 7)
+
+
+class AddonsConfig:
+    
+    def __init__(self, addons_path):
+        self.addons_path = addons_path
+    
+    def get_addons_path(self):
+        return self.addons_path
+    
+    def get(self, key, default=None):
+        return default
+
+
+class TestAddonControllers(TestCase):
+    """Test cases for loading the controllers of installed addons"""
+    
+    def _write_addon(self, root, addon_name, controller_source):
+        controllers_path = os.path.join(root, addon_name, 'controllers')
+        os.makedirs(controllers_path)
+        with open(os.path.join(controllers_path, '__init__.py'), 'w') as f:
+            f.write("from . import main\n")
+        with open(os.path.join(controllers_path, 'main.py'), 'w') as f:
+            f.write(controller_source)
+        self.addCleanup(self._unload, addon_name)
+    
+    def _unload(self, addon_name):
+        for module_name in list(sys.modules):
+            if module_name.startswith(f"addons.{addon_name}."):
+                del sys.modules[module_name]
+    
+    def test_load_controllers(self):
+        """Test addon controllers join the router and foreign ones are skipped with a warning"""
+        saved_registry = list(Controller.registry)
+        self.addCleanup(lambda: Controller.registry.__setitem__(slice(None), saved_registry))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = directory.name
+        self._write_addon(root, 'shop_demo', (
+            "from core_framework.routing import Controller, route\n"
+            "class ShopController(Controller):\n"
+            "    @route('/shop/<int:product_id>', auth='public', methods=['GET'])\n"
+            "    def product(self, product_id):\n"
+            "        return {'product_id': product_id}\n"
+        ))
+        self._write_addon(root, 'legacy_demo', "from ocean import http\n")
+        
+        manager = AddonManager(AddonsConfig(root))
+        for addon_name in ('shop_demo', 'legacy_demo'):
+            manager.addons[addon_name] = {'name': addon_name, 'path': os.path.join(root, addon_name)}
+        manager._load_addon_controllers('shop_demo')
+        with self.assertLogs('ERP.AddonManager', level='WARNING') as logs:
+            manager._load_addon_controllers('legacy_demo')
+        self.assertIn('Controllers of legacy_demo are not served', logs.output[0])
+        
+        [controller_class] = Controller.registry[len(saved_registry):]
+        router = Router()
+        router.add_routes(controller_class)
+        endpoint, params = router.match('/shop/42', 'GET')
+        self.assertEqual(endpoint.function(controller_class(), **params), {'product_id': 42})
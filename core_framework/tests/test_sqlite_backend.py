@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from core_framework.testing import TestCase, DatabaseTestCase
+from core_framework.orm import BaseModel, CharField, IntegerField, FloatField, BooleanField
+from core_framework.sqlite_backend import SQLiteDatabaseManager, translate_query
+from core_framework.database import DatabaseManager
+
+
+class BackendItem(BaseModel):
+    _name = 'backend.item'
+    _table = 'backend_item'
+    _unique_keys = [('code',)]
+    
+    code = CharField(string='Code', size=16)
+    name = CharField(string='Name')
+    quantity = IntegerField(string='Quantity')
+    price = FloatField(string='Price')
+    active = BooleanField(string='Active', default=True)
+
+
+class TestTranslateQuery(TestCase):
+    """Test cases for the PostgreSQL to SQLite statement translation"""
+    
+    def test_placeholders(self):
+        """Test placeholders, arrays and casts"""
+        self.assertEqual(
+            translate_query("SELECT * FROM t WHERE id = ANY($1::integer[]) AND name = $2"),
+            "SELECT * FROM t WHERE id IN (SELECT value FROM json_each(?1)) AND name = ?2"
+        )
+        self.assertEqual(
+            translate_query("UPDATE t SET a = %s::text WHERE id = ANY(%s)"),
+            "UPDATE t SET a = ? WHERE id IN (SELECT value FROM json_each(?))"
+        )
+    
+    def test_dialect(self):
+        """Test PostgreSQL-only syntax is rewritten, string literals are kept"""
+        self.assertEqual(
+            translate_query("SELECT id FROM t WHERE name ILIKE %s AND note = '%s::x' FOR UPDATE SKIP LOCKED"),
+            "SELECT id FROM t WHERE LOWER(name) LIKE LOWER(?) AND note = '%s::x' "
+        )
+        self.assertEqual(
+            translate_query("SELECT 1 FROM t WHERE (t.a NOT ILIKE %(a)s OR t.a IS NULL) AND b LIKE $2 AND 'c ILIKE d'"),
+            "SELECT 1 FROM t WHERE (LOWER(t.a) NOT LIKE LOWER(:a) OR t.a IS NULL) AND b LIKE ?2 AND 'c ILIKE d'"
+        )
+        self.assertEqual(
+            translate_query("CREATE TABLE t (id SERIAL PRIMARY KEY)"),
+            "CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT)"
+        )
+        self.assertEqual(
+            translate_query("CREATE INDEX CONCURRENTLY IF NOT EXISTS t_a_index ON t (a)"),
+            "CREATE INDEX IF NOT EXISTS t_a_index ON t (a)"
+        )
+
+
+class TestSQLiteBackend(DatabaseTestCase):
+    """Test cases for the ORM on the SQLite backend"""
+    
+    models = [BackendItem]
+    
+    def test_backend_selection(self):
+        """Test the configured backend picks the manager class"""
+        self.assertIsInstance(self.db, SQLiteDatabaseManager)
+    
+    def test_crud(self):
+        """Test create, search, read, write and unlink"""
+        items = self.env['backend.item'].create([
+            {'code': 'A', 'name': 'Blue Shirt', 'quantity': 3, 'price': 9.5},
+            {'code': 'B', 'name': 'Red Shirt', 'quantity': 0, 'price': 12.0, 'active': False},
+            {'code': 'C', 'name': 'Socks', 'quantity': 7, 'price': 2.25},
+        ])
+        self.assertEqual(len(items.ids), 3)
+        
+        shirts = self.env['backend.item'].search([('name', 'ilike', 'shirt')], order='code')
+        self.assertEqual(shirts.ids, items.ids[:2])
+        found = self.env['backend.item'].search([('id', 'in', items.ids[1:]), ('active', '=', True)])
+        self.assertEqual(found.ids, items.ids[2:])
+        self.assertEqual(self.env['backend.item'].search_count([('quantity', '>', 0)]), 2)
+        
+        items.browse(items.ids[:2]).write({'quantity': 5})
+        rows = items.read(['quantity', 'active'])
+        self.assertEqual([row['quantity'] for row in rows], [5, 5, 7])
+        self.assertIs(rows[1]['active'], False)
+        
+        items.browse(items.ids[2:]).unlink()
+        self.assertEqual(self.env['backend.item'].search([]).ids, items.ids[:2])
+    
+    def test_like_case(self):
+        """Test like is case-sensitive and ilike is not, as in PostgreSQL"""
+        items = self.env['backend.item'].create([
+            {'code': 'A', 'name': 'Blue Shirt'},
+            {'code': 'B', 'name': 'T-SHIRT'},
+            {'code': 'C', 'name': 'Écharpe'},
+        ])
+        search = self.env['backend.item'].search
+        self.assertEqual(search([('name', 'like', 'Shirt')]).ids, items.ids[:1])
+        self.assertEqual(search([('name', 'ilike', 'shirt')], order='code').ids, items.ids[:2])
+        self.assertEqual(search([('name', 'not ilike', 'SHIRT')]).ids, items.ids[2:])
+        self.assertEqual(search([('name', '=ilike', 'écharpe')]).ids, items.ids[2:])
+        self.assertEqual(search([('name', '=like', 'écharpe')]).ids, [])
+    
+    def test_minimum_version(self):
+        """Test an SQLite without NULLS FIRST/LAST is refused"""
+        db = DatabaseManager({'database': {'backend': 'sqlite'}})
+        with mock.patch('sqlite3.sqlite_version_info', (3, 29, 0)):
+            with self.assertLogs('ERP.Database.SQLite', level='ERROR') as logs:
+                self.assertFalse(db.initialize())
+        self.assertIn('SQLite 3.30.0 or later is required', logs.output[0])
+    
+    def test_upsert(self):
+        """Test upsert inserts new keys and updates existing ones"""
+        self.env['backend.item'].create([{'code': 'A', 'name': 'Shirt', 'quantity': 2}])
+        results = self.env['backend.item'].upsert(
+            [{'code': 'A', 'quantity': 3}, {'code': 'B', 'quantity': 1}],
+            ['code'],
+            update_fields={'quantity': 'quantity + EXCLUDED.quantity'}
+        )
+        self.assertEqual(len(results), 2)
+        quantities = {row['code']: row['quantity'] for row in self.env['backend.item'].search([]).read(['code', 'quantity'])}
+        self.assertEqual(quantities, {'A': 5, 'B': 1})
+    
+    def test_search_iter(self):
+        """Test streaming a search in batches"""
+        self.env['backend.item'].create([{'code': str(i), 'quantity': i} for i in range(25)])
+        batches = list(self.env['backend.item'].search_iter([], batch_size=10, order='quantity'))
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+    
+    def test_transaction(self):
+        """Test a failing nested block rolls back to its savepoint only"""
+        with self.db.transaction():
+            self.env['backend.item'].create([{'code': 'A'}])
+            with self.assertRaises(ValueError):
+                with self.db.transaction():
+                    self.env['backend.item'].create([{'code': 'B'}])
+                    raise ValueError('rollback')
+        self.env.invalidate_all()
+        self.assertEqual(self.env['backend.item'].search_count([]), 1)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import shutil
+import tempfile
+
+from core_framework.testing import TestCase
+from core_framework.static_assets import StaticAssets, precompress, IMMUTABLE_CACHE_CONTROL
+
+
+class TestStaticAssets(TestCase):
+    """Test cases for the static asset pipeline"""
+    
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, 'css'))
+        self.css = b'body { color: #333; }\n' * 200
+        self._write('css/app.css', self.css)
+        self._write('images/big.bin', b'\0' * 16384)
+        self.assets = StaticAssets(self.root, cache_size=10000, sendfile_threshold=8192)
+    
+    def _write(self, path, content):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(content)
+    
+    def test_conditional_get(self):
+        """Test ETag and Last-Modified validators"""
+        response = self.assets.serve('css/app.css', {})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.body, self.css)
+        headers = dict(response.headers)
+        self.assertEqual(headers['Content-Type'], 'text/css; charset=utf-8')
+        self.assertEqual(headers['Cache-Control'], 'no-cache')
+        
+        response = self.assets.serve('css/app.css', {'If-None-Match': headers['ETag']})
+        self.assertEqual((response.status, response.body), (304, b''))
+        response = self.assets.serve('css/app.css', {'If-Modified-Since': headers['Last-Modified']})
+        self.assertEqual(response.status, 304)
+        # If-None-Match wins over If-Modified-Since
+        response = self.assets.serve('css/app.css', {
+            'If-None-Match': '"stale"', 'If-Modified-Since': headers['Last-Modified'],
+        })
+        self.assertEqual(response.status, 200)
+        
+        # A changed file gets a new ETag
+        self._write('css/app.css', b'body {}')
+        os.utime(os.path.join(self.root, 'css/app.css'), ns=(0, 10 ** 18))
+        response = self.assets.serve('css/app.css', {'If-None-Match': headers['ETag']})
+        self.assertEqual((response.status, response.body), (200, b'body {}'))
+    
+    def test_hashed_url(self):
+        """Test content-hashed URLs and their caching"""
+        url = self.assets.url('css/app.css')
+        self.assertRegex(url, r'^/static/css/app\.[0-9a-f]{12}\.css$')
+        self.assertEqual(self.assets.url('css/missing.css'), '/static/css/missing.css')
+        
+        response = self.assets.serve(url[len('/static/'):], {})
+        self.assertEqual(response.body, self.css)
+        self.assertEqual(dict(response.headers)['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        response = self.assets.serve('css/app.000000000000.css', {})
+        self.assertEqual(dict(response.headers)['Cache-Control'], 'no-cache')
+        self.assertIsNone(self.assets.serve('css/other.000000000000.css', {}))
+        self.assertIsNone(self.assets.serve('../etc/passwd', {}))
+    
+    def test_precompressed_variants(self):
+        """Test the build step and Accept-Encoding negotiation"""
+        self.assertGreaterEqual(precompress(self.root), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'images/big.bin.gz')))
+        
+        response = self.assets.serve('css/app.css', {'Accept-Encoding': 'gzip, deflate'})
+        headers = dict(response.headers)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertTrue(headers['ETag'].endswith('-gzip"'))
+        self.assertEqual(gzip.decompress(response.body), self.css)
+        self.assertEqual(int(headers['Content-Length']), len(response.body))
+        
+        response = self.assets.serve('css/app.css', {'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', dict(response.headers))
+        self.assertEqual(response.body, self.css)
+        response = self.assets.serve('css/app.css', {'If-None-Match': headers['ETag']})
+        self.assertEqual(response.status, 304)
+    
+    def test_cache_and_large_files(self):
+        """Test the LRU content cache and file bodies of large files"""
+        response = self.assets.serve('images/big.bin', {})
+        self.addCleanup(response.body.close)
+        self.assertEqual(response.body.read(), b'\0' * 16384)
+        
+        self.assets.serve('css/app.css', {})
+        self.assertEqual(self.assets.get_cache_stats()['files'], 1)
+        self._write('small.txt', b'x' * 6000)
+        self.assets.serve('small.txt', {})
+        # The cache holds 10000 bytes, so the least recently used file went out
+        stats = self.assets.get_cache_stats()
+        self.assertEqual(stats['files'], 1)
+        self.assertLessEqual(stats['bytes'], stats['max_bytes'])
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from core_framework.testing import TestCase, DatabaseTestCase
+from core_framework.orm import BaseModel, IntegerField, FloatField, ORMManager
+
+
+class UpsertQuant(BaseModel):
+    _name = 'upsert.quant'
+    _table = 'upsert_quant'
+    _unique_keys = [('product_id', 'location_id', 'lot_id')]
+    
+    product_id = IntegerField(string='Product', required=True)
+    location_id = IntegerField(string='Location', required=True)
+    lot_id = IntegerField(string='Lot')
+    quantity = FloatField(string='Quantity')
+
+
+class TestUpsert(TestCase):
+    """Test cases for the upsert helpers"""
+    
+    def test_qualify_expression(self):
+        """Test bare columns refer to the current row and EXCLUDED stays untouched"""
+        quant = UpsertQuant(None)
+        columns = UpsertQuant._get_column_names()
+        self.assertEqual(
+            quant._qualify_upsert_expression('quantity + EXCLUDED.quantity', 'upsert_quant', columns),
+            'upsert_quant.quantity + EXCLUDED.quantity'
+        )
+        self.assertEqual(
+            quant._qualify_upsert_expression('GREATEST(quantity, 0) * 2', 'upsert_quant', columns),
+            'GREATEST(upsert_quant.quantity, 0) * 2'
+        )
+    
+    def test_unique_indexes(self):
+        """Test unique keys become unique index definitions"""
+        indexes = ORMManager({})._get_model_unique_indexes(UpsertQuant)
+        self.assertEqual(indexes, {
+            'upsert_quant_product_id_location_id_lot_id_key_index': 'product_id, location_id, COALESCE(lot_id, 0)'
+        })
+
+
+class TestUpsertRecords(DatabaseTestCase):
+    """Test cases for upserts against the unique keys"""
+    
+    models = [UpsertQuant]
+    
+    def _upsert(self, vals_list):
+        return self.env['upsert.quant'].upsert(vals_list, ['product_id', 'location_id', 'lot_id'], {
+            'quantity': 'quantity + EXCLUDED.quantity',
+        })
+    
+    def test_key_fields(self):
+        """Test rows differing by an optional key field stay apart and empty ones merge"""
+        first = self._upsert([
+            {'product_id': 1, 'location_id': 1, 'lot_id': 10, 'quantity': 2.0},
+            {'product_id': 1, 'location_id': 1, 'lot_id': 11, 'quantity': 3.0},
+            {'product_id': 1, 'location_id': 1, 'quantity': 4.0},
+        ])
+        self.assertEqual(len(set(first.ids)), 3)
+        
+        second = self._upsert([
+            {'product_id': 1, 'location_id': 1, 'quantity': 1.0},
+            {'product_id': 1, 'location_id': 1, 'lot_id': 10, 'quantity': 1.0},
+        ])
+        self.assertEqual(second.ids, [first.ids[2], first.ids[0]])
+        self.assertEqual(self.env['upsert.quant'].search_count([]), 3)
+        rows = {row['id']: row['quantity'] for row in first.read(['quantity'])}
+        self.assertEqual(rows, {first.ids[0]: 3.0, first.ids[1]: 3.0, first.ids[2]: 5.0})
+    
+    def test_undeclared_key(self):
+        """Test conflict fields must be a declared unique key"""
+        with self.assertRaises(ValueError):
+            self.env['upsert.quant'].upsert({'product_id': 1, 'location_id': 1}, ['product_id', 'location_id'])
+    
+    def test_stale_unique_index(self):
+        """Test unique indexes of keys the model no longer declares are dropped, plain ones are kept"""
+        self.db.execute_ddl("CREATE UNIQUE INDEX upsert_quant_product_id_unique_index ON upsert_quant (product_id)")
+        # The index of a field named like a key, e.g. api_key
+        self.db.execute_ddl("CREATE INDEX upsert_quant_lot_id_key_index ON upsert_quant (lot_id)")
+        ORMManager({}, self.db)._create_unique_indexes(UpsertQuant, concurrently=False)
+        indexes = self.db.get_table_indexes('upsert_quant')
+        self.assertNotIn('upsert_quant_product_id_unique_index', indexes)
+        self.assertIn('upsert_quant_lot_id_key_index', indexes)
+        self.assertIn('upsert_quant_product_id_location_id_lot_id_key_index', indexes)
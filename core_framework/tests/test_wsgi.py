@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import io
+import re
+import json
+import gzip
+import asyncio
+import logging
+from wsgiref.util import setup_testing_defaults
+from unittest import mock
+from wsgiref.validate import validator
+
+from core_framework.testing import TestCase
+from core_framework.config import Config
+from core_framework.database import DatabaseManager
+from core_framework.orm import BaseModel, CharField, Environment, ORMManager
+from core_framework.web_interface import ERPApplication, ERPWebHandler
+from core_framework.routing import Controller, route
+from core_framework.static_assets import IMMUTABLE_CACHE_CONTROL
+from core_framework.wsgi import ASGIAdapter
+
+
+class StubAddonManager:
+    loaded_addons = ['base']
+    
+    def list_installed_addons(self):
+        return list(self.loaded_addons)
+    
+    def list_addons(self):
+        return [{'name': f'addon_{index}', 'installed': False} for index in range(200)]
+
+
+class StreamItem(BaseModel):
+    _name = 'stream.item'
+    _table = 'stream_item'
+    
+    name = CharField(string='Name')
+    secret = CharField(string='Secret')
+
+
+class StubAuthManager:
+    
+    def validate_session(self, session_id):
+        return {'user_id': 1} if session_id == 'valid' else None
+    
+    def check_permission(self, user_id, model, operation):
+        return operation == 'read'
+
+
+class StubServer:
+    """ERP server exposing what the routes under test use"""
+    
+    def __init__(self):
+        self.config = Config()
+        self.addon_manager = StubAddonManager()
+        self.db_manager = None
+        self.auth_manager = None
+        self.session_manager = None
+        self.template_renderer = None
+        self.logger = logging.getLogger('ERP')
+
+
+class TestWSGIApplication(TestCase):
+    """Test cases for the WSGI application and its ASGI adapter"""
+    
+    def setUp(self):
+        super().setUp()
+        self.application = ERPApplication(StubServer())
+        patcher = mock.patch.object(ERPWebHandler, '_is_setup_needed', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _call(self, method, path, body=b'', headers=None):
+        environ = {
+            'REQUEST_METHOD': method, 'SCRIPT_NAME': '', 'PATH_INFO': path, 'QUERY_STRING': '',
+            'wsgi.input': io.BytesIO(body),
+        }
+        for name, value in (headers or {}).items():
+            environ['HTTP_' + name.upper().replace('-', '_')] = value
+        if body:
+            environ['CONTENT_LENGTH'] = str(len(body))
+            environ['CONTENT_TYPE'] = 'application/json'
+        setup_testing_defaults(environ)
+        response = {}
+        
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = dict(headers)
+        
+        result = validator(self.application)(environ, start_response)
+        try:
+            response['body'] = b''.join(result)
+        finally:
+            result.close()
+        return response
+    
+    def test_routes(self):
+        """Test GET and POST routes through the WSGI interface"""
+        response = self._call('GET', '/api/status')
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(json.loads(response['body'])['addons'], ['base'])
+        self.assertEqual(self._call('GET', '/api/unknown')['status'], '404 Not Found')
+        
+        response = self._call('POST', '/api/login', json.dumps({'username': 'admin'}).encode())
+        self.assertEqual(response['status'], '400 Bad Request')
+        self.assertEqual(response['headers']['Content-Length'], str(len(response['body'])))
+        self.assertFalse(json.loads(response['body'])['success'])
+    
+    def test_model_records(self):
+        """Test the records of a model are streamed, to authenticated users only"""
+        path = '/api/models/stream.item/records'
+        self.assertEqual(self._call('GET', path)['status'], '401 Unauthorized')
+        
+        server = StubServer()
+        server.auth_manager = StubAuthManager()
+        server.db_manager = DatabaseManager({'database': {'backend': 'sqlite', 'sqlite_path': ':memory:'}})
+        server.db_manager.initialize()
+        self.addCleanup(server.db_manager.close)
+        ORMManager({}, server.db_manager)._create_model_table(StreamItem)
+        Environment(server.db_manager)['stream.item'].create([
+            {'name': f'Item {index}', 'secret': 'hidden'} for index in range(1500)
+        ])
+        self.application = ERPApplication(server)
+        
+        self.assertEqual(self._call('GET', path, headers={'Authorization': 'Bearer expired'})['status'],
+                         '401 Unauthorized')
+        response = self._call('GET', path, headers={'Authorization': 'Bearer valid'})
+        self.assertEqual(response['status'], '200 OK')
+        self.assertNotIn('Content-Length', response['headers'])
+        records = json.loads(response['body'])['records']
+        self.assertEqual(len(records), 1500)
+        self.assertEqual(records[0], {'id': 1, 'name': 'Item 0'})
+        response = self._call('GET', '/api/models/no.model/records', headers={'Authorization': 'Bearer valid'})
+        self.assertEqual(response['status'], '404 Not Found')
+    
+    def test_metrics_debug_only(self):
+        """Test the query metrics are only served in debug mode"""
+        self.assertEqual(self._call('GET', '/api/metrics')['status'], '403 Forbidden')
+    
+    def test_method_not_allowed(self):
+        """Test methods without a route are answered with 405"""
+        response = self._call('DELETE', '/')
+        self.assertEqual(response['status'], '405 Method Not Allowed')
+        self.assertEqual(response['headers']['Allow'], 'GET')
+    
+    def test_static_files(self):
+        """Test static files are revalidated and large ones returned through the file wrapper"""
+        response = self._call('GET', '/static/css/mobile-optimization.css')
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['headers']['Content-Length'], str(len(response['body'])))
+        response = self._call('GET', '/static/css/mobile-optimization.css',
+                              headers={'If-None-Match': response['headers']['ETag']})
+        self.assertEqual((response['status'], response['body']), ('304 Not Modified', b''))
+        
+        self.application.static_assets.sendfile_threshold = 0
+        response = self._call('GET', '/static/css/mobile-optimization.css')
+        self.assertEqual(response['headers']['Content-Length'], str(len(response['body'])))
+        self.assertEqual(self._call('GET', '/static/css/missing.css')['status'], '404 Not Found')
+    
+    def test_template_static_urls(self):
+        """Test rendered pages link static files by their content-hashed URL, cached for a year"""
+        response = self._call('GET', '/dashboard')
+        self.assertEqual(response['status'], '200 OK')
+        url = re.search(r'href="(/static/css/mobile-optimization\.[0-9a-f]{12}\.css)"', response['body'].decode())
+        self.assertIsNotNone(url)
+        response = self._call('GET', url.group(1))
+        self.assertEqual(response['headers']['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        
+        response = self._call('GET', '/missing')
+        self.assertEqual(response['status'], '404 Not Found')
+        self.assertIn(b'/missing', response['body'])
+    
+    def test_compression_and_streaming(self):
+        """Test negotiated compression of buffered and streamed JSON responses"""
+        response = self._call('GET', '/api/status', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response['headers'])
+        
+        response = self._call('GET', '/api/addons', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(response['headers']['Content-Length'], str(len(response['body'])))
+        self.assertEqual(len(json.loads(gzip.decompress(response['body']))['addons']), 200)
+        
+        saved_registry = list(Controller.registry)
+        self.addCleanup(lambda: Controller.registry.__setitem__(slice(None), saved_registry))
+        
+        class RecordController(Controller):
+            @route('/api/test/records', methods=['GET'])
+            def records(self):
+                records = ({'id': index, 'name': f'Product {index}'} for index in range(2000))
+                self.request.send_json_stream(200, {'records': records})
+        
+        self.application = ERPApplication(StubServer())
+        response = self._call('GET', '/api/test/records')
+        self.assertNotIn('Content-Length', response['headers'])
+        self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+        self.assertEqual(len(json.loads(response['body'])['records']), 2000)
+        
+        response = self._call('GET', '/api/test/records', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response['body']))['records']), 2000)
+        
+        self.application.compression_min_size = 10
+        response = self._call('GET', '/api/status', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['headers']['Content-Length'], str(len(response['body'])))
+        self.assertEqual(json.loads(gzip.decompress(response['body']))['addons'], ['base'])
+    
+    def test_asgi_adapter(self):
+        """Test the ASGI adapter runs the WSGI application"""
+        adapter = ASGIAdapter(self.application, threads=1)
+        body = json.dumps({'username': 'admin'}).encode()
+        scope = {
+            'type': 'http', 'method': 'POST', 'path': '/api/login', 'query_string': b'',
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        }
+        messages = [{'type': 'http.request', 'body': body[:5], 'more_body': True},
+                    {'type': 'http.request', 'body': body[5:]}]
+        sent = []
+        
+        async def receive():
+            return messages.pop(0)
+        
+        async def send(message):
+            sent.append(message)
+        
+        asyncio.run(adapter(scope, receive, send))
+        adapter.executor.shutdown()
+        self.assertEqual(sent[0]['status'], 400)
+        self.assertIn((b'content-type', b'application/json'), sent[0]['headers'])
+        self.assertFalse(json.loads(sent[1]['body'])['success'])
@@ -7,9 +7,14 @@ Kids Clothing ERP - Web Interface
 Web interface for the standalone ERP system.
 """
 
+import io
 import logging
 from typing import Dict, List, Any, Optional
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http import HTTPStatus
+from http.client import HTTPMessage
+from wsgiref.simple_server import ServerHandler, WSGIRequestHandler, make_server
+from wsgiref.util import FileWrapper
+from wsgiref.validate import validator
 import json
 import urllib.parse
 import os
@@ -18,68 +23,174 @@ from datetime import datetime
 from .auth import AuthenticationManager
 from .session import SessionManager
 from .templates import TemplateEngine, TemplateRenderer
+from .http_workers import PreforkServer, make_http_server
+from .orm import Environment, models_registry
+from .routing import Controller, MethodNotAllowed, NotFound, Router, route
+from .static_assets import StaticAssets
+from .compression import compress, compress_chunks, is_compressible, iter_json_chunks, negotiate_encoding
 
-class ERPWebHandler(BaseHTTPRequestHandler):
-    """HTTP Request Handler for ERP Web Interface"""
+# Paths served while the database setup is not complete
+SETUP_PATHS = ('/setup', '/setup/', '/static/', '/api/setup')
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), '..', 'static')
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+# Block size of file responses the server cannot sendfile()
+FILE_BLOCK_SIZE = 64 * 1024
+
+def get_request_headers(environ):
+    """Get the request headers of a WSGI environ as an HTTPMessage"""
+    headers = HTTPMessage()
+    for key, value in environ.items():
+        if key.startswith('HTTP_'):
+            headers[key[5:].replace('_', '-').title()] = value
+        elif key in ('CONTENT_TYPE', 'CONTENT_LENGTH') and value:
+            headers[key.replace('_', '-').title()] = value
+    return headers
+
+class ERPWebHandler:
+    """Handler of one ERP request, built from a WSGI environ
+    
+    Routes write their response through the send_response, send_header,
+    end_headers and wfile interface of BaseHTTPRequestHandler; it is
+    buffered here and returned by ``handle()``. A route may instead set
+    ``file_body`` to an open file or ``stream_body`` to an iterable of
+    chunks, which the server streams.
+    """
     
-    def __init__(self, *args, erp_server=None, **kwargs):
+    def __init__(self, environ, erp_server=None, router=None, static_assets=None):
+        self.environ = environ
+        self.router = router
+        self.static_assets = static_assets
         self.erp_server = erp_server
         self.auth_manager = erp_server.auth_manager if erp_server else None
         self.session_manager = erp_server.session_manager if erp_server else None
         self.template_renderer = erp_server.template_renderer if erp_server else None
-        super().__init__(*args, **kwargs)
+        
+        self.command = environ['REQUEST_METHOD']
+        self.path = urllib.parse.quote(environ.get('PATH_INFO', '') or '/', safe='/;=,', encoding='latin1')
+        if environ.get('QUERY_STRING'):
+            self.path += '?' + environ['QUERY_STRING']
+        self.headers = get_request_headers(environ)
+        self.rfile = environ['wsgi.input']
+        self.wfile = io.BytesIO()
+        self.client_address = (environ.get('REMOTE_ADDR', ''), int(environ.get('REMOTE_PORT') or 0))
+        self.status = None
+        self.response_headers = []
+        self.file_body = None
+        self.stream_body = None
+    
+    def _get_instrumentation(self):
+        """Get the query instrumentation of the database, if any"""
+        db_manager = getattr(self.erp_server, 'db_manager', None)
+        return getattr(db_manager, 'instrumentation', None)
     
-    def do_GET(self):
-        """Handle GET requests"""
+    def handle(self):
+        """Run the route of the request and get its status, headers and body"""
+        instrumentation = self._get_instrumentation()
+        if instrumentation is None:
+            self._dispatch()
+        else:
+            with instrumentation.scope('request', f"{self.command} {urllib.parse.urlparse(self.path).path}"):
+                self._dispatch()
+        
+        if self.status is None:
+            return '500 Internal Server Error', [('Content-Length', '0')], b''
+        if self.file_body is not None:
+            return self.status, self.response_headers, self.file_body
+        if self.stream_body is not None:
+            return self.status, self.response_headers, self.stream_body
+        body = self.wfile.getvalue()
+        if not any(name.lower() == 'content-length' for name, value in self.response_headers):
+            self.response_headers.append(('Content-Length', str(len(body))))
+        return self.status, self.response_headers, body
+    
+    def _dispatch(self):
+        """Call the route matching the request path and method"""
         try:
             path = urllib.parse.urlparse(self.path).path
             
             # Check if setup is needed
-            if self._is_setup_needed() and path not in ['/setup', '/setup/', '/static/', '/api/setup']:
-                self._serve_setup_page()
-            elif path == '/':
-                self._serve_home_page()
-            elif path == '/login':
-                self._serve_login_page()
-            elif path == '/logout':
-                self._serve_logout()
-            elif path == '/setup' or path == '/setup/':
+            if self.command == 'GET' and path not in SETUP_PATHS and self._is_setup_needed():
                 self._serve_setup_page()
-            elif path == '/offline':
-                self._serve_offline_page()
-            elif path == '/api/status':
-                self._serve_api_status()
-            elif path.startswith('/api/'):
-                self._serve_api_request(path)
-            elif path.startswith('/static/'):
-                self._serve_static_file(path)
-            else:
-                self._serve_404()
-                
-        except Exception as e:
-            self._serve_500(str(e))
-    
-    def do_POST(self):
-        """Handle POST requests"""
-        try:
-            path = urllib.parse.urlparse(self.path).path
+                return
+            
+            try:
+                endpoint, params = self.router.match(path, self.command)
+            except MethodNotAllowed as e:
+                self._send_method_not_allowed(path, e.allowed_methods)
+                return
+            except NotFound:
+                if path.startswith('/api/'):
+                    self._send_json_response(404, {'error': 'API endpoint not found'})
+                else:
+                    self._serve_404()
+                return
             
-            if path == '/api/login':
-                self._handle_login()
-            elif path == '/api/logout':
-                self._handle_logout()
-            elif path == '/api/setup':
-                self._handle_setup()
-            elif path == '/api/logo/upload':
-                self._handle_logo_upload()
-            elif path.startswith('/api/'):
-                self._handle_api_post(path)
+            if isinstance(self, endpoint.owner):
+                endpoint.function(self, **params)
             else:
-                self._serve_404()
+                self._call_controller(endpoint, params)
                 
         except Exception as e:
             self._serve_500(str(e))
     
+    def _call_controller(self, endpoint, params):
+        """Call an addon controller route and send what it returns"""
+        controller = endpoint.owner()
+        controller.request = self
+        result = endpoint.function(controller, **params)
+        if result is None or self.status is not None:
+            return
+        if isinstance(result, (dict, list)):
+            self._send_json_response(200, result)
+        elif isinstance(result, bytes):
+            self._send_response(200, result, 'application/octet-stream')
+        else:
+            self._send_response(200, str(result), 'text/html; charset=utf-8')
+    
+    def _send_method_not_allowed(self, path, allowed_methods):
+        """Answer a request whose path only has routes for other methods"""
+        if path.startswith('/api/'):
+            content, content_type = json.dumps({'error': 'Method not allowed'}).encode('utf-8'), 'application/json'
+        else:
+            content, content_type = b'Method not allowed', 'text/plain'
+        self.send_response(405)
+        self.send_header('Allow', ', '.join(allowed_methods))
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+    
+    def send_response(self, code, message=None):
+        """Start the response, dropping anything an earlier attempt buffered"""
+        self.status = f"{code} {message or HTTPStatus(code).phrase}"
+        self.response_headers = []
+        self.wfile = io.BytesIO()
+        if self.file_body is not None:
+            self.file_body.close()
+            self.file_body = None
+        self.stream_body = None
+    
+    def send_header(self, keyword, value):
+        """Add a response header"""
+        self.response_headers.append((keyword, str(value)))
+    
+    def end_headers(self):
+        """Add the query statistics of the request as headers in debug mode"""
+        instrumentation = self._get_instrumentation()
+        stats = instrumentation.current_scope() if instrumentation else None
+        if stats is not None and self.erp_server.config.is_debug():
+            self.send_header('X-DB-Query-Count', str(stats.query_count))
+            self.send_header('X-DB-Time-Ms', f"{stats.db_time * 1000:.3f}")
+            self.send_header('X-DB-Rows', str(stats.rows))
+            self.send_header('X-DB-N-Plus-One', str(len(stats.n_plus_one)))
+    
+    def address_string(self):
+        """Get the client address"""
+        return self.client_address[0]
+    
+    @route('/', methods=['GET'])
     def _serve_home_page(self):
         """Serve home page"""
         html_content = """
@@ -193,6 +304,13 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         
         self._send_response(200, html_content, 'text/html')
     
+    @route('/dashboard', methods=['GET'])
+    def _serve_dashboard(self):
+        """Serve dashboard page"""
+        html_content = self._render_template('dashboard.html', {})
+        self._send_response(200, html_content, 'text/html')
+    
+    @route('/login', methods=['GET'])
     def _serve_login_page(self):
         """Serve login page"""
         html_content = """
@@ -332,6 +450,7 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         
         self._send_response(200, html_content, 'text/html')
     
+    @route('/logout', methods=['GET'])
     def _serve_logout(self):
         """Serve logout page"""
         # Redirect to login page
@@ -339,6 +458,7 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         self.send_header('Location', '/login')
         self.end_headers()
     
+    @route('/api/login', methods=['POST'])
     def _handle_login(self):
         """Handle login request"""
         try:
@@ -382,6 +502,7 @@ class ERPWebHandler(BaseHTTPRequestHandler):
                 'message': f'Login error: {str(e)}'
             })
     
+    @route('/api/logout', methods=['POST'])
     def _handle_logout(self):
         """Handle logout request"""
         try:
@@ -429,6 +550,7 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         
         return None
     
+    @route('/api/status', methods=['GET'])
     def _serve_api_status(self):
         """Serve API status"""
         try:
@@ -445,18 +567,7 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self._send_json_response(500, {'error': str(e)})
     
-    def _serve_api_request(self, path: str):
-        """Serve API requests"""
-        # Extract API endpoint
-        endpoint = path[5:]  # Remove '/api/' prefix
-        
-        if endpoint == 'models':
-            self._serve_models_api()
-        elif endpoint == 'addons':
-            self._serve_addons_api()
-        else:
-            self._send_json_response(404, {'error': 'API endpoint not found'})
-    
+    @route('/api/models', methods=['GET'])
     def _serve_models_api(self):
         """Serve models API"""
         try:
@@ -465,6 +576,37 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self._send_json_response(500, {'error': str(e)})
     
+    @route('/api/models/<string:model_name>/records', methods=['GET'])
+    def _serve_model_records_api(self, model_name: str):
+        """Serve the id and name of every record of a model, streamed as they are read"""
+        session = None
+        if self.auth_manager:
+            session_id = self._get_session_id()
+            session = self.auth_manager.validate_session(session_id) if session_id else None
+        if not session:
+            self._send_json_response(401, {'error': 'Authentication required'})
+            return
+        if not self.auth_manager.check_permission(session['user_id'], model_name, 'read'):
+            self._send_json_response(403, {'error': 'Access denied'})
+            return
+        
+        try:
+            model_class = models_registry.get(model_name)
+            if model_class is None or 'name' not in model_class._get_column_names():
+                self._send_json_response(404, {'error': f'Unknown model {model_name}'})
+                return
+            model = Environment(self.erp_server.db_manager, uid=session['user_id'])[model_name]
+            
+            def records():
+                for rows in model.search_iter(fields=['id', 'name']):
+                    for record_id, name in rows:
+                        yield {'id': record_id, 'name': name}
+            
+            self.send_json_stream(200, {'records': records()})
+        except Exception as e:
+            self._send_json_response(500, {'error': str(e)})
+    
+    @route('/api/addons', methods=['GET'])
     def _serve_addons_api(self):
         """Serve addons API"""
         try:
@@ -473,28 +615,33 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self._send_json_response(500, {'error': str(e)})
     
-    def _handle_api_post(self, path: str):
-        """Handle API POST requests"""
+    @route('/api/metrics', methods=['GET'])
+    def _serve_metrics_api(self):
+        """Serve database query and connection pool metrics, in debug mode only"""
+        if not self.erp_server.config.is_debug():
+            self._send_json_response(403, {'error': 'Metrics are only served in debug mode'})
+            return
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            
-            endpoint = path[5:]  # Remove '/api/' prefix
-            
-            if endpoint == 'addons/install':
-                self._handle_install_addon(data)
-            elif endpoint == 'addons/uninstall':
-                self._handle_uninstall_addon(data)
-            else:
-                self._send_json_response(404, {'error': 'API endpoint not found'})
-                
+            db_manager = self.erp_server.db_manager
+            self._send_json_response(200, {
+                'queries': db_manager.instrumentation.get_metrics(),
+                'pool': db_manager.get_pool_stats(),
+                'prepared_statements': dict(db_manager.statement_stats),
+            })
         except Exception as e:
             self._send_json_response(500, {'error': str(e)})
     
-    def _handle_install_addon(self, data: Dict):
+    def _read_json_body(self):
+        """Read the request body as JSON"""
+        content_length = int(self.headers['Content-Length'])
+        post_data = self.rfile.read(content_length)
+        return json.loads(post_data.decode('utf-8'))
+    
+    @route('/api/addons/install', methods=['POST'])
+    def _handle_install_addon(self):
         """Handle addon installation"""
         try:
+            data = self._read_json_body()
             addon_name = data.get('addon_name')
             if not addon_name:
                 self._send_json_response(400, {'error': 'addon_name required'})
@@ -509,9 +656,11 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self._send_json_response(500, {'error': str(e)})
     
-    def _handle_uninstall_addon(self, data: Dict):
+    @route('/api/addons/uninstall', methods=['POST'])
+    def _handle_uninstall_addon(self):
         """Handle addon uninstallation"""
         try:
+            data = self._read_json_body()
             addon_name = data.get('addon_name')
             if not addon_name:
                 self._send_json_response(400, {'error': 'addon_name required'})
@@ -526,61 +675,55 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self._send_json_response(500, {'error': str(e)})
     
-    def _serve_static_file(self, path: str):
-        """Serve static files"""
+    @route('/static/<path:file_path>', methods=['GET'])
+    def _serve_static_file(self, file_path: str):
+        """Serve static files, with validators and precompressed variants"""
         try:
-            # Remove '/static/' prefix
-            file_path = path[8:]
-            
-            # Security check - prevent directory traversal
-            if '..' in file_path or file_path.startswith('/'):
+            response = self._get_static_assets().serve(file_path, self.headers)
+            if response is None:
                 self._serve_404()
                 return
             
-            # Get static files directory
-            static_dir = os.path.join(os.path.dirname(__file__), '..', 'static')
-            full_path = os.path.join(static_dir, file_path)
-            
-            if os.path.exists(full_path) and os.path.isfile(full_path):
-                with open(full_path, 'rb') as f:
-                    content = f.read()
-                
-                # Determine content type
-                content_type = 'text/plain'
-                if file_path.endswith('.css'):
-                    content_type = 'text/css'
-                elif file_path.endswith('.js'):
-                    content_type = 'application/javascript'
-                elif file_path.endswith('.html'):
-                    content_type = 'text/html'
-                elif file_path.endswith('.png'):
-                    content_type = 'image/png'
-                elif file_path.endswith('.jpg') or file_path.endswith('.jpeg'):
-                    content_type = 'image/jpeg'
-                
-                self._send_response(200, content, content_type)
+            self.send_response(response.status)
+            for name, value in response.headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if isinstance(response.body, bytes):
+                self.wfile.write(response.body)
             else:
-                self._serve_404()
+                self.file_body = response.body
                 
         except Exception as e:
             self._serve_500(str(e))
     
+    def _get_static_assets(self):
+        """Get the static directory of the application"""
+        if self.static_assets is None:
+            self.static_assets = StaticAssets(STATIC_DIR)
+        return self.static_assets
+    
+    def _render_template(self, template_name, context):
+        """Render a page template
+        
+        Templates link static files with ``{{ static_url('css/app.css') }}``,
+        which gives their content-hashed URL, cached by browsers for a year.
+        """
+        template_engine = getattr(self.erp_server, 'template_engine', None)
+        if template_engine is None or template_name not in template_engine.templates:
+            template_engine = _get_default_template_engine()
+        context = dict(context, static_url=self._get_static_assets().url)
+        return template_engine.render_template(template_name, context)
+    
     def _serve_404(self):
         """Serve 404 error page"""
         try:
-            from core_framework.templates import TemplateRenderer
-            from core_framework.config import Config
-            
-            config = Config()
-            template_renderer = TemplateRenderer(None)
-            
             context = {
                 'logo_url': self._get_logo_url(),
                 'requested_url': self.path,
                 'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            html_content = template_renderer.render_template('404.html', context)
+            html_content = self._render_template('404.html', context)
             self._send_response(404, html_content.encode('utf-8'), 'text/html')
             
         except Exception as e:
@@ -594,21 +737,16 @@ class ERPWebHandler(BaseHTTPRequestHandler):
             """
             self._send_response(404, html_content, 'text/html')
     
+    @route('/offline', methods=['GET'])
     def _serve_offline_page(self):
         """Serve offline page"""
         try:
-            from core_framework.templates import TemplateRenderer
-            from core_framework.config import Config
-            
-            config = Config()
-            template_renderer = TemplateRenderer(None)
-            
             context = {
                 'logo_url': self._get_logo_url(),
                 'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            html_content = template_renderer.render_template('offline.html', context)
+            html_content = self._render_template('offline.html', context)
             self._send_response(200, html_content.encode('utf-8'), 'text/html')
             
         except Exception as e:
@@ -622,21 +760,16 @@ class ERPWebHandler(BaseHTTPRequestHandler):
             """
             self._send_response(200, html_content, 'text/html')
     
+    @route(['/setup', '/setup/'], methods=['GET'])
     def _serve_setup_page(self):
         """Serve database setup page"""
         try:
-            from core_framework.templates import TemplateRenderer
-            from core_framework.config import Config
-            
-            config = Config()
-            template_renderer = TemplateRenderer(None)
-            
             context = {
                 'logo_url': self._get_logo_url(),
                 'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            html_content = template_renderer.render_template('setup.html', context)
+            html_content = self._render_template('setup.html', context)
             self._send_response(200, html_content.encode('utf-8'), 'text/html')
             
         except Exception as e:
@@ -659,6 +792,7 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         except:
             return True
     
+    @route('/api/setup', methods=['POST'])
     def _handle_setup(self):
         """Handle database setup request"""
         try:
@@ -681,6 +815,7 @@ class ERPWebHandler(BaseHTTPRequestHandler):
                 'error': f'Setup error: {str(e)}'
             })
     
+    @route('/api/logo/upload', methods=['POST'])
     def _handle_logo_upload(self):
         """Handle logo upload request"""
         try:
@@ -727,6 +862,8 @@ class ERPWebHandler(BaseHTTPRequestHandler):
     
     def _send_response(self, status_code: int, content: bytes, content_type: str = 'text/html'):
         """Send HTTP response"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
         self.send_response(status_code)
         self.send_header('Content-Type', content_type)
         self.send_header('Content-Length', str(len(content)))
@@ -738,9 +875,180 @@ class ERPWebHandler(BaseHTTPRequestHandler):
         json_content = json.dumps(data, indent=2).encode('utf-8')
         self._send_response(status_code, json_content, 'application/json')
     
+    def send_json_stream(self, status_code: int, data: Any):
+        """Send a large JSON response, encoded chunk by chunk while it is sent
+        
+        Lists and iterators in ``data`` are written item by item, so pass
+        generators for listings that can be large, e.g. the records of
+        ``search_iter()``; addon controllers call it on ``self.request``.
+        The response has no Content-Length, the server sends it chunked.
+        """
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.stream_body = iter_json_chunks(data)
+    
+
+_default_template_engine = None
+
+def _get_default_template_engine():
+    """Get the template engine of the bundled templates directory"""
+    global _default_template_engine
+    if _default_template_engine is None:
+        _default_template_engine = TemplateEngine({'web.template_path': TEMPLATES_DIR})
+    return _default_template_engine
+
+def build_router():
+    """Compile the routes of the web handler and of the loaded addon controllers"""
+    router = Router()
+    router.add_routes(ERPWebHandler)
+    for controller_class in Controller.registry:
+        router.add_routes(controller_class)
+    return router
+
+class ERPApplication:
+    """WSGI application serving the ERP routes"""
+    
+    def __init__(self, erp_server):
+        self.erp_server = erp_server
+        self.router = build_router()
+        config = getattr(erp_server, 'config', None)
+        web_config = config.get('web', {}) if config else {}
+        self.static_assets = StaticAssets(
+            STATIC_DIR,
+            cache_size=web_config.get('static_cache_size', 16777216),
+            sendfile_threshold=web_config.get('static_sendfile_threshold', 65536),
+        )
+        self.compression_min_size = web_config.get('compression_min_size', 1024)
+        self.compression_level = web_config.get('compression_level', 6)
+    
+    def __call__(self, environ, start_response):
+        handler = ERPWebHandler(environ, erp_server=self.erp_server, router=self.router,
+                                static_assets=self.static_assets)
+        status, headers, body = handler.handle()
+        if hasattr(body, 'read'):
+            start_response(status, headers)
+            return environ.get('wsgi.file_wrapper', FileWrapper)(body, FILE_BLOCK_SIZE)
+        
+        streamed = not isinstance(body, bytes)
+        if self._is_compressible(environ, status, headers, None if streamed else len(body)):
+            headers.append(('Vary', 'Accept-Encoding'))
+            encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING'))
+            if encoding:
+                headers = [(name, value) for name, value in headers if name.lower() != 'content-length']
+                headers.append(('Content-Encoding', encoding))
+                if streamed:
+                    body = compress_chunks(body, encoding, self.compression_level)
+                else:
+                    body = compress(body, encoding, self.compression_level)
+                    headers.append(('Content-Length', str(len(body))))
+        start_response(status, headers)
+        return body if streamed else [body]
+    
+    def _is_compressible(self, environ, status, headers, size):
+        """Check whether a response is worth compressing, ``size`` is None when streamed
+        
+        Responses with an ETag are left as they are, their validator is
+        that of the uncompressed content.
+        """
+        if environ['REQUEST_METHOD'] == 'HEAD' or status[:3] in ('204', '304'):
+            return False
+        if size is not None and size < self.compression_min_size:
+            return False
+        header_names = {name.lower(): value for name, value in headers}
+        if 'content-encoding' in header_names or 'etag' in header_names:
+            return False
+        return is_compressible(header_names.get('content-type'))
+
+class ERPServerHandler(ServerHandler):
+    """WSGI server handler sending file responses with os.sendfile
+    
+    Responses without a Content-Length are sent chunked to HTTP/1.1
+    clients, which then see the end of the body before the connection closes.
+    """
+    
+    http_version = '1.1'
+    chunked = False
+    
+    def cleanup_headers(self):
+        """Choose between Content-Length and chunked transfer encoding"""
+        super().cleanup_headers()
+        self.chunked = (
+            'Content-Length' not in self.headers
+            and self.environ.get('SERVER_PROTOCOL') == 'HTTP/1.1'
+            and self.environ['REQUEST_METHOD'] != 'HEAD'
+            and self.status[:3] not in ('204', '304')
+        )
+        if self.chunked:
+            self.headers['Transfer-Encoding'] = 'chunked'
+        # The request handler closes the connection after each response
+        self.headers['Connection'] = 'close'
+    
+    def write(self, data):
+        """Write a chunk of the body, framed when the response is chunked"""
+        if self.status and not self.headers_sent:
+            self.send_headers()
+        if self.chunked:
+            if not data:
+                return
+            data = b'%x\r\n%s\r\n' % (len(data), data)
+        super().write(data)
+    
+    def finish_content(self):
+        """End the body, with the last chunk when the response is chunked"""
+        super().finish_content()
+        if self.chunked:
+            self._write(b'0\r\n\r\n')
+            self._flush()
+    
+    def sendfile(self):
+        """Copy the file of the response to the socket in the kernel, if both allow it"""
+        connection = getattr(self.request_handler, 'connection', None)
+        if not hasattr(os, 'sendfile') or not hasattr(connection, 'fileno'):
+            return False
+        try:
+            in_fd = self.result.filelike.fileno()
+            out_fd = connection.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return False
+        
+        if not self.headers_sent:
+            self.send_headers()
+        self._flush()
+        offset = self.result.filelike.tell()
+        remaining = os.fstat(in_fd).st_size - offset
+        while remaining > 0:
+            sent = os.sendfile(out_fd, in_fd, offset, remaining)
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+            self.bytes_sent += sent
+        return True
+
+class ERPRequestHandler(WSGIRequestHandler):
+    """Request handler of the built-in server, running the WSGI application"""
+    
+    def handle(self):
+        """Handle one request, as WSGIRequestHandler does but with ERPServerHandler"""
+        self.raw_requestline = self.rfile.readline(65537)
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+        if not self.parse_request():
+            return
+        
+        handler = ERPServerHandler(self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+                                   multithread=False)
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+    
     def log_message(self, format, *args):
         """Override to use our logger"""
-        self.erp_server.logger.info(f"{self.address_string()} - {format % args}")
+        logging.getLogger('ERP').info(f"{self.address_string()} - {format % args}")
 
 class WebInterface:
     """Web Interface for ERP System"""
@@ -749,6 +1057,7 @@ class WebInterface:
         """Initialize web interface"""
         self.config = config
         self.server = None
+        self.erp_server = None
         self.logger = logging.getLogger('ERP.WebInterface')
         
     def initialize(self):
@@ -757,8 +1066,7 @@ class WebInterface:
             self.logger.info("Initializing web interface...")
             
             # Create static directory if it doesn't exist
-            static_dir = os.path.join(os.path.dirname(__file__), '..', 'static')
-            os.makedirs(static_dir, exist_ok=True)
+            os.makedirs(STATIC_DIR, exist_ok=True)
             
             self.logger.info("Web interface initialized successfully")
             return True
@@ -767,14 +1075,41 @@ class WebInterface:
             self.logger.error(f"Failed to initialize web interface: {e}")
             return False
     
-    def start_server(self, host: str = 'localhost', port: int = 8069):
-        """Start web server"""
+    def get_application(self):
+        """Get the WSGI application of the ERP routes"""
+        return ERPApplication(self.erp_server)
+    
+    def start_server(self, host: str = 'localhost', port: int = 8069, workers: int = None, threads: int = None):
+        """Start web server
+        
+        With ``workers`` > 0 a pre-fork master runs that many worker
+        processes, otherwise requests are served in this process. Each
+        process handles ``threads`` requests at a time.
+        """
         try:
-            def handler(*args, **kwargs):
-                return ERPWebHandler(*args, erp_server=self.erp_server, **kwargs)
+            application = self.get_application()
+            web_config = self.config.get('web', {})
+            workers = web_config.get('workers', 0) if workers is None else workers
+            threads = web_config.get('threads', 8) if threads is None else threads
+            
+            if workers > 0:
+                self.logger.warning("Sessions are kept per process, logins are not shared between workers")
+                self.server = PreforkServer(
+                    host, port, ERPRequestHandler, workers,
+                    threads=threads,
+                    application=application,
+                    max_requests=web_config.get('worker_max_requests', 10000),
+                    graceful_timeout=web_config.get('worker_graceful_timeout', 30),
+                    pre_fork=self._close_connections,
+                    post_fork=self._open_connections,
+                )
+                self.logger.info(f"Web server starting on {host}:{port} with {workers} workers of {threads} threads")
+                self.logger.info(f"Access the ERP system at: http://{host}:{port}")
+                self.server.run()
+                return
             
-            self.server = HTTPServer((host, port), handler)
-            self.logger.info(f"Web server started on {host}:{port}")
+            self.server = make_http_server(host, port, ERPRequestHandler, threads, application=application)
+            self.logger.info(f"Web server started on {host}:{port} with {threads} threads")
             self.logger.info(f"Access the ERP system at: http://{host}:{port}")
             
             # Start serving
@@ -784,10 +1119,40 @@ class WebInterface:
             self.logger.error(f"Failed to start web server: {e}")
             raise
     
+    def start_wsgi_server(self, host: str = 'localhost', port: int = 8069):
+        """Serve the WSGI application with the standard library server, checked against PEP 3333
+        
+        Production deployments run ``core_framework.wsgi:application`` under a
+        WSGI server or ``core_framework.wsgi:asgi_application`` under an ASGI one.
+        """
+        try:
+            self.server = make_server(host, port, validator(self.get_application()), handler_class=ERPRequestHandler)
+            self.logger.info(f"WSGI reference server started on {host}:{port}")
+            self.server.serve_forever()
+        except Exception as e:
+            self.logger.error(f"Failed to start WSGI server: {e}")
+            raise
+    
+    def _close_connections(self):
+        """Close the database connections of the master before forking workers"""
+        db_manager = getattr(self.erp_server, 'db_manager', None)
+        if db_manager:
+            db_manager.close()
+    
+    def _open_connections(self):
+        """Open the database connections of a forked worker"""
+        db_manager = getattr(self.erp_server, 'db_manager', None)
+        if db_manager and not db_manager.initialize():
+            raise RuntimeError("Worker could not connect to the database")
+    
     def stop_server(self):
         """Stop web server"""
-        if self.server:
+        if isinstance(self.server, PreforkServer):
+            self.server.stop()
+            self.logger.info("Web server stopping")
+        elif self.server:
             self.server.shutdown()
+            self.server.server_close()
             self.logger.info("Web server stopped")
     
     def set_erp_server(self, erp_server):
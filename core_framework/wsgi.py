@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kids Clothing ERP - WSGI/ASGI Entry Points
+==========================================
+
+Runs the ERP web layer under a standard application server, which then
+provides keep-alive, pipelining and socket handling:
+
+    gunicorn --workers 4 'core_framework.wsgi:application'
+    uvicorn core_framework.wsgi:asgi_application
+
+The configuration file is read from the ERP_CONFIG environment variable.
+"""
+
+import io
+import os
+import sys
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class ASGIAdapter:
+    """ASGI application running a WSGI application on a thread pool
+    
+    The request body is read before the WSGI application runs, as the ERP
+    routes are blocking code. The response body is sent as the application
+    produces it, each chunk being pulled on the thread pool.
+    """
+    
+    def __init__(self, wsgi_application, threads=8):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+        
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.extend(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        
+        environ = self._get_environ(scope, bytes(body))
+        loop = asyncio.get_running_loop()
+        status, headers, chunks, iterator, result = await loop.run_in_executor(self.executor, self._start, environ)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+            })
+            for chunk in chunks:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            while True:
+                chunk = await loop.run_in_executor(self.executor, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                await loop.run_in_executor(self.executor, result.close)
+    
+    async def _lifespan(self, receive, send):
+        """Acknowledge the server startup and shutdown events"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    def _start(self, environ):
+        """Run the WSGI application until it has started its response
+        
+        Returns the status, the headers, the chunks produced so far, the
+        iterator of the rest of the body and the result to close.
+        """
+        response = {}
+        chunks = []
+        
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+            return chunks.append
+        
+        result = self.wsgi_application(environ, start_response)
+        try:
+            iterator = iter(result)
+            while 'status' not in response:
+                chunks.append(next(iterator))
+        except BaseException:
+            if hasattr(result, 'close'):
+                result.close()
+            raise
+        return response['status'], response['headers'], chunks, iterator, result
+    
+    def _get_environ(self, scope, body):
+        """Build the WSGI environ of an ASGI HTTP scope"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f"HTTP_{name}"
+            if name in environ:
+                value = environ[name] + ('; ' if name == 'HTTP_COOKIE' else ',') + value
+            environ[name] = value
+        return environ
+
+def create_application(config_path=None):
+    """Initialize an ERP server and get its WSGI application"""
+    from .server import ERPServer
+    
+    erp_server = ERPServer(config_path or os.environ.get('ERP_CONFIG'))
+    if not erp_server.initialize():
+        raise RuntimeError("Failed to initialize ERP system")
+    return erp_server.web_interface.get_application()
+
+_applications = {}
+_applications_lock = threading.Lock()
+
+def __getattr__(name):
+    """Create ``application`` and ``asgi_application`` when a server first loads them"""
+    if name not in ('application', 'asgi_application'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _applications_lock:
+        if 'application' not in _applications:
+            _applications['application'] = create_application()
+            _applications['asgi_application'] = ASGIAdapter(_applications['application'])
+        return _applications[name]
@@ -25,6 +25,10 @@ def main():
     parser.add_argument('--config', help='Configuration file path', default='erp.conf')
     parser.add_argument('--host', default='localhost', help='Server host')
     parser.add_argument('--port', type=int, default=8069, help='Server port')
+    parser.add_argument('--workers', type=int, help='Worker processes, 0 serves in the main process')
+    parser.add_argument('--threads', type=int, help='Request threads per process')
+    parser.add_argument('--wsgi', action='store_true',
+                        help='Serve with the standard library WSGI server, validating the application')
     parser.add_argument('--init', action='store_true', help='Initialize database')
     parser.add_argument('--update', action='store_true', help='Update addons')
     parser.add_argument('--install', action='store_true', help='Install addons')
@@ -71,7 +75,7 @@ def main():
         print(f"🚀 ERP server starting on http://{args.host}:{args.port}")
         print("Press Ctrl+C to stop the server")
         try:
-            server.start(args.host, args.port)
+            server.start(args.host, args.port, workers=args.workers, threads=args.threads, wsgi=args.wsgi)
         except KeyboardInterrupt:
             print("\n🛑 Stopping ERP server...")
             server.stop()